@@ -1,6 +1,18 @@
 CREATE DATABASE IF NOT EXISTS artcenterDB;
 USE artcenterDB;
 
+-- Migraciones aplicadas (migrate.py). Este script crea el esquema ya al día:
+-- al añadir un fichero a migrations/ hay que reflejarlo aquí y en el INSERT
+CREATE TABLE Migracion (
+    version INT PRIMARY KEY,
+    nombre VARCHAR(255) NOT NULL,
+    aplicada DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+INSERT INTO Migracion (version, nombre) VALUES
+    (1, 'busqueda'), (2, 'taxonomia_version'), (3, 'subidas'), (4, 'likes_en_lote'), (5, 'updated_at'),
+    (6, 'timeline'), (7, 'trending'), (8, 'derivadas_imagen'), (9, 'indices_consultas'),
+    (10, 'tokens_revocados'), (11, 'fecha_like');
+
 -- Entidad Cuenta
 CREATE TABLE Cuenta (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -28,7 +40,11 @@ CREATE TABLE Administrador (
 CREATE TABLE Categoria (
     id INT AUTO_INCREMENT PRIMARY KEY,
     nombre VARCHAR(255) NOT NULL,
-    descripcion TEXT
+    descripcion TEXT,
+    -- Validador de las lecturas condicionales (ETag / Last-Modified); MySQL lo
+    -- actualiza solo en cada UPDATE de la fila
+    updated_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+    INDEX idx_categoria_nombre (nombre)
 );
 
 -- Entidad Subcategoría
@@ -40,6 +56,11 @@ CREATE TABLE Subcategoria (
     caracteristicas TEXT,
     requerimientos TEXT,
     tutoriales TEXT,
+    updated_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+    -- Las claves foráneas (id_categoria, id_subcategoria) de Etiqueta y
+    -- Usuario_Guarda_Subcategoria necesitan un índice que empiece por esas columnas
+    INDEX idx_subcategoria_categoria_id (id_categoria, id_subcategoria),
+    INDEX idx_subcategoria_categoria_nombre (id_categoria, nombre),
     FOREIGN KEY (id_categoria) REFERENCES Categoria(id) ON DELETE CASCADE
 );
 
@@ -58,10 +79,20 @@ CREATE TABLE Publicacion (
     id INT AUTO_INCREMENT PRIMARY KEY,
     id_usuario INT NOT NULL,
     urlContenido VARCHAR(2083) NOT NULL,
+    -- Derivadas de la imagen: miniatura para los listados y versión mediana para el detalle
+    urlMiniatura VARCHAR(2083) NULL,
+    urlMediana VARCHAR(2083) NULL,
     descripcion TEXT,
     id_etiqueta INT,
     fecha_publicacion DATETIME DEFAULT CURRENT_TIMESTAMP,
     likes INT DEFAULT 0,
+    updated_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+    -- Tendencia: log de la suma de pesos * e^(t/tau), ver utils/trending.py
+    trending_score DOUBLE NULL,
+    INDEX idx_publicacion_fecha (fecha_publicacion, id),
+    INDEX idx_publicacion_usuario_fecha (id_usuario, fecha_publicacion, id),
+    INDEX idx_publicacion_etiqueta_fecha (id_etiqueta, fecha_publicacion),
+    INDEX idx_publicacion_trending (trending_score),
     CHECK (urlContenido REGEXP '^(http|https)://'),
     FOREIGN KEY (id_etiqueta) REFERENCES Etiqueta(id) ON DELETE SET NULL,
     FOREIGN KEY (id_usuario) REFERENCES Usuario(id) ON DELETE CASCADE
@@ -74,6 +105,7 @@ CREATE TABLE Comentario (
     id_publicacion INT NOT NULL,
     contenido TEXT NOT NULL,
     fecha_publicacion DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_comentario_publicacion_fecha (id_publicacion, fecha_publicacion, id),
     FOREIGN KEY (id_usuario) REFERENCES Usuario(id) ON DELETE CASCADE,
     FOREIGN KEY (id_publicacion) REFERENCES Publicacion(id) ON DELETE CASCADE
 );
@@ -111,34 +143,86 @@ CREATE TABLE Usuario_Guarda_Subcategoria (
 CREATE TABLE Usuario_Da_Like (
     id_usuario INT NOT NULL,
     id_publicacion INT NOT NULL,
+    -- Instante del like: al quitarlo se resta de la tendencia lo que sumó
+    fecha DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
     PRIMARY KEY (id_usuario, id_publicacion),
     FOREIGN KEY (id_usuario) REFERENCES Usuario(id) ON DELETE CASCADE,
     FOREIGN KEY (id_publicacion) REFERENCES Publicacion(id) ON DELETE CASCADE
 );
 
+-- Subidas de imágenes en segundo plano (publicaciones y fotos de perfil)
+CREATE TABLE Subida (
+    id CHAR(32) PRIMARY KEY,
+    id_usuario INT NOT NULL,
+    tipo VARCHAR(20) NOT NULL,
+    estado VARCHAR(20) NOT NULL DEFAULT 'pendiente',
+    progreso TINYINT NOT NULL DEFAULT 0,
+    urlContenido VARCHAR(2083),
+    id_publicacion INT NULL,
+    error VARCHAR(255),
+    fecha_creacion DATETIME DEFAULT CURRENT_TIMESTAMP,
+    CHECK (tipo IN ('publicacion', 'perfil')),
+    CHECK (estado IN ('pendiente', 'subiendo', 'completado', 'error')),
+    FOREIGN KEY (id_usuario) REFERENCES Cuenta(id) ON DELETE CASCADE,
+    FOREIGN KEY (id_publicacion) REFERENCES Publicacion(id) ON DELETE SET NULL
+);
 
-DELIMITER //
+-- Timeline precalculado del feed personalizado: al publicar se copia una
+-- entrada por cada seguidor de la categoría o subcategoría (salvo las muy
+-- seguidas). El feed es un recorrido de la clave primaria.
+CREATE TABLE Timeline (
+    id_usuario INT NOT NULL,
+    fecha_publicacion DATETIME NOT NULL,
+    id_publicacion INT NOT NULL,
+    PRIMARY KEY (id_usuario, fecha_publicacion, id_publicacion),
+    FOREIGN KEY (id_usuario) REFERENCES Usuario(id) ON DELETE CASCADE,
+    FOREIGN KEY (id_publicacion) REFERENCES Publicacion(id) ON DELETE CASCADE
+);
 
--- Trigger para aumentar el conteo de likes cuando un usuario da like
-CREATE TRIGGER before_insert_like
-AFTER INSERT ON Usuario_Da_Like
-FOR EACH ROW
-BEGIN
-    UPDATE Publicacion
-    SET likes = likes + 1
-    WHERE id = NEW.id_publicacion;
-END;
-//
+-- Tokens revocados al cerrar sesión, por el SHA-256 del token. Se guardan
+-- hasta su exp; los caducados se borran al revocar otros.
+CREATE TABLE Token_Revocado (
+    digest CHAR(64) PRIMARY KEY,
+    exp DATETIME NOT NULL,
+    INDEX idx_token_revocado_exp (exp)
+);
 
--- Trigger para disminuir el conteo de likes cuando un usuario quita su like
-CREATE TRIGGER before_delete_like
-AFTER DELETE ON Usuario_Da_Like
-FOR EACH ROW
-BEGIN
-    UPDATE Publicacion
-    SET likes = likes - 1
-    WHERE id = OLD.id_publicacion;
-END;
+-- Versión de la taxonomía (categorías, subcategorías y etiquetas). Los handlers
+-- de escritura la incrementan y cada proceso la usa para invalidar su caché.
+CREATE TABLE Taxonomia_Version (
+    id TINYINT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO Taxonomia_Version (id, version) VALUES (1, 0);
+
+-- Documento de búsqueda por publicación (descripción, etiqueta, categoría,
+-- subcategoría y autor) con índice FULLTEXT. La colación ai_ci ignora tildes y
+-- mayúsculas. Lo mantienen los triggers de más abajo.
+CREATE TABLE Publicacion_Busqueda (
+    id_publicacion INT PRIMARY KEY,
+    documento TEXT CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci,
+    FULLTEXT KEY ft_documento (documento),
+    FOREIGN KEY (id_publicacion) REFERENCES Publicacion(id) ON DELETE CASCADE
+);
+
+-- Vista que construye el documento de búsqueda de cada publicación
+CREATE VIEW Vista_Documento_Busqueda AS
+SELECT p.id AS id_publicacion,
+       CONCAT_WS(' ', p.descripcion, e.nombre, c.nombre, s.nombre, u.username) AS documento
+FROM Publicacion p
+JOIN Usuario u ON u.id = p.id_usuario
+LEFT JOIN Etiqueta e ON e.id = p.id_etiqueta
+LEFT JOIN Categoria c ON c.id = e.id_categoria
+LEFT JOIN Subcategoria s ON s.id_categoria = e.id_categoria AND s.id_subcategoria = e.id_subcategoria;
+
+
+DELIMITER //
+
+-- Publicacion.likes ya no lo mantienen triggers sobre Usuario_Da_Like: la API
+-- acumula los cambios en memoria y los vuelca en lote (utils/like_counter.py).
+-- En una base de datos existente hay que borrarlos:
+--   DROP TRIGGER IF EXISTS before_insert_like;
+--   DROP TRIGGER IF EXISTS before_delete_like;
 
 -- Trigger para crear automáticamente una etiqueta cuando se inserta una nueva categoría
 CREATE TRIGGER after_insert_categoria
@@ -158,5 +242,76 @@ BEGIN
     INSERT INTO Etiqueta (nombre, id_categoria, id_subcategoria)
     VALUES (NEW.nombre, NEW.id_categoria, NEW.id_subcategoria);
 END;
+//
+
+-- Triggers que mantienen al día el documento de búsqueda
+CREATE TRIGGER after_insert_publicacion_busqueda
+AFTER INSERT ON Publicacion
+FOR EACH ROW
+BEGIN
+    REPLACE INTO Publicacion_Busqueda (id_publicacion, documento)
+    SELECT id_publicacion, documento FROM Vista_Documento_Busqueda WHERE id_publicacion = NEW.id;
+END;
+//
+
+-- Solo si cambia el texto o la etiqueta: los likes también actualizan Publicacion
+CREATE TRIGGER after_update_publicacion_busqueda
+AFTER UPDATE ON Publicacion
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.descripcion <=> OLD.descripcion AND NEW.id_etiqueta <=> OLD.id_etiqueta) THEN
+        REPLACE INTO Publicacion_Busqueda (id_publicacion, documento)
+        SELECT id_publicacion, documento FROM Vista_Documento_Busqueda WHERE id_publicacion = NEW.id;
+    END IF;
+END;
+//
+
+CREATE TRIGGER after_update_usuario_busqueda
+AFTER UPDATE ON Usuario
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.username <=> OLD.username) THEN
+        REPLACE INTO Publicacion_Busqueda (id_publicacion, documento)
+        SELECT v.id_publicacion, v.documento
+        FROM Vista_Documento_Busqueda v
+        JOIN Publicacion p ON p.id = v.id_publicacion
+        WHERE p.id_usuario = NEW.id;
+    END IF;
+END;
+//
+
+CREATE TRIGGER after_update_categoria_busqueda
+AFTER UPDATE ON Categoria
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.nombre <=> OLD.nombre) THEN
+        REPLACE INTO Publicacion_Busqueda (id_publicacion, documento)
+        SELECT v.id_publicacion, v.documento
+        FROM Vista_Documento_Busqueda v
+        JOIN Publicacion p ON p.id = v.id_publicacion
+        JOIN Etiqueta e ON e.id = p.id_etiqueta
+        WHERE e.id_categoria = NEW.id;
+    END IF;
+END;
+//
+
+CREATE TRIGGER after_update_subcategoria_busqueda
+AFTER UPDATE ON Subcategoria
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.nombre <=> OLD.nombre) THEN
+        REPLACE INTO Publicacion_Busqueda (id_publicacion, documento)
+        SELECT v.id_publicacion, v.documento
+        FROM Vista_Documento_Busqueda v
+        JOIN Publicacion p ON p.id = v.id_publicacion
+        JOIN Etiqueta e ON e.id = p.id_etiqueta
+        WHERE e.id_categoria = NEW.id_categoria AND e.id_subcategoria = NEW.id_subcategoria;
+    END IF;
+END;
+//
+
+DELIMITER ;
 
-DELIMITER ;
\ No newline at end of file
+-- Rellena el índice de búsqueda con las publicaciones ya existentes
+INSERT IGNORE INTO Publicacion_Busqueda (id_publicacion, documento)
+SELECT id_publicacion, documento FROM Vista_Documento_Busqueda;
\ No newline at end of file
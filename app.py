@@ -1,5 +1,8 @@
 from flask import Flask, jsonify
 from config import Config
+import models
+from utils import metrics, json_provider, compression, ratelimit
+from utils.passwords import HasherBusy
 from flask_swagger_ui import get_swaggerui_blueprint
 
 from routes.auth_routes import auth_bp            # Blueprint de autenticación
@@ -9,9 +12,19 @@ from routes.subcategoria_routes import subcategoria_bp  # Blueprint de subcatego
 from routes.publicacion_routes import publicacion_bp    # Blueprint de publicaciones
 from routes.etiqueta_routes import etiqueta_bp            # Blueprint de etiquetas
 from routes.comentario_routes import comentario_bp       # Blueprint de comentarios
+from routes.subida_routes import subida_bp               # Blueprint de subidas en segundo plano
+from routes.monitor_routes import monitor_bp             # Blueprint de monitorización
+from routes.seguimiento_routes import seguimiento_bp     # Blueprint de seguimiento de categorías
+from routes.export_routes import export_bp               # Blueprint de exportación de datos
+from routes.batch_routes import batch_bp                 # Blueprint de operaciones en lote
 
 app = Flask(__name__)
 app.config.from_object(Config)
+models.init_app(app)  # Pool de conexiones y devolución de la conexión al acabar cada petición
+json_provider.init_app(app)  # orjson como codificador JSON si está disponible
+metrics.init_app(app)  # Tiempos por endpoint y consultas SQL por petición
+compression.init_app(app)  # gzip/brotli según Accept-Encoding
+ratelimit.init_app(app)  # Límites de tasa por usuario/IP y control de admisión por clase de endpoint
 
 # Registra los blueprints
 app.register_blueprint(auth_bp, url_prefix="/api/auth")       # Rutas de login y registro
@@ -21,6 +34,11 @@ app.register_blueprint(subcategoria_bp, url_prefix="/api")    # Rutas de subcate
 app.register_blueprint(publicacion_bp, url_prefix="/api")     # Rutas de publicaciones
 app.register_blueprint(etiqueta_bp, url_prefix="/api")        # Rutas de etiquetas
 app.register_blueprint(comentario_bp, url_prefix="/api")      # Rutas de comentarios
+app.register_blueprint(subida_bp, url_prefix="/api")          # Rutas de subidas
+app.register_blueprint(monitor_bp, url_prefix="/api")         # Rutas de monitorización
+app.register_blueprint(seguimiento_bp, url_prefix="/api")     # Rutas de seguimiento y feed personalizado
+app.register_blueprint(export_bp, url_prefix="/api")          # Rutas de exportación (admin)
+app.register_blueprint(batch_bp, url_prefix="/api")           # Rutas de operaciones en lote (clientes sin conexión)
 
 # 1) Ruta donde se mostrará Swagger UI
 SWAGGER_URL = '/api/documentacion'
@@ -37,6 +55,16 @@ swaggerui_blueprint = get_swaggerui_blueprint(
 # Registramos el blueprint; queda en /api/documentacion(/)
 app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
 
+# Pool agotado: mejor un 503 que dejar la petición colgada
+@app.errorhandler(models.PoolTimeout)
+def pool_timeout(error):
+    return jsonify({"msg": "Servicio saturado, inténtalo de nuevo"}), 503, {"Retry-After": "1"}
+
+# Demasiados logins/registros calculando hashes a la vez
+@app.errorhandler(HasherBusy)
+def hasher_busy(error):
+    return jsonify({"msg": "Servicio saturado, inténtalo de nuevo"}), 503, {"Retry-After": "1"}
+
 # Manejador global para errores 500 (errores del servidor)
 @app.errorhandler(500)
 def internal_error(error):
@@ -0,0 +1,52 @@
+# Micro-benchmark del coste de autenticación por petición.
+#
+#   python -m benchmarks.auth_bench [--tokens 2000] [--requests 200000]
+#
+# Compara la verificación completa del JWT (HMAC + decodificación, lo que se
+# hacía en cada petición) con la ruta cacheada de verify_token.
+import argparse
+import random
+import time
+
+from config import Config
+
+Config.JWT_SECRET_KEY = Config.JWT_SECRET_KEY or "benchmark-secret"
+
+from utils import jwt_utils
+from utils.jwt_utils import generate_token, decode_token, verify_token, token_cache
+
+# Sin base de datos: la consulta a Token_Revocado solo se hace al fallar la
+# caché (y cada JWT_REVOCATION_CHECK segundos), fuera de lo que se mide aquí
+jwt_utils.is_revoked = lambda digest: False
+
+
+def medir(fn, tokens, n):
+    muestra = [random.choice(tokens) for _ in range(n)]
+    start = time.perf_counter()
+    for token in muestra:
+        fn(token)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=200000)
+    args = parser.parse_args()
+
+    tokens = [generate_token({"id": i, "rol": "usuario"}) for i in range(args.tokens)]
+
+    sin_cache = medir(decode_token, tokens, args.requests)
+    token_cache.clear()
+    for token in tokens:
+        verify_token(token)
+    con_cache = medir(verify_token, tokens, args.requests)
+
+    print(f"tokens distintos: {args.tokens}, peticiones: {args.requests}")
+    print(f"verificación completa: {sin_cache:8.2f} µs/petición")
+    print(f"verify_token cacheado: {con_cache:8.2f} µs/petición")
+    print(f"mejora: x{sin_cache / con_cache:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# Capacidad de conexiones simultáneas: servidor con hilos frente a gevent.
+#
+#   python -m benchmarks.concurrency_bench --levels 50,200,500,1000 --threads 32
+#
+# Arranca serve.py en cada modo contra la base de datos de .env (sembrada con
+# benchmarks.seed) y abre `nivel` conexiones a la vez, cada una lanzando
+# peticiones seguidas a las rutas calientes durante `--seconds` segundos. Mide
+# throughput, latencias y cuántas peticiones fallan o pasan de `--timeout`.
+# El cliente es asyncio puro para que no sea él el cuello de botella.
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from benchmarks.seed import conectar
+from config import Config
+
+Config.JWT_SECRET_KEY = Config.JWT_SECRET_KEY or "benchmark-secret"
+
+from utils.jwt_utils import generate_token
+
+
+def rutas(publicaciones):
+    # Mezcla de lecturas calientes: feed, detalle y comentarios
+    return [
+        lambda: "/api/publicaciones?cursor=",
+        lambda: f"/api/publicaciones/{random.choice(publicaciones)}",
+        lambda: f"/api/publicaciones/{random.choice(publicaciones)}/comentarios?cursor=",
+    ]
+
+
+async def peticion(host, port, path, token, timeout):
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write((f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAuthorization: Bearer {token}\r\n"
+                      "Connection: close\r\n\r\n").encode())
+        await writer.drain()
+        respuesta = await asyncio.wait_for(reader.read(), timeout)
+        return int(respuesta.split(b" ", 2)[1])
+    finally:
+        writer.close()
+
+
+async def nivel(host, port, conexiones, segundos, timeout, tokens, generadores):
+    latencias, errores = [], 0
+    fin = time.monotonic() + segundos
+
+    async def cliente():
+        nonlocal errores
+        while time.monotonic() < fin:
+            path = random.choice(generadores)()
+            start = time.perf_counter()
+            try:
+                status = await peticion(host, port, path, random.choice(tokens), timeout)
+                if status >= 500:
+                    errores += 1
+                else:
+                    latencias.append(time.perf_counter() - start)
+            except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                errores += 1
+
+    start = time.monotonic()
+    await asyncio.gather(*(cliente() for _ in range(conexiones)))
+    total = time.monotonic() - start
+    latencias.sort()
+
+    def p(q):
+        return latencias[min(len(latencias) - 1, int(len(latencias) * q))] * 1000 if latencias else float("nan")
+
+    return len(latencias) / total, p(0.5), p(0.99), errores
+
+
+def esperar_puerto(port, proceso, limite=30):
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        if proceso.poll() is not None:
+            raise SystemExit(f"serve.py terminó con código {proceso.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit("serve.py no llegó a escuchar")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--levels", default="50,200,500,1000", help="conexiones simultáneas a probar")
+    parser.add_argument("--modes", default="threads,gevent")
+    parser.add_argument("--threads", type=int, default=32, help="hilos del modo threads")
+    parser.add_argument("--pool-size", type=int, default=32, help="MYSQL_POOL_SIZE para ambos modos")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--timeout", type=float, default=10)
+    parser.add_argument("--port", type=int, default=5099)
+    args = parser.parse_args()
+
+    conn = conectar()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM Usuario ORDER BY id LIMIT 200")
+    usuarios = [r[0] for r in cursor.fetchall()]
+    cursor.execute("SELECT id FROM Publicacion ORDER BY id")
+    publicaciones = [r[0] for r in cursor.fetchall()]
+    conn.close()
+    if not usuarios or not publicaciones:
+        raise SystemExit("Base de datos vacía: ejecuta antes python -m benchmarks.seed")
+    tokens = [generate_token({"id": u, "rol": "usuario"}) for u in usuarios]
+    generadores = rutas(publicaciones)
+
+    env = dict(os.environ, MYSQL_POOL_SIZE=str(args.pool_size), JWT_SECRET_KEY=Config.JWT_SECRET_KEY,
+               METRICS_ENABLED="0", RATE_LIMIT_ENABLED="0")
+    print(f"{'modo':8s} {'conexiones':>10s} {'req/s':>9s} {'p50 ms':>9s} {'p99 ms':>9s} {'fallos':>7s}")
+    for modo in args.modes.split(","):
+        proceso = subprocess.Popen(
+            [sys.executable, "serve.py", "--mode", modo, "--port", str(args.port),
+             "--threads", str(args.threads), "--connections", "10000"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            esperar_puerto(args.port, proceso)
+            for conexiones in (int(n) for n in args.levels.split(",")):
+                rps, p50, p99, errores = asyncio.run(nivel(
+                    "127.0.0.1", args.port, conexiones, args.seconds, args.timeout, tokens, generadores))
+                print(f"{modo:8s} {conexiones:10d} {rps:9.1f} {p50:9.1f} {p99:9.1f} {errores:7d}", flush=True)
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+
+if __name__ == "__main__":
+    main()
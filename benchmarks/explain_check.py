@@ -0,0 +1,222 @@
+# Comprobación de planes: lanza las lecturas de benchmarks.run contra una base
+# de datos sembrada, captura cada SELECT que ejecutan las rutas y le pasa
+# EXPLAIN. Las comprobaciones previas de las escrituras (nombres repetidos,
+# existencia) se explican directamente, sin ejecutar la escritura. Falla
+# (código de salida 1) si alguna consulta recorre una tabla entera o necesita
+# filesort, sea cual sea la estimación de filas, salvo las de PERMITIDOS.
+#
+#   python migrate.py
+#   python -m benchmarks.seed --users 1000
+#   python -m benchmarks.explain_check
+import argparse
+import random
+import re
+import sys
+import threading
+
+import pymysql
+import pymysql.cursors
+
+from app import app
+from benchmarks.run import cargar_ids, escenarios
+from benchmarks.seed import conectar
+from utils.bulk import existing
+
+# Escenarios que escriben: no hace falta revisarlos y ensuciarían la base
+ESCRITURAS = re.compile(r"^(POST|PUT|DELETE) ")
+SOLO_LECTURA = {"POST /auth/login", "POST /publicaciones/estado"}
+
+# Recorridos y filesort asumidos a propósito: (patrón de la consulta
+# normalizada, tablas tal como salen en EXPLAIN, motivo). Una consulta nueva
+# que los necesite tiene que añadirse aquí con su justificación.
+PERMITIDOS = [
+    (r"FROM Categoria ORDER BY id$", {"Categoria"}, "la caché de taxonomía carga la tabla entera"),
+    (r"FROM Subcategoria ORDER BY id_categoria, id_subcategoria$", {"Subcategoria"},
+     "la caché de taxonomía carga la tabla entera"),
+    (r"FROM Etiqueta ORDER BY id$", {"Etiqueta"}, "la caché de taxonomía carga la tabla entera"),
+    (r"FROM Usuario_Guarda_(Sub)?[Cc]ategoria GROUP BY", {"Usuario_Guarda_Categoria", "Usuario_Guarda_Subcategoria"},
+     "recuento de seguidores por categoría, una vez por minuto y proceso"),
+    (r"FROM Usuario_Guarda_Publicacion ugp JOIN Publicacion p", {"ugp"},
+     "guardadas: el filesort solo ordena los guardados de un usuario"),
+    (r"MATCH\(documento\) AGAINST", {"Publicacion_Busqueda"},
+     "búsqueda: se ordena por relevancia lo que casa con el texto"),
+    (r"e\.id_categoria(, e\.id_subcategoria\))? IN \(", {"e", "p"},
+     "feed: las categorías populares se leen al vuelo y se ordenan por fecha"),
+]
+PERMITIDOS = [(re.compile(patron), tablas, motivo) for patron, tablas, motivo in PERMITIDOS]
+
+
+class Registro:
+    """Cursor que solo apunta el SQL que recibiría, para explicar consultas de
+    escritura (como las de ``utils.bulk.existing``) sin ejecutarlas."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.consultas = []
+
+    def execute(self, query, args=None):
+        self.consultas.append(self._cursor.mogrify(query, args))
+
+    def fetchall(self):
+        return []
+
+
+def consultas_escritura(cursor, datos):
+    """[(nombre, sql)] de las comprobaciones previas de altas y ediciones."""
+    _, _, categorias, subcategorias, _, _ = datos
+    id_categoria, id_subcategoria = subcategorias[0]
+    lista = [
+        ("POST /categorias (nombre repetido)",
+         cursor.mogrify("SELECT id FROM Categoria WHERE nombre = %s", ("Pintura",))),
+        ("POST /subcategorias (nombre repetido)",
+         cursor.mogrify("SELECT id_subcategoria FROM Subcategoria WHERE id_categoria = %s AND nombre = %s",
+                        (id_categoria, "Acuarela"))),
+        ("PUT /categorias/<id> (existencia)",
+         cursor.mogrify("SELECT id FROM Categoria WHERE id = %s", (categorias[0],))),
+        ("PUT /subcategorias/<cat>/<sub> (existencia)",
+         cursor.mogrify("SELECT id_subcategoria FROM Subcategoria WHERE id_categoria = %s AND id_subcategoria = %s",
+                        (id_categoria, id_subcategoria))),
+    ]
+    registro = Registro(cursor)
+    existing(registro, "JOIN Categoria c ON c.nombre = t.nombre", ("nombre",), [("Pintura",), ("Nueva",)])
+    lista.append(("POST /categorias/bulk (nombres repetidos)", registro.consultas.pop()))
+    existing(registro, "JOIN Subcategoria s ON s.id_categoria = t.id_categoria AND s.nombre = t.nombre",
+             ("id_categoria", "nombre"), [(id_categoria, "Acuarela"), (id_categoria, "Nueva")])
+    lista.append(("POST /subcategorias/bulk (nombres repetidos)", registro.consultas.pop()))
+    existing(registro, "JOIN Etiqueta e ON e.nombre = t.nombre", ("nombre",), [("Acuarela",), ("Nueva",)])
+    lista.append(("POST /categorias/bulk y /subcategorias/bulk (etiquetas ocupadas)", registro.consultas.pop()))
+    return lista
+
+
+class Captura:
+    """Guarda el texto de los SELECT que ejecutan los cursores de PyMySQL."""
+
+    def __init__(self):
+        self.consultas = []
+        self.activa = False
+        self._lock = threading.Lock()
+        self._execute = pymysql.cursors.Cursor.execute
+
+    def __enter__(self):
+        original = self._execute
+        captura = self
+
+        def execute(cursor, query, args=None):
+            if captura.activa:
+                sql = cursor.mogrify(query, args)
+                if sql.lstrip().upper().startswith(("SELECT", "WITH")):
+                    with captura._lock:
+                        captura.consultas.append(sql)
+            return original(cursor, query, args)
+
+        pymysql.cursors.Cursor.execute = execute
+        return self
+
+    def __exit__(self, *exc):
+        pymysql.cursors.Cursor.execute = self._execute
+
+    def tomar(self):
+        with self._lock:
+            consultas, self.consultas = self.consultas, []
+        return consultas
+
+
+def normalizar(sql):
+    # Misma consulta con otros parámetros: se revisa una sola vez
+    sql = re.sub(r"'(?:[^'\\]|\\.)*'", "?", sql)
+    sql = re.sub(r"\b\d+(\.\d+)?\b", "?", sql)
+    return " ".join(sql.split())
+
+
+def problemas(cursor, sql):
+    """(fallos, permitidos) del plan de ``sql``: cada recorrido completo o
+    filesort sobre una tabla base, con el motivo si está en PERMITIDOS."""
+    cursor.execute("EXPLAIN " + sql)
+    clave = normalizar(sql)
+    fallos, permitidos = [], []
+    for fila in cursor.fetchall():
+        tabla = fila.get("table") or ""
+        # Las tablas derivadas y las uniones son temporales de la propia consulta
+        if tabla.startswith("<"):
+            continue
+        filas = fila.get("rows") or 0
+        encontrados = []
+        if fila.get("type") == "ALL":
+            encontrados.append(f"{tabla}: recorrido completo (~{filas} filas)")
+        if "Using filesort" in (fila.get("Extra") or ""):
+            encontrados.append(f"{tabla}: filesort (~{filas} filas)")
+        motivo = next((m for patron, tablas, m in PERMITIDOS if tabla in tablas and patron.search(clave)), None)
+        if motivo:
+            permitidos.extend(f"{e} [{motivo}]" for e in encontrados)
+        else:
+            fallos.extend(encontrados)
+    return fallos, permitidos
+
+
+def revisar(cursor, nombre, sql):
+    # Imprime el resultado de una consulta; True si falla
+    fallos, permitidos = problemas(cursor, sql)
+    if fallos:
+        print(f"FALLO {nombre}\n  {normalizar(sql)[:200]}")
+        for p in fallos:
+            print(f"    {p}")
+    for p in permitidos:
+        print(f"  permitido en {nombre}: {p}")
+    return bool(fallos)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeticiones", type=int, default=3,
+                        help="peticiones por escenario, con parámetros distintos")
+    parser.add_argument("--only", help="solo los escenarios que contengan este texto")
+    args = parser.parse_args()
+
+    app.config["UPLOAD_BACKEND"] = "local"
+    app.config["RATE_LIMIT_ENABLED"] = False
+    random.seed(1)
+    datos = cargar_ids()
+    lista = [(nombre, construir) for nombre, construir in escenarios(datos)
+             if not ESCRITURAS.match(nombre) or nombre in SOLO_LECTURA]
+
+    conn = conectar()
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    client = app.test_client()
+    vistas, fallos = set(), 0
+    with Captura() as captura:
+        for nombre, construir in lista:
+            if args.only and args.only not in nombre:
+                continue
+            captura.activa = True
+            for _ in range(args.repeticiones):
+                client.open(**construir()).get_data()
+            captura.activa = False
+
+            revisadas, antes = 0, fallos
+            for sql in captura.tomar():
+                clave = normalizar(sql)
+                if clave in vistas:
+                    continue
+                vistas.add(clave)
+                revisadas += 1
+                fallos += revisar(cursor, nombre, sql)
+            if fallos == antes:
+                print(f"ok    {nombre} ({revisadas} consultas nuevas)")
+
+    # Las comprobaciones de las escrituras se explican sin ejecutarlas
+    for nombre, sql in consultas_escritura(cursor, datos):
+        if args.only and args.only not in nombre:
+            continue
+        vistas.add(normalizar(sql))
+        if revisar(cursor, nombre, sql):
+            fallos += 1
+        else:
+            print(f"ok    {nombre}")
+    conn.close()
+
+    print(f"\n{len(vistas)} consultas revisadas, {fallos} con recorridos completos o filesort")
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# Benchmark de contención: muchos usuarios dando like a la vez a la misma publicación.
+#
+#   python -m benchmarks.like_contention_bench [--threads 32] [--users 2000]
+#
+# Usa la base de datos configurada en .env (mejor una de pruebas: crea cuentas
+# bench_like_*@example.com y una publicación). Compara dos modos:
+#   trigger    INSERT del like + UPDATE Publicacion.likes en la misma transacción,
+#              que es lo que hacían los triggers before_insert_like/before_delete_like
+#   coalesced  INSERT del like y delta en memoria volcado en lote (LikeCounter)
+import argparse
+import statistics
+import threading
+import time
+
+import pymysql
+from werkzeug.security import generate_password_hash
+
+from app import app
+from utils.like_counter import LikeCounter
+
+
+def conectar(autocommit=True):
+    return pymysql.connect(
+        host=app.config["MYSQL_HOST"],
+        user=app.config["MYSQL_USER"],
+        password=app.config["MYSQL_PASSWORD"],
+        db=app.config["MYSQL_DB"],
+        charset="utf8mb4",
+        autocommit=autocommit
+    )
+
+
+def preparar(users):
+    conn = conectar()
+    cursor = conn.cursor()
+    hashed = generate_password_hash("bench")
+    cursor.executemany(
+        "INSERT IGNORE INTO Cuenta (email, contrasena) VALUES (%s, %s)",
+        [(f"bench_like_{i}@example.com", hashed) for i in range(users)]
+    )
+    cursor.execute("SELECT id FROM Cuenta WHERE email LIKE %s ORDER BY id", ("bench\\_like\\_%@example.com",))
+    ids = [r[0] for r in cursor.fetchall()][:users]
+    cursor.executemany(
+        "INSERT IGNORE INTO Usuario (id, username) VALUES (%s, %s)",
+        [(i, f"bench_like_{i}") for i in ids]
+    )
+    cursor.execute(
+        "INSERT INTO Publicacion (id_usuario, urlContenido, descripcion) VALUES (%s, %s, %s)",
+        (ids[0], "https://example.com/bench.png", "benchmark de likes")
+    )
+    id_publicacion = cursor.lastrowid
+    conn.close()
+    return ids, id_publicacion
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def ejecutar(modo, ids, id_publicacion, threads, counter):
+    latencias = []
+    lock = threading.Lock()
+    grupos = [ids[i::threads] for i in range(threads)]
+
+    def trabajador(usuarios):
+        conn = conectar(autocommit=(modo == "coalesced"))
+        cursor = conn.cursor()
+        propias = []
+        for user_id in usuarios:
+            start = time.perf_counter()
+            cursor.execute(
+                "INSERT INTO Usuario_Da_Like (id_usuario, id_publicacion) VALUES (%s, %s)",
+                (user_id, id_publicacion)
+            )
+            if modo == "trigger":
+                cursor.execute("UPDATE Publicacion SET likes = likes + 1 WHERE id = %s", (id_publicacion,))
+                conn.commit()
+            else:
+                counter.record(id_publicacion, 1)
+            propias.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencias.extend(propias)
+
+    start = time.perf_counter()
+    hilos = [threading.Thread(target=trabajador, args=(g,)) for g in grupos]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    total = time.perf_counter() - start
+    if counter is not None:
+        counter.flush()
+
+    conn = conectar()
+    cursor = conn.cursor()
+    cursor.execute("SELECT likes FROM Publicacion WHERE id = %s", (id_publicacion,))
+    likes = cursor.fetchone()[0]
+    cursor.execute("DELETE FROM Usuario_Da_Like WHERE id_publicacion = %s", (id_publicacion,))
+    cursor.execute("UPDATE Publicacion SET likes = 0 WHERE id = %s", (id_publicacion,))
+    conn.close()
+
+    print(f"{modo:10s} {len(latencias) / total:9.0f} likes/s  "
+          f"p50 {percentil(latencias, 0.50) * 1000:7.2f} ms  "
+          f"p95 {percentil(latencias, 0.95) * 1000:7.2f} ms  "
+          f"p99 {percentil(latencias, 0.99) * 1000:7.2f} ms  "
+          f"media {statistics.mean(latencias) * 1000:7.2f} ms  likes={likes}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--users", type=int, default=2000)
+    args = parser.parse_args()
+
+    ids, id_publicacion = preparar(args.users)
+    print(f"{len(ids)} usuarios, {args.threads} hilos, publicación {id_publicacion}")
+
+    ejecutar("trigger", ids, id_publicacion, args.threads, None)
+
+    counter = LikeCounter(app.config["LIKES_FLUSH_INTERVAL"])
+    counter.start(app)
+    ejecutar("coalesced", ids, id_publicacion, args.threads, counter)
+    counter.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# Throughput de login con carga mixta: hash en el hilo de la petición frente al pool de procesos.
+#
+#   python -m benchmarks.login_bench --logins 16 --readers 32 --workers 0,4
+#
+# Arranca serve.py (modo threads) contra la base de datos de .env sembrada con
+# benchmarks.seed, una vez por cada valor de PASSWORD_WORKERS. Durante
+# `--seconds` segundos `--logins` clientes hacen login sin parar con las
+# cuentas sembradas mientras `--readers` clientes leen el feed y los detalles.
+# Con el hash en el hilo, cada login retiene el GIL y las lecturas se frenan;
+# con el pool, deberían mantener su latencia.
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from benchmarks.concurrency_bench import esperar_puerto, rutas
+from benchmarks.seed import conectar, SEED_EMAIL, SEED_PASSWORD
+from config import Config
+
+Config.JWT_SECRET_KEY = Config.JWT_SECRET_KEY or "benchmark-secret"
+
+from utils.jwt_utils import generate_token
+
+
+async def enviar(host, port, peticion, timeout):
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(peticion)
+        await writer.drain()
+        respuesta = await asyncio.wait_for(reader.read(), timeout)
+        return int(respuesta.split(b" ", 2)[1])
+    finally:
+        writer.close()
+
+
+def login(host, emails):
+    cuerpo = json.dumps({"email": random.choice(emails), "contrasena": SEED_PASSWORD}).encode()
+    return (f"POST /api/auth/login HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(cuerpo)}\r\nConnection: close\r\n\r\n").encode() + cuerpo
+
+
+def lectura(host, tokens, generadores):
+    return (f"GET {random.choice(generadores)()} HTTP/1.1\r\nHost: {host}\r\n"
+            f"Authorization: Bearer {random.choice(tokens)}\r\nConnection: close\r\n\r\n").encode()
+
+
+async def medir(host, port, args, emails, tokens, generadores):
+    resultados = {"login": ([], [0]), "lectura": ([], [0])}
+    fin = time.monotonic() + args.seconds
+
+    async def cliente(tipo, construir):
+        latencias, errores = resultados[tipo]
+        while time.monotonic() < fin:
+            start = time.perf_counter()
+            try:
+                status = await enviar(host, port, construir(), args.timeout)
+                if status >= 400:
+                    errores[0] += 1
+                else:
+                    latencias.append(time.perf_counter() - start)
+            except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                errores[0] += 1
+
+    start = time.monotonic()
+    await asyncio.gather(
+        *(cliente("login", lambda: login(host, emails)) for _ in range(args.logins)),
+        *(cliente("lectura", lambda: lectura(host, tokens, generadores)) for _ in range(args.readers)),
+    )
+    total = time.monotonic() - start
+
+    filas = {}
+    for tipo, (latencias, errores) in resultados.items():
+        latencias.sort()
+
+        def p(q):
+            return latencias[min(len(latencias) - 1, int(len(latencias) * q))] * 1000 if latencias else float("nan")
+
+        filas[tipo] = (len(latencias) / total, p(0.5), p(0.99), errores[0])
+    return filas
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="0,4", help="valores de PASSWORD_WORKERS a comparar")
+    parser.add_argument("--logins", type=int, default=16, help="clientes haciendo login")
+    parser.add_argument("--readers", type=int, default=32, help="clientes leyendo")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--port", type=int, default=5098)
+    args = parser.parse_args()
+
+    conn = conectar()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM Usuario ORDER BY id LIMIT 200")
+    usuarios = [r[0] for r in cursor.fetchall()]
+    cursor.execute("SELECT id FROM Publicacion ORDER BY id")
+    publicaciones = [r[0] for r in cursor.fetchall()]
+    conn.close()
+    if not usuarios or not publicaciones:
+        raise SystemExit("Base de datos vacía: ejecuta antes python -m benchmarks.seed")
+    emails = [SEED_EMAIL.format(i) for i in range(len(usuarios))]
+    tokens = [generate_token({"id": u, "rol": "usuario"}) for u in usuarios]
+    generadores = rutas(publicaciones)
+
+    print(f"{'workers':>7s} {'tipo':8s} {'req/s':>9s} {'p50 ms':>9s} {'p99 ms':>9s} {'fallos':>7s}")
+    for workers in args.workers.split(","):
+        env = dict(os.environ, PASSWORD_WORKERS=workers, PASSWORD_QUEUE_SIZE=str(args.logins * 2),
+                   JWT_SECRET_KEY=Config.JWT_SECRET_KEY, METRICS_ENABLED="0", RATE_LIMIT_ENABLED="0")
+        proceso = subprocess.Popen(
+            [sys.executable, "serve.py", "--mode", "threads", "--port", str(args.port),
+             "--threads", str(args.threads)],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            esperar_puerto(args.port, proceso)
+            filas = asyncio.run(medir("127.0.0.1", args.port, args, emails, tokens, generadores))
+            for tipo, (rps, p50, p99, errores) in filas.items():
+                print(f"{workers:>7s} {tipo:8s} {rps:9.1f} {p50:9.1f} {p99:9.1f} {errores:7d}", flush=True)
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# Benchmark de endpoints contra una base de datos sembrada con benchmarks.seed.
+#
+#   python -m benchmarks.run --concurrency 16 --requests 500 --json resultados.json
+#   python -m benchmarks.run --baseline resultados.json     # compara con otra ejecución
+#
+# Cada escenario se lanza con el test client de Flask desde `concurrency` hilos
+# y se mide throughput y latencias p50/p95/p99. Los tokens se generan con
+# utils.jwt_utils.generate_token para usuarios sembrados.
+import argparse
+import io
+import json
+import platform
+import random
+import subprocess
+import threading
+import time
+
+import pymysql
+
+from app import app
+from benchmarks.seed import SEED_EMAIL, SEED_PASSWORD, conectar
+from utils.jwt_utils import generate_token
+
+
+def cargar_ids():
+    conn = conectar()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM Usuario ORDER BY id")
+    usuarios = [r[0] for r in cursor.fetchall()]
+    cursor.execute("SELECT id FROM Publicacion ORDER BY id")
+    publicaciones = [r[0] for r in cursor.fetchall()]
+    cursor.execute("SELECT id FROM Categoria ORDER BY id")
+    categorias = [r[0] for r in cursor.fetchall()]
+    cursor.execute("SELECT id_categoria, id_subcategoria FROM Subcategoria")
+    subcategorias = cursor.fetchall()
+    cursor.execute("SELECT id FROM Etiqueta")
+    etiquetas = [r[0] for r in cursor.fetchall()]
+    cursor.execute("SELECT id FROM Administrador LIMIT 1")
+    admin = cursor.fetchone()
+    conn.close()
+    return usuarios, publicaciones, categorias, subcategorias, etiquetas, admin[0] if admin else None
+
+
+def escenarios(datos):
+    """Lista de (nombre, función que devuelve los argumentos de client.open)."""
+    usuarios, publicaciones, categorias, subcategorias, etiquetas, admin = datos
+    rng = random.Random(1)
+    tokens = {u: generate_token({"id": u, "rol": "usuario"}) for u in rng.sample(usuarios, min(200, len(usuarios)))}
+    token_ids = list(tokens)
+
+    def auth(user_id=None):
+        user_id = user_id or random.choice(token_ids)
+        return {"Authorization": f"Bearer {tokens[user_id]}"}
+
+    def pub():
+        return random.choice(publicaciones)
+
+    def sub():
+        return random.choice(subcategorias)
+
+    lista = [
+        # auth
+        ("POST /auth/login", lambda: dict(method="POST", path="/api/auth/login", json={
+            "email": SEED_EMAIL.format(random.randrange(len(usuarios))), "contrasena": SEED_PASSWORD})),
+        # user
+        ("GET /user", lambda: dict(method="GET", path="/api/user", headers=auth())),
+        # categoria / subcategoria / etiqueta
+        ("GET /categorias", lambda: dict(method="GET", path="/api/categorias", headers=auth())),
+        ("GET /categorias/<id>", lambda: dict(method="GET", path=f"/api/categorias/{random.choice(categorias)}",
+                                              headers=auth())),
+        ("GET /taxonomia", lambda: dict(method="GET", path="/api/taxonomia", headers=auth())),
+        ("GET /subcategorias", lambda: dict(method="GET", path="/api/subcategorias", headers=auth())),
+        ("GET /subcategorias/categoria/<id>", lambda: dict(
+            method="GET", path=f"/api/subcategorias/categoria/{random.choice(categorias)}", headers=auth())),
+        ("GET /subcategorias/<cat>/<sub>", lambda: dict(
+            method="GET", path="/api/subcategorias/{}/{}".format(*sub()), headers=auth())),
+        ("GET /etiquetas", lambda: dict(method="GET", path="/api/etiquetas", headers=auth())),
+        ("GET /seguimientos", lambda: dict(method="GET", path="/api/seguimientos", headers=auth())),
+        # publicacion
+        ("GET /publicaciones?page=0", lambda: dict(method="GET", path="/api/publicaciones?page=0", headers=auth())),
+        ("GET /publicaciones?page=50", lambda: dict(method="GET", path="/api/publicaciones?page=50", headers=auth())),
+        ("GET /publicaciones?cursor=", lambda: dict(method="GET", path="/api/publicaciones?cursor=", headers=auth())),
+        ("GET /publicaciones/<id>", lambda: dict(method="GET", path=f"/api/publicaciones/{pub()}", headers=auth())),
+        ("GET /publicaciones/<id>?include=", lambda: dict(
+            method="GET", path=f"/api/publicaciones/{pub()}?include=autor,comentarios", headers=auth())),
+        ("GET /publicaciones/feed", lambda: dict(method="GET", path="/api/publicaciones/feed?cursor=", headers=auth())),
+        ("GET /publicaciones/trending", lambda: dict(
+            method="GET", path=f"/api/publicaciones/trending?id_categoria={random.choice(categorias)}", headers=auth())),
+        ("GET /publicaciones/mias", lambda: dict(method="GET", path="/api/publicaciones/mias?cursor=", headers=auth())),
+        ("GET /publicaciones/guardadas", lambda: dict(method="GET", path="/api/publicaciones/guardadas?cursor=",
+                                                      headers=auth())),
+        ("GET /publicaciones/buscar", lambda: dict(
+            method="GET", path=f"/api/publicaciones/buscar?cursor=&q={random.choice(['acuarela', 'óleo', 'retrato luz', 'artista_1'])}",
+            headers=auth())),
+        ("POST /publicaciones/estado", lambda: dict(method="POST", path="/api/publicaciones/estado", headers=auth(),
+                                                    json={"ids": random.sample(publicaciones, min(20, len(publicaciones)))})),
+        ("POST /publicaciones/<id>/like", lambda: dict(method="POST", path=f"/api/publicaciones/{pub()}/like",
+                                                       headers=auth())),
+        ("POST /publicaciones/<id>/guardar", lambda: dict(method="POST", path=f"/api/publicaciones/{pub()}/guardar",
+                                                          headers=auth())),
+        ("POST /publicaciones", lambda: dict(method="POST", path="/api/publicaciones", headers=auth(),
+                                             content_type="multipart/form-data", data={
+                                                 "descripcion": "benchmark", "id_etiqueta": str(random.choice(etiquetas)),
+                                                 "file": (io.BytesIO(b"\x89PNG benchmark"), "bench.png")})),
+        # comentario
+        ("GET /publicaciones/<id>/comentarios", lambda: dict(
+            method="GET", path=f"/api/publicaciones/{pub()}/comentarios?cursor=", headers=auth())),
+        ("GET /publicaciones/<id>/comentarios?stream=1", lambda: dict(
+            method="GET", path=f"/api/publicaciones/{pub()}/comentarios?stream=1", headers=auth())),
+        ("POST /publicaciones/<id>/comentarios", lambda: dict(
+            method="POST", path=f"/api/publicaciones/{pub()}/comentarios", headers=auth(), json={"contenido": "bench"})),
+    ]
+    if admin:
+        tokens[admin] = generate_token({"id": admin, "rol": "admin"})
+        lista.append(("PUT /categorias/<id>", lambda: dict(
+            method="PUT", path=f"/api/categorias/{categorias[0]}", headers=auth(admin),
+            json={"nombre": "Pintura", "descripcion": "benchmark"})))
+    return lista
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def medir(nombre, construir, requests, concurrency):
+    latencias = []
+    errores = 0
+    lock = threading.Lock()
+    restantes = [requests]
+
+    def trabajador():
+        nonlocal errores
+        client = app.test_client()
+        propias, fallos = [], 0
+        while True:
+            with lock:
+                if restantes[0] <= 0:
+                    break
+                restantes[0] -= 1
+            kwargs = construir()
+            start = time.perf_counter()
+            response = client.open(**kwargs)
+            response.get_data()
+            propias.append(time.perf_counter() - start)
+            if response.status_code >= 500:
+                fallos += 1
+        with lock:
+            latencias.extend(propias)
+            errores += fallos
+
+    start = time.perf_counter()
+    hilos = [threading.Thread(target=trabajador) for _ in range(concurrency)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    total = time.perf_counter() - start
+
+    return {
+        "route": nombre,
+        "requests": len(latencias),
+        "errors": errores,
+        "throughput": len(latencias) / total,
+        "p50_ms": percentil(latencias, 0.50) * 1000,
+        "p95_ms": percentil(latencias, 0.95) * 1000,
+        "p99_ms": percentil(latencias, 0.99) * 1000,
+    }
+
+
+def commit_actual():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=300, help="peticiones por ruta")
+    parser.add_argument("--only", help="solo las rutas que contengan este texto")
+    parser.add_argument("--json", help="guarda los resultados en este fichero")
+    parser.add_argument("--baseline", help="compara con un JSON de una ejecución anterior")
+    parser.add_argument("--no-metrics", action="store_true",
+                        help="desactiva la instrumentación para medir su coste")
+    args = parser.parse_args()
+
+    # Las subidas van a disco para no depender de Cloudinary
+    app.config["UPLOAD_BACKEND"] = "local"
+    app.extensions.pop("uploader", None)
+    if args.no_metrics:
+        app.config["METRICS_ENABLED"] = False
+    # Todas las peticiones salen de la misma IP: los límites de tasa falsearían la medida
+    app.config["RATE_LIMIT_ENABLED"] = False
+
+    datos = cargar_ids()
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {r["route"]: r for r in json.load(f)["results"]}
+
+    resultados = []
+    print(f"{'ruta':48s} {'req/s':>9s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'5xx':>5s}")
+    for nombre, construir in escenarios(datos):
+        if args.only and args.only not in nombre:
+            continue
+        r = medir(nombre, construir, args.requests, args.concurrency)
+        resultados.append(r)
+        linea = (f"{nombre:48s} {r['throughput']:9.1f} {r['p50_ms']:8.2f} "
+                 f"{r['p95_ms']:8.2f} {r['p99_ms']:8.2f} {r['errors']:5d}")
+        if nombre in baseline:
+            linea += f"  p50 {r['p50_ms'] / baseline[nombre]['p50_ms'] - 1:+.0%}"
+        print(linea)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "commit": commit_actual(),
+                "python": platform.python_version(),
+                "pymysql": pymysql.__version__,
+                "concurrency": args.concurrency,
+                "requests_per_route": args.requests,
+                "metrics": not args.no_metrics,
+                "results": resultados,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
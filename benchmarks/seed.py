@@ -0,0 +1,136 @@
+# Siembra una base de datos local con datos sintéticos para los benchmarks.
+#
+#   mysql -u root -p < ScriptArtCenterDB.sql      # base de datos vacía
+#   python -m benchmarks.seed --users 1000
+#
+# Usa la conexión de .env. Las proporciones por defecto imitan el uso real:
+# unas 10 publicaciones por usuario, 20 likes, 3 guardados y 5 comentarios por
+# publicación. Todas las cuentas sembradas tienen la contraseña SEED_PASSWORD.
+import argparse
+import random
+from datetime import datetime, timedelta
+
+import pymysql
+from werkzeug.security import generate_password_hash
+
+from config import Config
+
+SEED_PASSWORD = "bench1234"
+SEED_EMAIL = "bench_{}@example.com"
+BATCH = 1000
+
+PALABRAS = [
+    "acuarela", "óleo", "retrato", "paisaje", "boceto", "escultura", "cerámica", "grabado",
+    "collage", "tinta", "carboncillo", "acrílico", "mural", "ilustración", "fotografía",
+    "luz", "sombra", "color", "textura", "perspectiva", "estudio", "primer", "intento",
+]
+CATEGORIAS = ["Pintura", "Dibujo", "Escultura", "Fotografía", "Grabado", "Cerámica", "Ilustración", "Arte digital"]
+
+
+def conectar():
+    return pymysql.connect(
+        host=Config.MYSQL_HOST,
+        user=Config.MYSQL_USER,
+        password=Config.MYSQL_PASSWORD,
+        db=Config.MYSQL_DB,
+        port=Config.MYSQL_PORT,
+        charset="utf8mb4",
+        autocommit=True
+    )
+
+
+def insertar(cursor, sql, filas):
+    for i in range(0, len(filas), BATCH):
+        cursor.executemany(sql, filas[i:i + BATCH])
+
+
+def texto(rng, n):
+    return " ".join(rng.choice(PALABRAS) for _ in range(n))
+
+
+def sembrar(users, posts_per_user=10, subcategorias_por_categoria=5, likes_per_post=20,
+            saves_per_post=3, comments_per_post=5, days=365, seed=42):
+    rng = random.Random(seed)
+    conn = conectar()
+    cursor = conn.cursor()
+    ahora = datetime.now()
+
+    # Taxonomía: los triggers crean las etiquetas
+    for nombre in CATEGORIAS:
+        cursor.execute("INSERT INTO Categoria (nombre, descripcion) VALUES (%s, %s)", (nombre, texto(rng, 30)))
+        id_categoria = cursor.lastrowid
+        for j in range(subcategorias_por_categoria):
+            cursor.execute(
+                "INSERT INTO Subcategoria (id_categoria, nombre, historia, caracteristicas, requerimientos, tutoriales) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                (id_categoria, f"{nombre} {j + 1}", texto(rng, 80), texto(rng, 40), texto(rng, 20), texto(rng, 20))
+            )
+    cursor.execute("SELECT id FROM Etiqueta")
+    etiquetas = [r[0] for r in cursor.fetchall()]
+
+    # Cuentas y usuarios (un solo hash: todas comparten contraseña)
+    hashed = generate_password_hash(SEED_PASSWORD)
+    insertar(cursor, "INSERT INTO Cuenta (email, contrasena) VALUES (%s, %s)",
+             [(SEED_EMAIL.format(i), hashed) for i in range(users)])
+    cursor.execute("SELECT id FROM Cuenta WHERE email LIKE %s ORDER BY id", ("bench\\_%@example.com",))
+    usuarios = [r[0] for r in cursor.fetchall()]
+    insertar(cursor, "INSERT INTO Usuario (id, username) VALUES (%s, %s)",
+             [(u, f"artista_{n}") for n, u in enumerate(usuarios)])
+
+    # Publicaciones repartidas en los últimos `days` días
+    n_posts = users * posts_per_user
+    insertar(cursor,
+             "INSERT INTO Publicacion (id_usuario, urlContenido, descripcion, id_etiqueta, fecha_publicacion) "
+             "VALUES (%s, %s, %s, %s, %s)",
+             [(rng.choice(usuarios), f"https://example.com/img/{i}.jpg", texto(rng, rng.randint(3, 20)),
+               rng.choice(etiquetas), ahora - timedelta(seconds=rng.randint(0, days * 86400)))
+              for i in range(n_posts)])
+    cursor.execute("SELECT id FROM Publicacion ORDER BY id")
+    publicaciones = [r[0] for r in cursor.fetchall()]
+
+    def pares(por_publicacion):
+        vistos = set()
+        for _ in range(int(len(publicaciones) * por_publicacion)):
+            vistos.add((rng.choice(usuarios), rng.choice(publicaciones)))
+        return list(vistos)
+
+    insertar(cursor, "INSERT INTO Usuario_Da_Like (id_usuario, id_publicacion) VALUES (%s, %s)",
+             pares(likes_per_post))
+    insertar(cursor, "INSERT INTO Usuario_Guarda_Publicacion (id_usuario, id_publicacion) VALUES (%s, %s)",
+             pares(saves_per_post))
+    insertar(cursor,
+             "INSERT INTO Comentario (id_usuario, id_publicacion, contenido, fecha_publicacion) VALUES (%s, %s, %s, %s)",
+             [(rng.choice(usuarios), rng.choice(publicaciones), texto(rng, rng.randint(2, 15)),
+               ahora - timedelta(seconds=rng.randint(0, days * 86400)))
+              for _ in range(n_posts * comments_per_post)])
+
+    # El contador de likes se recalcula de una vez
+    cursor.execute("""
+        UPDATE Publicacion p
+        JOIN (SELECT id_publicacion, COUNT(*) AS total FROM Usuario_Da_Like GROUP BY id_publicacion) l
+          ON l.id_publicacion = p.id
+        SET p.likes = l.total
+    """)
+    cursor.execute("UPDATE Taxonomia_Version SET version = version + 1 WHERE id = 1")
+    conn.close()
+    return {"usuarios": len(usuarios), "publicaciones": len(publicaciones), "etiquetas": len(etiquetas)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--posts-per-user", type=int, default=10)
+    parser.add_argument("--subcategorias", type=int, default=5, help="subcategorías por categoría")
+    parser.add_argument("--likes-per-post", type=float, default=20)
+    parser.add_argument("--saves-per-post", type=float, default=3)
+    parser.add_argument("--comments-per-post", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    resumen = sembrar(args.users, args.posts_per_user, args.subcategorias, args.likes_per_post,
+                      args.saves_per_post, args.comments_per_post, seed=args.seed)
+    print(resumen)
+
+
+if __name__ == "__main__":
+    main()
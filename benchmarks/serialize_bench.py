@@ -0,0 +1,103 @@
+# Micro-benchmark del coste de serialización de las respuestas de listas.
+#
+#   python -m benchmarks.serialize_bench [--etiquetas 2000] [--repeat 20000]
+#
+# Compara, en tiempo de CPU por respuesta, la construcción a mano de cada dict
+# por índice + jsonify estándar (lo que se hacía antes) con los esquemas de
+# utils.serializers y el proveedor orjson, para una página de 20 publicaciones
+# y para el volcado completo de /etiquetas. No necesita base de datos.
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import app
+from utils.json_provider import OrjsonProvider, orjson
+from utils.pagination import PER_PAGE
+from utils.serializers import PUBLICACION, ETIQUETA
+from utils.taxonomy_cache import TaxonomySnapshot
+
+
+def filas_feed(rng):
+    ahora = datetime.now()
+    return [(rng.randrange(10 ** 6), f"https://res.cloudinary.com/demo/image/upload/{i}.jpg",
+             rng.randrange(100), "Acuarela", rng.randrange(10), rng.choice([None, 1, 2]),
+             rng.randrange(2), rng.randrange(2), rng.randrange(1000),
+             ahora - timedelta(minutes=i)) for i in range(PER_PAGE)]
+
+
+def feed_a_mano(filas):
+    # Copia de lo que hacían los handlers de publicacion_routes.py
+    resultados = []
+    for p in filas:
+        resultados.append({
+            "id": p[0],
+            "urlContenido": p[1],
+            "id_etiqueta": p[2],
+            "nombre_etiqueta": p[3],
+            "id_categoria": p[4],
+            "id_subcategoria": p[5],
+            "liked": bool(p[6]),
+            "saved": bool(p[7]),
+            "id_usuario": p[8]
+        })
+    return resultados
+
+
+def medir(fn, repeat):
+    fn()
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--etiquetas", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    feed = filas_feed(rng)
+    etiquetas = [(i, f"Etiqueta {i} ñ", rng.randrange(10), None) for i in range(args.etiquetas)]
+    repeat_etiquetas = max(1, args.repeat * PER_PAGE // args.etiquetas)
+
+    estandar = DefaultJSONProvider(app)
+    rapido = OrjsonProvider(app) if orjson else None
+
+    with app.app_context():
+        snapshot = TaxonomySnapshot(1, [], [], etiquetas)
+        casos = [
+            ("feed 20: a mano + json", lambda: estandar.response(feed_a_mano(feed)), args.repeat),
+            ("feed 20: esquema + json", lambda: estandar.response(PUBLICACION.rows(feed)), args.repeat),
+        ]
+        if rapido:
+            casos.append(("feed 20: esquema + orjson", lambda: rapido.response(PUBLICACION.rows(feed)), args.repeat))
+        casos += [
+            (f"etiquetas {args.etiquetas}: a mano + json",
+             lambda: estandar.response([{"id": e[0], "nombre": e[1]} for e in etiquetas]), repeat_etiquetas),
+            (f"etiquetas {args.etiquetas}: esquema + json",
+             lambda: estandar.response(ETIQUETA.rows(etiquetas)), repeat_etiquetas),
+        ]
+        if rapido:
+            casos.append((f"etiquetas {args.etiquetas}: esquema + orjson",
+                          lambda: rapido.response(ETIQUETA.rows(etiquetas)), repeat_etiquetas))
+        casos.append((f"etiquetas {args.etiquetas}: JSON cacheado",
+                      lambda: app.response_class(snapshot.encoded("etiquetas"), mimetype="application/json"),
+                      repeat_etiquetas))
+
+        if not rapido:
+            print("orjson no está instalado: solo se mide la librería estándar")
+        base = {}
+        for nombre, fn, repeat in casos:
+            coste = medir(fn, repeat)
+            grupo = nombre.split(":")[0]
+            base.setdefault(grupo, coste)
+            print(f"{nombre:42s} {coste:10.1f} µs CPU/respuesta  x{base[grupo] / coste:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,16 +8,92 @@ load_dotenv()
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+    JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", 10000))  # Tokens verificados en memoria
+    JWT_REVOCATION_CHECK = float(os.getenv("JWT_REVOCATION_CHECK", 30))  # Segundos entre consultas a Token_Revocado
     MYSQL_HOST = os.getenv("MYSQL_HOST")
     MYSQL_USER = os.getenv("MYSQL_USER")
     MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
     MYSQL_DB = os.getenv("MYSQL_DB")
+    MYSQL_PORT = int(os.getenv("MYSQL_PORT", 3306))
+
+    # Réplicas de lectura ("host:puerto,host:puerto"); vacío = todo al primario.
+    # Tras escribir, el usuario lee del primario READ_YOUR_WRITES_SECONDS segundos.
+    # Con varios workers esa marca tiene que compartirse: READ_YOUR_WRITES_STORE
+    # es "memory" (por proceso) o una URL redis://; por defecto, la de los límites
+    MYSQL_REPLICAS = os.getenv("MYSQL_REPLICAS", "")
+    MYSQL_REPLICA_RETRY = float(os.getenv("MYSQL_REPLICA_RETRY", 10))
+    READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+    READ_YOUR_WRITES_STORE = os.getenv("READ_YOUR_WRITES_STORE") or os.getenv("RATE_LIMIT_STORE") or "memory"
+
+    # Pool de conexiones MySQL (tiempos en segundos)
+    MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", 10))
+    MYSQL_POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", 5))
+    MYSQL_POOL_MAX_IDLE = float(os.getenv("MYSQL_POOL_MAX_IDLE", 300))
+    MYSQL_POOL_MAX_LIFETIME = float(os.getenv("MYSQL_POOL_MAX_LIFETIME", 3600))
+
+    # Feed personalizado: entradas máximas por usuario en Timeline y seguidores a
+    # partir de los cuales una categoría deja de repartirse y se lee al vuelo;
+    # los timelines que crecen al repartir se recortan cada TIMELINE_TRIM_INTERVAL s
+    TIMELINE_MAX_POSTS = int(os.getenv("TIMELINE_MAX_POSTS", "500"))
+    TIMELINE_FANOUT_LIMIT = int(os.getenv("TIMELINE_FANOUT_LIMIT", "5000"))
+    TIMELINE_TRIM_INTERVAL = float(os.getenv("TIMELINE_TRIM_INTERVAL", "30"))
+
+    # Respuestas más pequeñas que esto (bytes) no se comprimen
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+
+    # Serialización JSON: "auto" usa orjson si está instalado, "json" la librería estándar
+    JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
+
+    # Métricas por petición (/api/metrics y cabecera Server-Timing)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+    # /api/metrics y /api/monitor/pool sin token (solo si no son accesibles desde fuera)
+    MONITOR_PUBLIC = os.getenv("MONITOR_PUBLIC", "0") == "1"
+
+    # Hash de contraseñas en un pool de procesos (0 = en el hilo de la petición),
+    # operaciones en vuelo antes de responder 503 y algoritmo de los hashes nuevos
+    PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", 2))
+    PASSWORD_QUEUE_SIZE = int(os.getenv("PASSWORD_QUEUE_SIZE", 32))
+    PASSWORD_TIMEOUT = float(os.getenv("PASSWORD_TIMEOUT", 10))
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+
+    # Cada cuántos segundos se vuelcan los contadores de likes acumulados
+    LIKES_FLUSH_INTERVAL = float(os.getenv("LIKES_FLUSH_INTERVAL", 2))
+
+    # Tendencias: vida media de la puntuación (horas), cada cuántos segundos se
+    # vuelcan los eventos y se recarga el top, y tamaño del top por ámbito
+    TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", 24))
+    TRENDING_REFRESH_INTERVAL = float(os.getenv("TRENDING_REFRESH_INTERVAL", 30))
+    TRENDING_TOP_K = int(os.getenv("TRENDING_TOP_K", 100))
+
+    # Límites de tasa como "peticiones por segundo/ráfaga": por cliente (usuario
+    # del token o IP) y por IP para todo; RATE_LIMITS ajusta endpoints o
+    # blueprints ("publicacion.buscar_publicaciones=1/5"). RATE_LIMIT_STORE es
+    # "memory" (por proceso) o una URL redis:// compartida entre procesos
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+    RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "10/30")
+    RATE_LIMIT_PER_IP = os.getenv("RATE_LIMIT_PER_IP", "50/200")
+    RATE_LIMITS = os.getenv("RATE_LIMITS", "")
+    RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory")
+    RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+
+    # Control de admisión: peticiones simultáneas por clase de endpoint y espera
+    # máxima (segundos) por un hueco antes de responder 503
+    ADMISSION_LIMITS = os.getenv("ADMISSION_LIMITS", "lectura=16,escritura=8,busqueda=4,exportacion=2")
+    ADMISSION_QUEUE_TARGET = float(os.getenv("ADMISSION_QUEUE_TARGET", 0.1))
     
     # Configuración de Cloudinary
     CLOUDINARY_CLOUD_NAME = os.getenv("CLOUDINARY_CLOUD_NAME")
     CLOUDINARY_API_KEY = os.getenv("CLOUDINARY_API_KEY")
     CLOUDINARY_API_SECRET = os.getenv("CLOUDINARY_API_SECRET")
 
+    # Subidas en segundo plano. UPLOAD_BACKEND=local guarda en disco en lugar de Cloudinary
+    UPLOAD_BACKEND = os.getenv("UPLOAD_BACKEND", "cloudinary")
+    UPLOAD_LOCAL_DIR = os.getenv("UPLOAD_LOCAL_DIR", os.path.join(os.path.dirname(__file__), "static", "uploads"))
+    UPLOAD_LOCAL_URL = os.getenv("UPLOAD_LOCAL_URL", "http://localhost:5000/static/uploads")
+    UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR")
+    UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", 4))
+    UPLOAD_QUEUE_SIZE = int(os.getenv("UPLOAD_QUEUE_SIZE", 100))
+
 # Configuramos el SDK de Cloudinary con las credenciales del .env
 cloudinary.config(
     cloud_name=Config.CLOUDINARY_CLOUD_NAME,
@@ -0,0 +1,132 @@
+# Aplica las migraciones de migrations/ que falten en la base de datos de .env.
+#
+#   python migrate.py               # aplica las pendientes, en orden
+#   python migrate.py --status      # lista aplicadas y pendientes
+#   python migrate.py --baseline 8  # marca 1..8 como aplicadas sin ejecutarlas
+#
+# Cada fichero es NNNN_nombre.sql; la tabla Migracion guarda las versiones
+# aplicadas. ScriptArtCenterDB.sql crea el esquema ya al día, así que solo hace
+# falta en bases de datos creadas antes. --baseline sirve para las que ya
+# recibieron a mano los ALTER de versiones anteriores del README.
+import argparse
+import os
+import re
+import sys
+
+import pymysql
+
+from config import Config
+
+DIRECTORIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+FICHERO = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+
+def conectar():
+    return pymysql.connect(
+        host=Config.MYSQL_HOST,
+        user=Config.MYSQL_USER,
+        password=Config.MYSQL_PASSWORD,
+        db=Config.MYSQL_DB,
+        port=Config.MYSQL_PORT,
+        charset="utf8mb4",
+        autocommit=True
+    )
+
+
+def migraciones():
+    # [(version, nombre, ruta)] ordenadas por versión
+    encontradas = []
+    for fichero in os.listdir(DIRECTORIO):
+        m = FICHERO.match(fichero)
+        if m:
+            encontradas.append((int(m.group(1)), m.group(2), os.path.join(DIRECTORIO, fichero)))
+    encontradas.sort()
+    versiones = [v for v, _, _ in encontradas]
+    if len(set(versiones)) != len(versiones):
+        raise SystemExit("Hay dos migraciones con la misma versión")
+    return encontradas
+
+
+def sentencias(ruta):
+    """Divide un fichero SQL en sentencias, como el cliente mysql.
+
+    Entiende ``DELIMITER`` (los triggers llevan ``;`` dentro del cuerpo) y
+    descarta las líneas de comentario ``--``.
+    """
+    delimitador, actual, salida = ";", [], []
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            limpia = linea.strip()
+            if limpia.upper().startswith("DELIMITER "):
+                delimitador = limpia.split(None, 1)[1]
+                continue
+            if not actual and (not limpia or limpia.startswith("--")):
+                continue
+            actual.append(linea)
+            if limpia.endswith(delimitador):
+                # El cuerpo de los triggers acaba en "END;" antes del delimitador
+                sql = "".join(actual).rstrip()[:-len(delimitador)].strip().rstrip(";").rstrip()
+                if sql:
+                    salida.append(sql)
+                actual = []
+    if "".join(actual).strip():
+        raise SystemExit(f"{os.path.basename(ruta)}: la última sentencia no termina en '{delimitador}'")
+    return salida
+
+
+def aplicadas(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Migracion (
+            version INT PRIMARY KEY,
+            nombre VARCHAR(255) NOT NULL,
+            aplicada DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT version FROM Migracion")
+    return {fila[0] for fila in cursor.fetchall()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aplica las migraciones pendientes")
+    parser.add_argument("--status", action="store_true", help="solo lista el estado de cada migración")
+    parser.add_argument("--baseline", type=int, metavar="N",
+                        help="marca como aplicadas las migraciones hasta N sin ejecutarlas")
+    args = parser.parse_args()
+
+    conn = conectar()
+    cursor = conn.cursor()
+    hechas = aplicadas(cursor)
+    todas = migraciones()
+
+    if args.status:
+        for version, nombre, _ in todas:
+            print(f"{'aplicada ' if version in hechas else 'pendiente'}  {version:04d}_{nombre}")
+        return 0
+
+    if args.baseline is not None:
+        for version, nombre, _ in todas:
+            if version <= args.baseline and version not in hechas:
+                cursor.execute("INSERT INTO Migracion (version, nombre) VALUES (%s, %s)", (version, nombre))
+                print(f"marcada   {version:04d}_{nombre}")
+        return 0
+
+    pendientes = [m for m in todas if m[0] not in hechas]
+    if not pendientes:
+        print("La base de datos está al día")
+    for version, nombre, ruta in pendientes:
+        print(f"aplicando {version:04d}_{nombre}")
+        # MySQL confirma cada DDL por separado: si una sentencia falla, la
+        # migración queda a medias y sin registrar, y hay que terminarla a mano
+        # (o marcarla con --baseline) antes de volver a ejecutar
+        for sql in sentencias(ruta):
+            try:
+                cursor.execute(sql)
+            except pymysql.MySQLError as e:
+                print(f"Error en {version:04d}_{nombre}: {e}\n{sql}", file=sys.stderr)
+                return 1
+        cursor.execute("INSERT INTO Migracion (version, nombre) VALUES (%s, %s)", (version, nombre))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
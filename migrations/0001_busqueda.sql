@@ -0,0 +1,96 @@
+-- Búsqueda de texto completo: documento por publicación con índice FULLTEXT,
+-- la vista que lo construye y los triggers que lo mantienen
+
+-- Documento de búsqueda por publicación (descripción, etiqueta, categoría,
+-- subcategoría y autor) con índice FULLTEXT. La colación ai_ci ignora tildes y
+-- mayúsculas. Lo mantienen los triggers de más abajo.
+CREATE TABLE Publicacion_Busqueda (
+    id_publicacion INT PRIMARY KEY,
+    documento TEXT CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci,
+    FULLTEXT KEY ft_documento (documento),
+    FOREIGN KEY (id_publicacion) REFERENCES Publicacion(id) ON DELETE CASCADE
+);
+
+-- Vista que construye el documento de búsqueda de cada publicación
+CREATE VIEW Vista_Documento_Busqueda AS
+SELECT p.id AS id_publicacion,
+       CONCAT_WS(' ', p.descripcion, e.nombre, c.nombre, s.nombre, u.username) AS documento
+FROM Publicacion p
+JOIN Usuario u ON u.id = p.id_usuario
+LEFT JOIN Etiqueta e ON e.id = p.id_etiqueta
+LEFT JOIN Categoria c ON c.id = e.id_categoria
+LEFT JOIN Subcategoria s ON s.id_categoria = e.id_categoria AND s.id_subcategoria = e.id_subcategoria;
+
+DELIMITER //
+
+-- Triggers que mantienen al día el documento de búsqueda
+CREATE TRIGGER after_insert_publicacion_busqueda
+AFTER INSERT ON Publicacion
+FOR EACH ROW
+BEGIN
+    REPLACE INTO Publicacion_Busqueda (id_publicacion, documento)
+    SELECT id_publicacion, documento FROM Vista_Documento_Busqueda WHERE id_publicacion = NEW.id;
+END;
+//
+
+-- Solo si cambia el texto o la etiqueta: los likes también actualizan Publicacion
+CREATE TRIGGER after_update_publicacion_busqueda
+AFTER UPDATE ON Publicacion
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.descripcion <=> OLD.descripcion AND NEW.id_etiqueta <=> OLD.id_etiqueta) THEN
+        REPLACE INTO Publicacion_Busqueda (id_publicacion, documento)
+        SELECT id_publicacion, documento FROM Vista_Documento_Busqueda WHERE id_publicacion = NEW.id;
+    END IF;
+END;
+//
+
+CREATE TRIGGER after_update_usuario_busqueda
+AFTER UPDATE ON Usuario
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.username <=> OLD.username) THEN
+        REPLACE INTO Publicacion_Busqueda (id_publicacion, documento)
+        SELECT v.id_publicacion, v.documento
+        FROM Vista_Documento_Busqueda v
+        JOIN Publicacion p ON p.id = v.id_publicacion
+        WHERE p.id_usuario = NEW.id;
+    END IF;
+END;
+//
+
+CREATE TRIGGER after_update_categoria_busqueda
+AFTER UPDATE ON Categoria
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.nombre <=> OLD.nombre) THEN
+        REPLACE INTO Publicacion_Busqueda (id_publicacion, documento)
+        SELECT v.id_publicacion, v.documento
+        FROM Vista_Documento_Busqueda v
+        JOIN Publicacion p ON p.id = v.id_publicacion
+        JOIN Etiqueta e ON e.id = p.id_etiqueta
+        WHERE e.id_categoria = NEW.id;
+    END IF;
+END;
+//
+
+CREATE TRIGGER after_update_subcategoria_busqueda
+AFTER UPDATE ON Subcategoria
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.nombre <=> OLD.nombre) THEN
+        REPLACE INTO Publicacion_Busqueda (id_publicacion, documento)
+        SELECT v.id_publicacion, v.documento
+        FROM Vista_Documento_Busqueda v
+        JOIN Publicacion p ON p.id = v.id_publicacion
+        JOIN Etiqueta e ON e.id = p.id_etiqueta
+        WHERE e.id_categoria = NEW.id_categoria AND e.id_subcategoria = NEW.id_subcategoria;
+    END IF;
+END;
+//
+
+DELIMITER ;
+
+-- Rellena el índice de búsqueda con las publicaciones ya existentes
+INSERT IGNORE INTO Publicacion_Busqueda (id_publicacion, documento)
+SELECT id_publicacion, documento FROM Vista_Documento_Busqueda;
@@ -0,0 +1,7 @@
+-- Versión de la taxonomía (categorías, subcategorías y etiquetas). Los handlers
+-- de escritura la incrementan y cada proceso la usa para invalidar su caché.
+CREATE TABLE Taxonomia_Version (
+    id TINYINT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO Taxonomia_Version (id, version) VALUES (1, 0);
@@ -0,0 +1,16 @@
+-- Subidas de imágenes en segundo plano (publicaciones y fotos de perfil)
+CREATE TABLE Subida (
+    id CHAR(32) PRIMARY KEY,
+    id_usuario INT NOT NULL,
+    tipo VARCHAR(20) NOT NULL,
+    estado VARCHAR(20) NOT NULL DEFAULT 'pendiente',
+    progreso TINYINT NOT NULL DEFAULT 0,
+    urlContenido VARCHAR(2083),
+    id_publicacion INT NULL,
+    error VARCHAR(255),
+    fecha_creacion DATETIME DEFAULT CURRENT_TIMESTAMP,
+    CHECK (tipo IN ('publicacion', 'perfil')),
+    CHECK (estado IN ('pendiente', 'subiendo', 'completado', 'error')),
+    FOREIGN KEY (id_usuario) REFERENCES Cuenta(id) ON DELETE CASCADE,
+    FOREIGN KEY (id_publicacion) REFERENCES Publicacion(id) ON DELETE SET NULL
+);
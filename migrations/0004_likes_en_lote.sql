@@ -0,0 +1,3 @@
+-- Publicacion.likes pasa a actualizarse en lote desde la API (utils/like_counter.py)
+DROP TRIGGER IF EXISTS before_insert_like;
+DROP TRIGGER IF EXISTS before_delete_like;
@@ -0,0 +1,14 @@
+-- Timeline precalculado del feed personalizado: al publicar se copia una
+-- entrada por cada seguidor de la categoría o subcategoría (salvo las muy
+-- seguidas). El feed es un recorrido de la clave primaria.
+CREATE TABLE Timeline (
+    id_usuario INT NOT NULL,
+    fecha_publicacion DATETIME NOT NULL,
+    id_publicacion INT NOT NULL,
+    PRIMARY KEY (id_usuario, fecha_publicacion, id_publicacion),
+    FOREIGN KEY (id_usuario) REFERENCES Usuario(id) ON DELETE CASCADE,
+    FOREIGN KEY (id_publicacion) REFERENCES Publicacion(id) ON DELETE CASCADE
+);
+
+-- Lectura al vuelo de las categorías populares del feed personalizado
+ALTER TABLE Publicacion ADD INDEX idx_publicacion_etiqueta_fecha (id_etiqueta, fecha_publicacion);
@@ -0,0 +1,3 @@
+-- Puntuación de tendencia (utils/trending.py) y el índice del que sale el top
+ALTER TABLE Publicacion ADD COLUMN trending_score DOUBLE NULL,
+                        ADD INDEX idx_publicacion_trending (trending_score);
@@ -0,0 +1,3 @@
+-- Miniatura y versión mediana de cada imagen publicada
+ALTER TABLE Publicacion ADD COLUMN urlMiniatura VARCHAR(2083) NULL AFTER urlContenido,
+                        ADD COLUMN urlMediana VARCHAR(2083) NULL AFTER urlMiniatura;
@@ -0,0 +1,20 @@
+-- Índices de las consultas calientes, comprobados con benchmarks.explain_check
+
+-- Feed general: ORDER BY fecha_publicacion DESC, id DESC con cursor
+ALTER TABLE Publicacion ADD INDEX idx_publicacion_fecha (fecha_publicacion, id);
+
+-- Mis publicaciones: WHERE id_usuario = ? ORDER BY fecha_publicacion DESC, id DESC
+-- (sustituye al índice implícito de la clave foránea)
+ALTER TABLE Publicacion ADD INDEX idx_publicacion_usuario_fecha (id_usuario, fecha_publicacion, id);
+
+-- Comentarios de una publicación por (fecha_publicacion, id)
+ALTER TABLE Comentario ADD INDEX idx_comentario_publicacion_fecha (id_publicacion, fecha_publicacion, id);
+
+-- Comprobaciones de nombre repetido al crear categorías y subcategorías
+ALTER TABLE Categoria ADD INDEX idx_categoria_nombre (nombre);
+-- El índice (id_categoria, id_subcategoria) va explícito y en la misma
+-- sentencia: MySQL puede retirar el implícito de la clave foránea
+-- (id_categoria), que es el que respalda las claves de Etiqueta y
+-- Usuario_Guarda_Subcategoria hacia (id_categoria, id_subcategoria)
+ALTER TABLE Subcategoria ADD INDEX idx_subcategoria_categoria_id (id_categoria, id_subcategoria),
+                         ADD INDEX idx_subcategoria_categoria_nombre (id_categoria, nombre);
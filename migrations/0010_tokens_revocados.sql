@@ -0,0 +1,7 @@
+-- Tokens revocados al cerrar sesión, compartidos por todos los workers y
+-- persistentes entre reinicios (utils/jwt_utils.py)
+CREATE TABLE Token_Revocado (
+    digest CHAR(64) PRIMARY KEY,
+    exp DATETIME NOT NULL,
+    INDEX idx_token_revocado_exp (exp)
+);
@@ -0,0 +1,3 @@
+-- Instante de cada like: al quitarlo se resta de la tendencia exactamente lo
+-- que sumó (utils/trending.py). Los likes existentes toman la hora actual
+ALTER TABLE Usuario_Da_Like ADD COLUMN fecha DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3);
@@ -1,13 +1,377 @@
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from functools import wraps
+
 import pymysql
-from flask import current_app
-
-def get_connection():
-    return pymysql.connect(
-        host=current_app.config["MYSQL_HOST"],
-        user=current_app.config["MYSQL_USER"],
-        password=current_app.config["MYSQL_PASSWORD"],
-        db=current_app.config["MYSQL_DB"],
-        charset="utf8mb4",
-        cursorclass=pymysql.cursors.Cursor,
-        autocommit=True
+from pymysql.constants import SERVER_STATUS
+from flask import current_app, g, request
+from utils.metrics import InstrumentedCursor, request_stats
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """No quedó ninguna conexión libre dentro del tiempo de espera."""
+
+
+class ConnectionPool:
+    """Pool acotado de conexiones PyMySQL.
+
+    Las conexiones se validan al sacarlas (ping si llevan un rato paradas) y
+    se descartan cuando superan el tiempo máximo ocioso o de vida.
+    """
+
+    def __init__(self, connect_kwargs, max_size=10, timeout=5.0,
+                 max_idle=300.0, max_lifetime=3600.0, ping_after=1.0):
+        self.connect_kwargs = connect_kwargs
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.ping_after = ping_after
+
+        self._lock = threading.Condition()
+        self._idle = deque()        # (conexion, creada_en, usada_en)
+        self._created_at = {}       # id(conexion) -> instante de creación
+        self._in_use = 0
+        self._waiting = 0
+        self._stats = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "timeouts": 0,
+            "failed_pings": 0,
+        }
+
+    def _connect(self):
+        conn = pymysql.connect(**self.connect_kwargs)
+        self._created_at[id(conn)] = time.monotonic()
+        self._stats["created"] += 1
+        return conn
+
+    def _discard(self, conn):
+        self._created_at.pop(id(conn), None)
+        self._stats["closed"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _expired(self, created_at, used_at, now):
+        return (now - used_at > self.max_idle) or (now - created_at > self.max_lifetime)
+
+    def acquire(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                # Tiramos las conexiones caducadas antes de repartir
+                while self._idle and self._expired(self._idle[0][1], self._idle[0][2], now):
+                    self._discard(self._idle.popleft()[0])
+
+                if self._idle:
+                    conn, created_at, used_at = self._idle.pop()
+                    break
+                if self._in_use < self.max_size:
+                    conn, used_at = None, now
+                    break
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout("No hay conexiones disponibles en el pool")
+                waited = True
+                self._waiting += 1
+                try:
+                    self._lock.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+            self._in_use += 1
+            self._stats["checkouts"] += 1
+            if waited:
+                wait_time = time.monotonic() - start
+                self._stats["waits"] += 1
+                self._stats["wait_time_total"] += wait_time
+                self._stats["wait_time_max"] = max(self._stats["wait_time_max"], wait_time)
+
+        # Conectar y hacer ping fuera del lock para no bloquear al resto
+        try:
+            if conn is None:
+                conn = self._connect()
+            elif time.monotonic() - used_at > self.ping_after:
+                try:
+                    conn.ping(reconnect=False)
+                except Exception:
+                    with self._lock:
+                        self._stats["failed_pings"] += 1
+                        self._discard(conn)
+                    conn = self._connect()
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+        return conn
+
+    def release(self, conn, broken=False):
+        # Si el handler dejó una transacción abierta la deshacemos
+        if not broken and conn.open and conn.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+
+        with self._lock:
+            self._in_use -= 1
+            created_at = self._created_at.get(id(conn))
+            now = time.monotonic()
+            if broken or not conn.open or created_at is None or now - created_at > self.max_lifetime:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, created_at, now))
+            self._lock.notify()
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+            data.update({
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+            })
+        return data
+
+
+class PooledConnection:
+    """Conexión prestada para una petición.
+
+    Delega todo en la conexión real salvo ``close()``: las rutas siguen
+    llamándolo, pero la conexión se devuelve al pool en el teardown. Los
+    cursores se envuelven para medir las consultas de la petición.
+    """
+
+    def __init__(self, conn, pool):
+        self._conn = conn
+        self._pool = pool
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, cursor=None):
+        cur = self._conn.cursor(cursor)
+        if current_app.config["METRICS_ENABLED"]:
+            return InstrumentedCursor(cur, request_stats())
+        return cur
+
+    def close(self):
+        pass
+
+
+class ReplicaSet:
+    """Pools de las réplicas de lectura, repartidas en round-robin.
+
+    Una réplica que no acepta conexiones se aparta ``retry_after`` segundos;
+    si no queda ninguna disponible la lectura va al primario.
+    """
+
+    def __init__(self, pools, retry_after=10.0):
+        self.pools = pools
+        self.retry_after = retry_after
+        self._next = itertools.count()
+        self._down_until = [0.0] * len(pools)
+
+    def acquire(self):
+        start = next(self._next)
+        for i in range(len(self.pools)):
+            idx = (start + i) % len(self.pools)
+            if self._down_until[idx] > time.monotonic():
+                continue
+            pool = self.pools[idx]
+            try:
+                return pool, pool.acquire()
+            except pymysql.err.OperationalError:
+                logger.warning("Réplica %s no disponible", pool.connect_kwargs["host"], exc_info=True)
+                self._down_until[idx] = time.monotonic() + self.retry_after
+            except PoolTimeout:
+                pass
+        return None, None
+
+    def stats(self):
+        now = time.monotonic()
+        return [{
+            "host": "{}:{}".format(pool.connect_kwargs["host"], pool.connect_kwargs["port"]),
+            "down": self._down_until[i] > now,
+            **pool.stats()
+        } for i, pool in enumerate(self.pools)]
+
+
+class ReadYourWrites:
+    """Usuarios que acaban de escribir y deben leer del primario un rato.
+
+    En memoria del proceso: solo vale con un único worker. Con varios, la
+    siguiente petición suele caer en otro proceso; para eso ``RedisReadYourWrites``.
+    """
+
+    def __init__(self, window=5.0):
+        self.window = window
+        self._lock = threading.Lock()
+        self._until = {}
+
+    def pin(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._until) > 10000:
+                self._until = {u: t for u, t in self._until.items() if t > now}
+            self._until[user_id] = now + self.window
+
+    def pinned(self, user_id):
+        return self._until.get(user_id, 0.0) > time.monotonic()
+
+
+class RedisReadYourWrites:
+    """La misma ventana compartida entre procesos: una clave por usuario que
+    caduca sola. Si Redis no responde se lee del primario, que siempre está al día.
+    """
+
+    def __init__(self, url, window=5.0, prefijo="artcenter:ryw:"):
+        import redis
+        self.window = window
+        self._cliente = redis.Redis.from_url(url, socket_timeout=0.05)
+        self._prefijo = prefijo
+
+    def pin(self, user_id):
+        try:
+            self._cliente.set(f"{self._prefijo}{user_id}", 1, px=int(self.window * 1000))
+        except Exception:
+            logger.warning("No se pudo marcar al usuario %s para leer del primario", user_id, exc_info=True)
+
+    def pinned(self, user_id):
+        try:
+            return bool(self._cliente.exists(f"{self._prefijo}{user_id}"))
+        except Exception:
+            return True
+
+
+def pin_to_primary(user_id, app=None):
+    # Tras una escritura fuera de la petición (subidas en segundo plano)
+    (app or current_app).extensions["read_your_writes"].pin(user_id)
+
+
+def _parse_host(host, default_port=3306):
+    host, _, port = host.strip().partition(":")
+    return host, int(port or default_port)
+
+
+def _build_pool(config, host=None):
+    # Sin MYSQL_HOST PyMySQL usaba localhost; se mantiene
+    host, port = _parse_host(host or config["MYSQL_HOST"] or "localhost", config["MYSQL_PORT"])
+    return ConnectionPool(
+        connect_kwargs={
+            "host": host,
+            "port": port,
+            "user": config["MYSQL_USER"],
+            "password": config["MYSQL_PASSWORD"],
+            "db": config["MYSQL_DB"],
+            "charset": "utf8mb4",
+            "cursorclass": pymysql.cursors.Cursor,
+            "autocommit": True,
+        },
+        max_size=config["MYSQL_POOL_SIZE"],
+        timeout=config["MYSQL_POOL_TIMEOUT"],
+        max_idle=config["MYSQL_POOL_MAX_IDLE"],
+        max_lifetime=config["MYSQL_POOL_MAX_LIFETIME"],
     )
+
+
+def get_pool(app=None):
+    app = app or current_app
+    pool = app.extensions.get("mysql_pool")
+    if pool is None:
+        pool = app.extensions["mysql_pool"] = _build_pool(app.config)
+    return pool
+
+
+def get_replicas(app=None):
+    app = app or current_app
+    replicas = app.extensions.get("mysql_replicas")
+    if replicas is None:
+        hosts = [h for h in app.config["MYSQL_REPLICAS"].split(",") if h.strip()]
+        replicas = app.extensions["mysql_replicas"] = ReplicaSet(
+            [_build_pool(app.config, host) for host in hosts], app.config["MYSQL_REPLICA_RETRY"]
+        )
+    return replicas
+
+
+def read_only(view):
+    """Marca un handler que solo lee: sus consultas pueden ir a una réplica."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.read_only = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _read_connection():
+    # Réplica para el resto de la petición; False si no hay ninguna disponible
+    conn = g.get("db_read_conn")
+    if conn is None:
+        pool, raw = get_replicas().acquire()
+        conn = g.db_read_conn = PooledConnection(raw, pool) if raw is not None else False
+    return conn
+
+
+def get_connection(primary=False):
+    # Una sola conexión por petición, guardada en flask.g. Los handlers de solo
+    # lectura usan una réplica salvo que el usuario haya escrito hace poco.
+    if not primary and g.get("read_only") and get_replicas().pools:
+        user = getattr(request, "user", None)
+        if not (user and current_app.extensions["read_your_writes"].pinned(user["id"])):
+            conn = _read_connection()
+            if conn:
+                return conn
+
+    conn = g.get("db_conn")
+    if conn is None:
+        pool = get_pool()
+        conn = g.db_conn = PooledConnection(pool.acquire(), pool)
+    return conn
+
+
+def release_connection(exc=None):
+    broken = isinstance(exc, pymysql.err.OperationalError)
+    for key in ("db_conn", "db_read_conn"):
+        conn = g.pop(key, None)
+        if conn:
+            conn._pool.release(conn._conn, broken=broken)
+
+
+def _pin_after_write(response):
+    # Tras una escritura correcta el usuario lee del primario durante un rato
+    user = getattr(request, "user", None)
+    if (user and not g.get("read_only") and request.method not in ("GET", "HEAD", "OPTIONS")
+            and response.status_code < 400):
+        current_app.extensions["read_your_writes"].pin(user["id"])
+    return response
+
+
+def init_app(app):
+    get_pool(app)
+    get_replicas(app)
+    url = app.config["READ_YOUR_WRITES_STORE"]
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        app.extensions["read_your_writes"] = RedisReadYourWrites(url, app.config["READ_YOUR_WRITES_SECONDS"])
+    else:
+        app.extensions["read_your_writes"] = ReadYourWrites(app.config["READ_YOUR_WRITES_SECONDS"])
+    app.teardown_appcontext(release_connection)
+    app.after_request(_pin_after_write)
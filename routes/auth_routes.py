@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
-from models import get_connection
-from utils.jwt_utils import generate_token
+from models import get_connection, release_connection
+from utils.jwt_utils import generate_token, revoke_token
+from utils.auth_decorator import jwt_required, bearer_token
+from utils.passwords import get_password_hasher
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -18,15 +19,23 @@ def register():
     # Verificar si el email ya existe en la base de datos
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT id FROM Cuenta WHERE email = %s", (email,))
-    existing_user = cursor.fetchone()
+    try:
+        cursor.execute("SELECT id FROM Cuenta WHERE email = %s", (email,))
+        existing_user = cursor.fetchone()
+    finally:
+        cursor.close()
+        # La conexión vuelve al pool mientras se calcula el hash, que puede
+        # esperar hasta PASSWORD_TIMEOUT en el pool de procesos
+        release_connection()
 
     if existing_user:
         return jsonify({"msg": "El correo electrónico ya está registrado"}), 409
 
+    # El hash se calcula en el pool de procesos (ver utils/passwords.py)
+    hashed = get_password_hasher().hash(password)
 
-    hashed = generate_password_hash(password)
-
+    conn = get_connection()
+    cursor = conn.cursor()
     try:
         cursor.execute("INSERT INTO Cuenta (email, contrasena) VALUES (%s, %s)", (email, hashed))
         user_id = cursor.lastrowid
@@ -41,28 +50,61 @@ def register():
         conn.close()
 
 @auth_bp.route('/login', methods=['POST'])
-def login():    
+def login():
     data = request.get_json()
     email = data.get("email")
     password = data.get("contrasena")
 
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT id, contrasena FROM Cuenta WHERE email = %s", (email,))
-    cuenta = cursor.fetchone()
+    try:
+        # Cuenta y rol en una sola consulta
+        cursor.execute("""
+            SELECT c.id, c.contrasena, (a.id IS NOT NULL) AS es_admin
+            FROM Cuenta c
+            LEFT JOIN Administrador a ON a.id = c.id
+            WHERE c.email = %s
+        """, (email,))
+        cuenta = cursor.fetchone()
+    finally:
+        cursor.close()
+        # Sin conexión retenida mientras se verifica la contraseña
+        release_connection()
 
-    if not cuenta:
+    if not cuenta or not password:
         return jsonify({"msg": "Credenciales incorrectas"}), 401
 
-    user_id, stored_hash = cuenta
+    user_id, stored_hash, es_admin = cuenta
 
-    if not check_password_hash(stored_hash, password):
+    correcta, nuevo_hash = get_password_hasher().verify(stored_hash, password)
+    if not correcta:
         return jsonify({"msg": "Credenciales incorrectas"}), 401
 
-    # Verifica si es admin o usuario
-    cursor.execute("SELECT id FROM Administrador WHERE id = %s", (user_id,))
-    admin = cursor.fetchone()
-    rol = "admin" if admin else "usuario"
+    # Hash con parámetros antiguos: se rehace ahora que tenemos la contraseña en claro
+    if nuevo_hash:
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                UPDATE Cuenta SET contrasena = %s WHERE id = %s AND contrasena = %s
+            """, (nuevo_hash, user_id, stored_hash))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+    rol = "admin" if es_admin else "usuario"
 
     token = generate_token({"id": user_id, "rol": rol})
     return jsonify({"token": token, "rol": rol, "id": user_id}), 200
+
+
+# Revoca el token actual: deja de aceptarse aunque no haya caducado
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required
+def logout():
+    try:
+        revoke_token(bearer_token())
+    except Exception as e:
+        return jsonify({"msg": f"Error al cerrar sesión: {str(e)}"}), 500
+    return jsonify({"msg": "Sesión cerrada"}), 200
@@ -0,0 +1,179 @@
+from flask import Blueprint, request, jsonify
+from models import get_connection
+from utils.auth_decorator import jwt_required
+from utils.like_counter import get_like_counter
+from utils.trending import get_trending, LIKE_WEIGHT, COMMENT_WEIGHT
+
+batch_bp = Blueprint("batch", __name__)
+
+MAX_OPERACIONES = 500
+LOTE = 500
+
+# Operaciones de activar/desactivar, la tabla de relación que tocan y lo que
+# se guarda de cada fila quitada (el instante del like, para la tendencia)
+RELACIONES = {
+    "like": ("Usuario_Da_Like", "UNIX_TIMESTAMP(fecha)"),
+    "guardar": ("Usuario_Guarda_Publicacion", "NULL"),
+}
+TIPOS = (*RELACIONES, "comentario")
+
+
+def _validar(operaciones):
+    # Errores de formato de todas las operaciones a la vez, con su índice
+    errores = []
+    for i, op in enumerate(operaciones):
+        if not isinstance(op, dict):
+            errores.append({"indice": i, "msg": "Cada operación debe ser un objeto"})
+            continue
+        tipo = op.get("tipo")
+        id_publicacion = op.get("id_publicacion")
+        if tipo not in TIPOS:
+            errores.append({"indice": i, "msg": f"'tipo' debe ser uno de: {', '.join(TIPOS)}"})
+        elif not isinstance(id_publicacion, int) or isinstance(id_publicacion, bool):
+            errores.append({"indice": i, "msg": "'id_publicacion' debe ser un entero"})
+        elif tipo in RELACIONES and not isinstance(op.get("valor"), bool):
+            errores.append({"indice": i, "msg": "'valor' debe ser true o false"})
+        elif tipo == "comentario" and (not isinstance(op.get("contenido"), str) or not op["contenido"].strip()):
+            errores.append({"indice": i, "msg": "El campo 'contenido' es obligatorio"})
+    return errores
+
+
+def _marcadores(n):
+    return ", ".join(["%s"] * n)
+
+
+def _aplicar_relacion(cursor, tabla, dato, user_id, ops):
+    """Aplica en ``tabla`` las operaciones ``[(indice, id_publicacion, valor)]``.
+
+    Se leen (y bloquean) las filas actuales del usuario, se simula la lista en
+    orden para saber qué cambia cada operación y solo se escribe el estado
+    final: un INSERT IGNORE y un DELETE como mucho por cada 500 publicaciones.
+    Devuelve ``({indice: cambiado}, {id_publicacion: +1/-1}, {id_publicacion: dato})``,
+    el último con ``dato`` de cada fila quitada.
+    """
+    ids = list(dict.fromkeys(id for _, id, _ in ops))
+    previo = {}
+    for n in range(0, len(ids), LOTE):
+        lote = ids[n:n + LOTE]
+        cursor.execute(f"""
+            SELECT id_publicacion, {dato} FROM {tabla}
+            WHERE id_usuario = %s AND id_publicacion IN ({_marcadores(len(lote))})
+            FOR UPDATE
+        """, (user_id, *lote))
+        previo.update(cursor.fetchall())
+
+    estado = {id: id in previo for id in ids}
+    cambiados = {}
+    for indice, id, valor in ops:
+        cambiados[indice] = estado[id] != valor
+        estado[id] = valor
+
+    poner = [id for id in ids if estado[id] and id not in previo]
+    quitar = [id for id in ids if not estado[id] and id in previo]
+    for n in range(0, len(poner), LOTE):
+        lote = poner[n:n + LOTE]
+        cursor.execute(f"INSERT IGNORE INTO {tabla} (id_usuario, id_publicacion) VALUES "
+                       + ", ".join(["(%s, %s)"] * len(lote)),
+                       [v for id in lote for v in (user_id, id)])
+    for n in range(0, len(quitar), LOTE):
+        lote = quitar[n:n + LOTE]
+        cursor.execute(f"DELETE FROM {tabla} WHERE id_usuario = %s AND id_publicacion IN ({_marcadores(len(lote))})",
+                       (user_id, *lote))
+    return cambiados, {**{id: 1 for id in poner}, **{id: -1 for id in quitar}}, {id: previo[id] for id in quitar}
+
+
+def _crear_comentarios(cursor, user_id, ops):
+    """Inserta los comentarios ``[(indice, id_publicacion, contenido)]`` en orden.
+
+    De uno en uno: los ids de un INSERT multi-fila solo son consecutivos con
+    ``auto_increment_increment = 1`` y el bloqueo de autoincremento adecuado,
+    y cada id hace falta en la respuesta. Devuelve ``{indice: id}``.
+    """
+    ids = {}
+    for indice, id, contenido in ops:
+        cursor.execute("""
+            INSERT INTO Comentario (id_usuario, id_publicacion, contenido, fecha_publicacion)
+            VALUES (%s, %s, %s, NOW())
+        """, (user_id, id, contenido))
+        ids[indice] = cursor.lastrowid
+    return ids
+
+
+# Lote de interacciones de un cliente que estuvo sin conexión: likes y
+# guardados explícitos (valor true/false, no alternan) y comentarios nuevos, en
+# una sola transacción. Responde un resultado por operación, en el mismo orden;
+# las que apuntan a publicaciones que ya no existen fallan sin afectar al resto
+@batch_bp.route('/batch', methods=['POST'])
+@jwt_required
+def procesar_lote():
+    user_id = request.user['id']
+    if request.user['rol'] == 'admin':
+        return jsonify({"msg": "No autorizado"}), 403
+    data = request.get_json(silent=True) or {}
+    operaciones = data.get("operaciones")
+
+    if not isinstance(operaciones, list) or not operaciones:
+        return jsonify({"msg": "Debes proporcionar una lista 'operaciones'"}), 400
+    if len(operaciones) > MAX_OPERACIONES:
+        return jsonify({"msg": f"Como máximo {MAX_OPERACIONES} operaciones por lote"}), 400
+    errores = _validar(operaciones)
+    if errores:
+        return jsonify({"msg": "Lote no válido", "errores": errores}), 400
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        # Publicaciones existentes, de una vez para todo el lote
+        ids = list(dict.fromkeys(op["id_publicacion"] for op in operaciones))
+        existentes = set()
+        for n in range(0, len(ids), LOTE):
+            lote = ids[n:n + LOTE]
+            cursor.execute(f"SELECT id FROM Publicacion WHERE id IN ({_marcadores(len(lote))})", lote)
+            existentes.update(f[0] for f in cursor.fetchall())
+
+        resultados = [None] * len(operaciones)
+        por_tipo = {tipo: [] for tipo in TIPOS}
+        for i, op in enumerate(operaciones):
+            if op["id_publicacion"] not in existentes:
+                resultados[i] = {"indice": i, "estado": "error", "msg": "Publicación no encontrada"}
+            elif op["tipo"] == "comentario":
+                por_tipo["comentario"].append((i, op["id_publicacion"], op["contenido"]))
+            else:
+                por_tipo[op["tipo"]].append((i, op["id_publicacion"], op["valor"]))
+
+        # El pool trabaja en autocommit: todo el lote va en una transacción explícita
+        conn.begin()
+        deltas_likes, likes_quitados = {}, {}
+        for tipo, (tabla, dato) in RELACIONES.items():
+            if not por_tipo[tipo]:
+                continue
+            cambiados, deltas, quitados = _aplicar_relacion(cursor, tabla, dato, user_id, por_tipo[tipo])
+            for i, cambiado in cambiados.items():
+                resultados[i] = {"indice": i, "estado": "ok", "cambiado": cambiado}
+            if tipo == "like":
+                deltas_likes, likes_quitados = deltas, quitados
+        for i, id_comentario in _crear_comentarios(cursor, user_id, por_tipo["comentario"]).items():
+            resultados[i] = {"indice": i, "estado": "ok", "id_comentario": id_comentario}
+        conn.commit()
+
+        # Contadores y tendencias, como en los endpoints de una en una
+        like_counter, trending = get_like_counter(), get_trending()
+        for id, delta in deltas_likes.items():
+            like_counter.record(id, delta)
+            if delta > 0:
+                trending.record(id, LIKE_WEIGHT)
+            else:
+                trending.record(id, -LIKE_WEIGHT, at=float(likes_quitados[id]))
+        for _, id, _ in por_tipo["comentario"]:
+            trending.record(id, COMMENT_WEIGHT)
+
+        fallidas = sum(r["estado"] == "error" for r in resultados)
+        return jsonify({"resultados": resultados, "aplicadas": len(resultados) - fallidas,
+                        "fallidas": fallidas}), 200
+
+    except Exception as e:
+        conn.rollback()
+        return jsonify({"msg": f"Error al procesar el lote: {str(e)}"}), 500
+    finally:
+        cursor.close()
+        conn.close()
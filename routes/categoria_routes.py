@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
-from models import get_connection
+from models import get_connection, read_only
 from utils.auth_decorator import jwt_required
+from utils.taxonomy_cache import taxonomy_cache, cached_response, list_response
+from utils.bulk import BulkError, read_rows, validate, repeated, existing, conflicts, insert_many
 
 categoria_bp = Blueprint("categoria", __name__)
 
@@ -30,6 +32,7 @@ def crear_categoria():
             "INSERT INTO Categoria (nombre, descripcion) VALUES (%s, %s)",
             (nombre, descripcion)
         )
+        taxonomy_cache.invalidate(cursor)
         conn.commit()
         return jsonify({"msg": "Categoría creada correctamente"}), 201
     except Exception as e:
@@ -40,37 +43,85 @@ def crear_categoria():
         conn.close()
 
 
-@categoria_bp.route('/categorias', methods=['GET'])
+# Alta masiva de categorías (JSON o CSV). Todo se valida antes de escribir y se
+# inserta en una sola transacción; los nombres ya existentes son un 409, o se
+# saltan con ?duplicados=omitir. Un nombre que ya tiene otra etiqueta es
+# siempre un 409
+@categoria_bp.route('/categorias/bulk', methods=['POST'])
 @jwt_required
-def obtener_categorias():
+def crear_categorias_bulk():
+    if request.user['rol'] != 'admin':
+        return jsonify({"msg": "No autorizado"}), 403
+    omitir = request.args.get('duplicados') == 'omitir'
+
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT id, nombre FROM Categoria")
-    categorias = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    try:
+        filas = validate(read_rows("categorias"), ("nombre", "descripcion"))
+        errores = repeated((f["nombre"],) for f in filas)
+        if errores:
+            raise BulkError(errores)
+
+        nombres = [(f["nombre"],) for f in filas]
+        duplicadas = existing(cursor, "JOIN Categoria c ON c.nombre = t.nombre", ("nombre",), nombres)
+        # El trigger crea una etiqueta con el nombre de cada categoría y
+        # Etiqueta.nombre es único: un nombre ya usado por otra etiqueta no entra
+        ocupadas = existing(cursor, "JOIN Etiqueta e ON e.nombre = t.nombre", ("nombre",), nombres) - duplicadas
+        if ocupadas or (duplicadas and not omitir):
+            return jsonify({"msg": "Ya existen categorías o etiquetas con esos nombres",
+                            "errores": conflicts(set() if omitir else duplicadas, ocupadas)}), 409
+
+        nuevas = [(f["nombre"], f["descripcion"]) for i, f in enumerate(filas, 1) if i not in duplicadas]
+        # El pool trabaja en autocommit: sin begin() cada lote se confirmaría por separado
+        conn.begin()
+        insert_many(cursor, "INSERT INTO Categoria (nombre, descripcion) VALUES (%s, %s)", nuevas)
+        if nuevas:
+            taxonomy_cache.invalidate(cursor)
+        conn.commit()
+        return jsonify({"msg": "Categorías creadas correctamente", "creadas": len(nuevas),
+                        "omitidas": len(duplicadas)}), 201
+    except BulkError as e:
+        return jsonify({"msg": "Carga no válida", "errores": e.errores}), 400
+    except Exception as e:
+        conn.rollback()
+        return jsonify({"msg": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
+
 
-    return jsonify([{"id": c[0], "nombre": c[1]} for c in categorias])
+@categoria_bp.route('/categorias', methods=['GET'])
+@jwt_required
+@read_only
+def obtener_categorias():
+    taxonomia = taxonomy_cache.get()
+    return list_response(taxonomia, "lista_categorias", "categorias")
 
 
 @categoria_bp.route('/categorias/<int:id>', methods=['GET'])
 @jwt_required
+@read_only
 def obtener_categoria_por_id(id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, nombre, descripcion FROM Categoria WHERE id = %s", (id,))
-    categoria = cursor.fetchone()
-    cursor.close()
-    conn.close()
+    taxonomia = taxonomy_cache.get()
+    categoria = taxonomia.categorias.get(id)
 
     if not categoria:
         return jsonify({"msg": "Categoría no encontrada"}), 404
 
-    return jsonify({
-        "id": categoria[0],
-        "nombre": categoria[1],
-        "descripcion": categoria[2]
-    })
+    return cached_response(taxonomia, {
+        "id": categoria["id"],
+        "nombre": categoria["nombre"],
+        "descripcion": categoria["descripcion"]
+    }, key=id)
+
+
+# Árbol completo categoría → subcategorías → etiquetas, servido desde memoria
+@categoria_bp.route('/taxonomia', methods=['GET'])
+@jwt_required
+@read_only
+def obtener_taxonomia():
+    taxonomia = taxonomy_cache.get()
+    return cached_response(taxonomia, "tree")
 
 @categoria_bp.route('/categorias/<int:id>', methods=['DELETE'])
 @jwt_required
@@ -90,6 +141,7 @@ def eliminar_categoria(id):
 
     try:
         cursor.execute("DELETE FROM Categoria WHERE id = %s", (id,))
+        taxonomy_cache.invalidate(cursor)
         conn.commit()
         return jsonify({"msg": "Categoría eliminada correctamente"}), 200
     except Exception as e:
@@ -128,6 +180,7 @@ def editar_categoria(id):
             "UPDATE Categoria SET nombre = %s, descripcion = %s WHERE id = %s",
             (nombre, descripcion, id)
         )
+        taxonomy_cache.invalidate(cursor)
         conn.commit()
         return jsonify({"msg": "Categoría actualizada correctamente"}), 200
     except Exception as e:
@@ -1,58 +1,109 @@
 from flask import Blueprint, request, jsonify
-from models import get_connection
+import pymysql
+from models import get_connection, read_only
 from utils.auth_decorator import jwt_required
+from utils.pagination import (COMENTARIOS_POR_PAGINA, MAX_COMENTARIOS_POR_PAGINA, parse_page_args,
+                              keyset_condition, split_page)
+from utils.serializers import COMENTARIO
+from utils.streaming import ndjson_response, json_array_response
+from utils.trending import get_trending, COMMENT_WEIGHT
 
 comentario_bp = Blueprint("comentario", __name__)
 
-# 1) Obtener todos los comentarios de una publicación
+# 1) Obtener los comentarios de una publicación
+# Orden (fecha_publicacion, id) ascendente. Con ``cursor`` se pagina por keyset
+# de ``limit`` en ``limit``; con ``stream=1`` se envía NDJSON fila a fila desde
+# un cursor de servidor. Sin ninguno de los dos se mantiene la lista completa,
+# que también se emite según se lee para no materializarla entera.
+# La existencia de la publicación sale de la misma consulta (LEFT JOIN).
 @comentario_bp.route('/publicaciones/<int:id_publicacion>/comentarios', methods=['GET'])
 @jwt_required
+@read_only
 def obtener_comentarios_por_publicacion(id_publicacion):
+    try:
+        keyset, _, cursor_mode = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    ndjson = request.args.get('stream', '') in ('1', 'true')
+    stream = ndjson or not cursor_mode
+    # El límite se acota igual en todos los modos; sin él, streaming devuelve todo
+    limit = request.args.get('limit')
+    if limit is not None:
+        try:
+            limit = min(max(int(limit), 1), MAX_COMENTARIOS_POR_PAGINA)
+        except ValueError:
+            return jsonify({"msg": "'limit' debe ser un entero"}), 400
+    if cursor_mode and not stream:
+        limit = limit or COMENTARIOS_POR_PAGINA
+    condicion, params_cursor = keyset_condition(keyset, "c.fecha_publicacion", "c.id", descending=False)
+
+    sql = """
+        SELECT c.id,
+               c.id_usuario,
+               u.username,
+               c.contenido,
+               c.fecha_publicacion
+        FROM Publicacion p
+        LEFT JOIN Comentario c
+          ON c.id_publicacion = p.id
+         AND {condicion}
+        LEFT JOIN Usuario u ON c.id_usuario = u.id
+        WHERE p.id = %s
+        ORDER BY c.fecha_publicacion ASC, c.id ASC
+    """.format(condicion=condicion)
+    params = (*params_cursor, id_publicacion)
+    if limit:
+        sql += " LIMIT %s"
+        # Una fila de más para saber si hay página siguiente
+        params += (limit + 1 if cursor_mode and not stream else limit,)
+
     conn = get_connection()
-    cursor = conn.cursor()
+    cursor = conn.cursor(pymysql.cursors.SSCursor if stream else pymysql.cursors.Cursor)
     try:
-        # Verificamos que la publicación exista
-        cursor.execute("SELECT id FROM Publicacion WHERE id = %s", (id_publicacion,))
-        publicacion = cursor.fetchone()
-        if not publicacion:
+        cursor.execute(sql, params)
+        primera = cursor.fetchone()
+        if not primera:
+            cursor.close()
             return jsonify({"msg": "Publicación no encontrada"}), 404
+    except Exception as e:
+        cursor.close()
+        return jsonify({"msg": f"Error al obtener comentarios: {str(e)}"}), 500
 
-        # Obtenemos todos los comentarios y el username del autor
-        cursor.execute("""
-            SELECT c.id,
-                   c.id_usuario,
-                   u.username,
-                   c.contenido,
-                   c.fecha_publicacion
-            FROM Comentario c
-            JOIN Usuario u ON c.id_usuario = u.id
-            WHERE c.id_publicacion = %s
-            ORDER BY c.fecha_publicacion ASC
-        """, (id_publicacion,))
-        filas = cursor.fetchall()
-        comentarios = []
-        for fila in filas:
-            comentarios.append({
-                "id": fila[0],
-                "id_usuario": fila[1],
-                "username": fila[2],
-                "contenido": fila[3],
-                "fecha_publicacion": fila[4]
-            })
-
-        return jsonify(comentarios), 200
+    if primera[0] is None:
+        cursor.close()
+        if ndjson:
+            return ndjson_response([], COMENTARIO.row)
+        return jsonify({"comentarios": [], "next_cursor": None} if cursor_mode else []), 200
+
+    if stream:
+        def filas():
+            try:
+                yield primera
+                yield from cursor
+            finally:
+                cursor.close()
+        return (ndjson_response if ndjson else json_array_response)(filas(), COMENTARIO.row)
 
+    try:
+        filas = [primera, *cursor.fetchall()]
     except Exception as e:
         return jsonify({"msg": f"Error al obtener comentarios: {str(e)}"}), 500
     finally:
         cursor.close()
-        conn.close()
+
+    filas, next_cursor = split_page(filas, limit)
+    return jsonify({
+        "comentarios": COMENTARIO.rows(filas),
+        "next_cursor": next_cursor
+    }), 200
 
 
 # 2) Crear un nuevo comentario en una publicación
 @comentario_bp.route('/publicaciones/<int:id_publicacion>/comentarios', methods=['POST'])
 @jwt_required
 def crear_comentario(id_publicacion):
+    if request.user['rol'] == 'admin':
+        return jsonify({"msg": "No autorizado"}), 403
     data = request.get_json()
     contenido = data.get("contenido")
 
@@ -74,6 +125,7 @@ def crear_comentario(id_publicacion):
             VALUES (%s, %s, %s, NOW())
         """, (request.user['id'], id_publicacion, contenido))
         conn.commit()
+        get_trending().record(id_publicacion, COMMENT_WEIGHT)
 
         return jsonify({"msg": "Comentario creado correctamente", "id_comentario": cursor.lastrowid}), 201
 
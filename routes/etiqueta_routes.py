@@ -1,25 +1,20 @@
 from flask import Blueprint, jsonify
-from models import get_connection
+from models import read_only
 from utils.auth_decorator import jwt_required
+from utils.taxonomy_cache import taxonomy_cache, list_response
 
 etiqueta_bp = Blueprint("etiqueta", __name__)
 
 @etiqueta_bp.route('/etiquetas', methods=['GET'])
 @jwt_required
+@read_only
 def obtener_etiquetas():
-    conn = get_connection()
-    cursor = conn.cursor()
-
     try:
-        cursor.execute("SELECT id, nombre FROM Etiqueta")
-        etiquetas = cursor.fetchall()
+        taxonomia = taxonomy_cache.get()
 
-        if not etiquetas:
+        if not taxonomia.etiquetas:
             return jsonify({"msg": "No se encontraron etiquetas"}), 404
 
-        return jsonify([{"id": e[0], "nombre": e[1]} for e in etiquetas])
+        return list_response(taxonomia, "etiquetas", "etiquetas")
     except Exception as e:
         return jsonify({"msg": str(e)}), 500
-    finally:
-        cursor.close()
-        conn.close()
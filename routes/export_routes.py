@@ -0,0 +1,71 @@
+import pymysql
+from flask import Blueprint, request, jsonify
+from models import get_connection, read_only
+from utils.auth_decorator import jwt_required
+from utils.serializers import Schema
+from utils.streaming import ndjson_response, csv_response
+
+export_bp = Blueprint("export", __name__)
+
+# Recurso exportable: consulta completa y columnas, en el orden del SELECT
+EXPORTACIONES = {
+    "publicaciones": ("""
+        SELECT id, id_usuario, urlContenido, urlMiniatura, urlMediana, descripcion, id_etiqueta,
+               fecha_publicacion, likes
+        FROM Publicacion
+        ORDER BY id
+    """, ("id", "id_usuario", "urlContenido", "urlMiniatura", "urlMediana", "descripcion", "id_etiqueta",
+          "fecha_publicacion", "likes")),
+    "comentarios": ("""
+        SELECT id, id_publicacion, id_usuario, contenido, fecha_publicacion
+        FROM Comentario
+        ORDER BY id
+    """, ("id", "id_publicacion", "id_usuario", "contenido", "fecha_publicacion")),
+    "categorias": ("""
+        SELECT id, nombre, descripcion FROM Categoria ORDER BY id
+    """, ("id", "nombre", "descripcion")),
+    "subcategorias": ("""
+        SELECT id_categoria, id_subcategoria, nombre, historia, caracteristicas, requerimientos, tutoriales
+        FROM Subcategoria
+        ORDER BY id_categoria, id_subcategoria
+    """, ("id_categoria", "id_subcategoria", "nombre", "historia", "caracteristicas", "requerimientos",
+          "tutoriales")),
+    "etiquetas": ("""
+        SELECT id, nombre, id_categoria, id_subcategoria FROM Etiqueta ORDER BY id
+    """, ("id", "nombre", "id_categoria", "id_subcategoria")),
+}
+ESQUEMAS = {recurso: Schema(*columnas) for recurso, (_, columnas) in EXPORTACIONES.items()}
+
+
+# Exportación completa de una tabla (solo administradores) en NDJSON o CSV
+# (?formato=csv). Se lee con un cursor de servidor y se envía según llega: la
+# memoria no depende del tamaño de la tabla.
+@export_bp.route('/export/<recurso>', methods=['GET'])
+@jwt_required
+@read_only
+def exportar(recurso):
+    if request.user['rol'] != 'admin':
+        return jsonify({"msg": "No autorizado"}), 403
+    if recurso not in EXPORTACIONES:
+        return jsonify({"msg": "Recurso no exportable"}), 404
+    formato = request.args.get('formato', 'ndjson')
+    if formato not in ('ndjson', 'csv'):
+        return jsonify({"msg": "formato debe ser ndjson o csv"}), 400
+
+    sql, columnas = EXPORTACIONES[recurso]
+    cursor = get_connection().cursor(pymysql.cursors.SSCursor)
+    try:
+        cursor.execute(sql)
+    except Exception as e:
+        cursor.close()
+        return jsonify({"msg": f"Error al exportar: {str(e)}"}), 500
+
+    def filas():
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
+
+    if formato == 'csv':
+        return csv_response(filas(), columnas, f"{recurso}.csv")
+    return ndjson_response(filas(), ESQUEMAS[recurso].row)
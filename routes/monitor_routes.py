@@ -0,0 +1,55 @@
+from functools import wraps
+from flask import Blueprint, Response, current_app, jsonify, request
+from models import get_pool, get_replicas
+from utils.auth_decorator import jwt_required
+from utils.metrics import render_metrics
+from utils.ratelimit import get_rate_limiter, rejected_total
+
+monitor_bp = Blueprint("monitor", __name__)
+
+
+def monitor_access(view):
+    """Solo administradores, salvo con MONITOR_PUBLIC (un Prometheus en la red
+    interna que no lleva token)."""
+    @jwt_required
+    def solo_admin(*args, **kwargs):
+        if request.user['rol'] != 'admin':
+            return jsonify({"msg": "No autorizado"}), 403
+        return view(*args, **kwargs)
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if current_app.config["MONITOR_PUBLIC"]:
+            return view(*args, **kwargs)
+        return solo_admin(*args, **kwargs)
+    return wrapper
+
+
+# Estadísticas del pool de conexiones (en uso, en espera, tiempos de espera)
+@monitor_bp.route('/monitor/pool', methods=['GET'])
+@monitor_access
+def estado_pool():
+    admision = {clase: a.stats() for clase, a in get_rate_limiter().admision.items()}
+    return jsonify({**get_pool().stats(), "replicas": get_replicas().stats(), "admision": admision}), 200
+
+
+# Métricas en formato de texto de Prometheus (por proceso)
+@monitor_bp.route('/metrics', methods=['GET'])
+@monitor_access
+def metricas():
+    pool = get_pool().stats()
+    extra = [
+        "# HELP artcenter_db_pool_connections Conexiones del pool por estado",
+        "# TYPE artcenter_db_pool_connections gauge",
+        f'artcenter_db_pool_connections{{state="in_use"}} {pool["in_use"]}',
+        f'artcenter_db_pool_connections{{state="idle"}} {pool["idle"]}',
+        f'artcenter_db_pool_connections{{state="waiting"}} {pool["waiting"]}',
+        "# HELP artcenter_db_pool_wait_seconds_total Tiempo total esperando una conexión",
+        "# TYPE artcenter_db_pool_wait_seconds_total counter",
+        f'artcenter_db_pool_wait_seconds_total {pool["wait_time_total"]}',
+        "# HELP artcenter_db_pool_timeouts_total Peticiones sin conexión a tiempo",
+        "# TYPE artcenter_db_pool_timeouts_total counter",
+        f'artcenter_db_pool_timeouts_total {pool["timeouts"]}',
+        *rejected_total.render(),
+    ]
+    return Response(render_metrics(extra), mimetype="text/plain; version=0.0.4")
@@ -1,20 +1,36 @@
-from flask import Blueprint, request, jsonify
-import cloudinary.uploader
+from flask import Blueprint, request, jsonify, url_for
 import pymysql
+import zlib
 from pymysql.err import IntegrityError
 from utils.auth_decorator import jwt_required
-from models import get_connection
+from models import get_connection, read_only
+from utils.pagination import (PER_PAGE, COMENTARIOS_POR_PAGINA, parse_page_args, keyset_condition, split_page,
+                              page_response)
+from utils.search import boolean_query, is_email
+from utils.uploads import enqueue_upload, UploadQueueFull
+from utils.like_counter import get_like_counter
+from utils.serializers import PUBLICACION, PUBLICACION_DETALLE, ESTADO_PUBLICACION, AUTOR, COMENTARIO_AUTOR
+from utils.conditional import not_modified, with_validators
+from utils.taxonomy_cache import taxonomy_cache
+from utils.timeline import fan_out, popular_follows
+from utils.trending import get_trending, LIKE_WEIGHT
 
 publicacion_bp = Blueprint("publicacion", __name__)
 
+MAX_IDS_ESTADO = 500
+INCLUDES_PUBLICACION = {"autor", "comentarios"}
+
 # 1) Listar todas las publicaciones (paginado)
 @publicacion_bp.route('/publicaciones', methods=['GET'])
 @jwt_required
+@read_only
 def obtener_publicaciones():
     user_id = request.user['id']              
-    page = request.args.get('page', 0, type=int)
-    per_page = 20
-    offset = page * per_page
+    try:
+        keyset, offset, cursor_mode = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    condicion, params_cursor = keyset_condition(keyset)
 
     conn = get_connection()
     cursor = conn.cursor()
@@ -23,13 +39,15 @@ def obtener_publicaciones():
             SELECT 
                 p.id,
                 p.urlContenido,
+                COALESCE(p.urlMiniatura, p.urlContenido) AS urlMiniatura,
                 p.id_etiqueta,
                 e.nombre           AS nombre_etiqueta,
                 e.id_categoria,
                 e.id_subcategoria,
                 (udl.id_usuario IS NOT NULL) AS liked,
                 (ugp.id_usuario IS NOT NULL) AS saved,
-                p.id_usuario
+                p.id_usuario,
+                p.fecha_publicacion
             FROM Publicacion p
             LEFT JOIN Etiqueta e 
               ON p.id_etiqueta = e.id
@@ -39,29 +57,14 @@ def obtener_publicaciones():
             LEFT JOIN Usuario_Guarda_Publicacion ugp 
               ON ugp.id_usuario = %s 
              AND ugp.id_publicacion = p.id
-            ORDER BY p.fecha_publicacion DESC
+            WHERE {condicion}
+            ORDER BY p.fecha_publicacion DESC, p.id DESC
             LIMIT %s OFFSET %s
-        """, (user_id, user_id, per_page, offset))
-
-        filas = cursor.fetchall()
-        if not filas:
-            return jsonify({"msg": "No se encontraron publicaciones"}), 404
-
-        resultados = []
-        for p in filas:
-            resultados.append({
-                "id": p[0],
-                "urlContenido": p[1],
-                "id_etiqueta": p[2],
-                "nombre_etiqueta": p[3],
-                "id_categoria": p[4],
-                "id_subcategoria": p[5],
-                "liked": bool(p[6]),
-                "saved": bool(p[7]),
-                "id_usuario": p[8]
-            })
-
-        return jsonify(resultados), 200
+        """.format(condicion=condicion), (user_id, user_id, *params_cursor, PER_PAGE + 1, offset))
+
+        filas, next_cursor = split_page(cursor.fetchall())
+
+        return page_response(PUBLICACION.rows(filas), next_cursor, cursor_mode, "No se encontraron publicaciones")
 
     except Exception as e:
         return jsonify({"msg": f"Error al obtener publicaciones: {str(e)}"}), 500
@@ -70,17 +73,81 @@ def obtener_publicaciones():
         conn.close()
 
 # 2) Detalle de una publicación por ID (con liked y saved)
+# Admite peticiones condicionales. El ETag sale de una consulta por clave
+# primaria (updated_at de la fila y liked/saved del usuario) más los likes aún
+# sin volcar y la versión de la taxonomía (nombre de la etiqueta); si coincide
+# se responde 304 sin lanzar la consulta completa.
+# ``include=autor,comentarios`` añade el autor y la primera página de
+# comentarios (con sus autores): tres consultas en total sea cual sea el caso.
 @publicacion_bp.route('/publicaciones/<int:id>', methods=['GET'])
 @jwt_required
+@read_only
 def obtener_publicacion_por_id(id):
     user_id = request.user['id']
+    include = {i.strip() for i in request.args.get('include', '').split(',') if i.strip()}
+    if include - INCLUDES_PUBLICACION:
+        return jsonify({"msg": "include no válido: {}".format(", ".join(sorted(include - INCLUDES_PUBLICACION)))}), 400
+
     conn = get_connection()
     cursor = conn.cursor()
     try:
+        # El autor sale de aquí: búsqueda por clave primaria que entra en el ETag
+        cursor.execute("""
+            SELECT 
+                p.updated_at,
+                EXISTS(SELECT 1 FROM Usuario_Da_Like
+                       WHERE id_usuario = %s AND id_publicacion = p.id) AS liked,
+                EXISTS(SELECT 1 FROM Usuario_Guarda_Publicacion
+                       WHERE id_usuario = %s AND id_publicacion = p.id) AS saved,
+                p.id_usuario,
+                u.username,
+                u.urlFotoPerfil
+            FROM Publicacion p
+            LEFT JOIN Usuario u ON u.id = p.id_usuario
+            WHERE p.id = %s
+        """, (user_id, user_id, id))
+        validador = cursor.fetchone()
+        if not validador:
+            return jsonify({"msg": "Publicación no encontrada"}), 404
+
+        updated_at, liked, saved = validador[:3]
+        autor = AUTOR.row(validador[3:])
+        pendientes = get_like_counter().pending(id)
+        etag = "p{}-{}-{}{}-{}-tax{}".format(id, int(updated_at.timestamp() * 1000), int(liked), int(saved),
+                                            pendientes, taxonomy_cache.get().version)
+        if "autor" in include:
+            etag += "-a{:x}".format(zlib.crc32(repr(autor).encode()))
+        if "comentarios" in include:
+            # La página de comentarios es acotada y va antes de decidir el 304: el
+            # ETag tiene que cambiar también si un comentarista cambia de nombre
+            cursor.execute("""
+                SELECT c.id,
+                       c.id_usuario,
+                       u.username,
+                       c.contenido,
+                       u.urlFotoPerfil,
+                       c.fecha_publicacion
+                FROM Comentario c
+                LEFT JOIN Usuario u ON c.id_usuario = u.id
+                WHERE c.id_publicacion = %s
+                ORDER BY c.fecha_publicacion ASC, c.id ASC
+                LIMIT %s
+            """, (id, COMENTARIOS_POR_PAGINA + 1))
+            comentarios, comentarios_cursor = split_page(cursor.fetchall(), COMENTARIOS_POR_PAGINA)
+            etag += "-c{:x}".format(zlib.crc32(repr(comentarios).encode()))
+
+        # Solo el ETag: liked/saved (y los include) cambian el cuerpo sin tocar
+        # updated_at, así que un Last-Modified de la fila daría 304 con datos viejos
+        respuesta = not_modified(etag)
+        if respuesta is not None:
+            return respuesta
+
         cursor.execute("""
             SELECT 
                 p.id,
                 p.urlContenido,
+                COALESCE(p.urlMiniatura, p.urlContenido) AS urlMiniatura,
+                COALESCE(p.urlMediana, p.urlContenido)   AS urlMediana,
                 p.descripcion,
                 p.fecha_publicacion,
                 p.likes,
@@ -107,20 +174,14 @@ def obtener_publicacion_por_id(id):
         if not p:
             return jsonify({"msg": "Publicación no encontrada"}), 404
 
-        return jsonify({
-            "id": p[0],
-            "urlContenido": p[1],
-            "descripcion": p[2],
-            "fecha_publicacion": p[3],
-            "likes": p[4],
-            "nombre_etiqueta": p[5],
-            "id_etiqueta": p[6],
-            "id_categoria": p[7],
-            "id_subcategoria": p[8],
-            "liked": bool(p[9]),
-            "saved": bool(p[10]),
-            "id_usuario": p[11]
-        }), 200
+        publicacion = PUBLICACION_DETALLE.row(p)
+        publicacion["likes"] += pendientes
+        if "autor" in include:
+            publicacion["autor"] = autor
+        if "comentarios" in include:
+            publicacion["comentarios"] = COMENTARIO_AUTOR.rows(comentarios)
+            publicacion["comentarios_next_cursor"] = comentarios_cursor
+        return with_validators(jsonify(publicacion), etag)
 
     except Exception as e:
         return jsonify({"msg": f"Error al obtener publicación: {str(e)}"}), 500
@@ -130,46 +191,54 @@ def obtener_publicacion_por_id(id):
 
 
 # 3) Crear publicación (solo usuarios)
+# La imagen se sube en segundo plano: se responde 202 con el id de la subida y
+# la fila de Publicacion se inserta cuando la subida termina, junto con las URLs
+# de la miniatura (listados) y la versión mediana (detalle).
 @publicacion_bp.route('/publicaciones', methods=['POST'])
 @jwt_required
 def crear_publicacion():
     if request.user['rol'] == 'admin':
         return jsonify({"msg": "No autorizado"}), 403
 
+    user_id = request.user['id']
     descripcion = request.form.get("descripcion")
     id_etiqueta = request.form.get("id_etiqueta")
     file = request.files.get("file")
     if not file:
         return jsonify({"msg": "No se ha proporcionado una imagen"}), 400
 
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        upload_result = cloudinary.uploader.upload(file)
-        image_url = upload_result.get('secure_url')
-
+    def insertar_publicacion(cursor, image_url, derivadas):
         cursor.execute("""
-            INSERT INTO Publicacion (id_usuario, urlContenido, descripcion, id_etiqueta, fecha_publicacion)
-            VALUES (%s, %s, %s, %s, NOW())
-        """, (request.user['id'], image_url, descripcion, id_etiqueta))
-        conn.commit()
-        return jsonify({"msg": "Publicación creada correctamente", "urlContenido": image_url}), 201
+            INSERT INTO Publicacion (id_usuario, urlContenido, urlMiniatura, urlMediana, descripcion,
+                                     id_etiqueta, fecha_publicacion)
+            VALUES (%s, %s, %s, %s, %s, %s, NOW())
+        """, (user_id, image_url, derivadas.get("miniatura"), derivadas.get("mediana"), descripcion, id_etiqueta))
+        id_publicacion = cursor.lastrowid
+        fan_out(cursor, id_publicacion)
+        return {"id_publicacion": id_publicacion}
 
+    try:
+        id_subida = enqueue_upload(file, user_id, "publicacion", insertar_publicacion, derivatives=True)
+    except UploadQueueFull:
+        return jsonify({"msg": "Demasiadas subidas en curso, inténtalo más tarde"}), 503, {"Retry-After": "5"}
     except Exception as e:
-        conn.rollback()
         return jsonify({"msg": f"Error al crear publicación: {str(e)}"}), 500
-    finally:
-        cursor.close()
-        conn.close()
+
+    return jsonify({"msg": "Publicación en proceso", "id_subida": id_subida}), 202, {
+        "Location": url_for("subida.obtener_subida", id_subida=id_subida)
+    }
 
 # 4) Mis publicaciones (con liked y saved)
 @publicacion_bp.route('/publicaciones/mias', methods=['GET'])
 @jwt_required
+@read_only
 def obtener_mis_publicaciones():
     user_id = request.user['id']
-    page = request.args.get('page', 0, type=int)
-    per_page = 20
-    offset = page * per_page
+    try:
+        keyset, offset, cursor_mode = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    condicion, params_cursor = keyset_condition(keyset)
 
     conn = get_connection()
     cursor = conn.cursor()
@@ -178,13 +247,15 @@ def obtener_mis_publicaciones():
             SELECT 
                 p.id,
                 p.urlContenido,
+                COALESCE(p.urlMiniatura, p.urlContenido) AS urlMiniatura,
                 p.id_etiqueta,
                 e.nombre           AS nombre_etiqueta,
                 e.id_categoria,
                 e.id_subcategoria,
                 (udl.id_usuario IS NOT NULL) AS liked,
                 (ugp2.id_usuario IS NOT NULL) AS saved,
-                p.id_usuario
+                p.id_usuario,
+                p.fecha_publicacion
             FROM Publicacion p
             LEFT JOIN Etiqueta e 
               ON p.id_etiqueta = e.id
@@ -195,27 +266,14 @@ def obtener_mis_publicaciones():
               ON ugp2.id_usuario = %s
              AND ugp2.id_publicacion = p.id
             WHERE p.id_usuario = %s
-            ORDER BY p.fecha_publicacion DESC
+              AND {condicion}
+            ORDER BY p.fecha_publicacion DESC, p.id DESC
             LIMIT %s OFFSET %s
-        """, (user_id, user_id, user_id, per_page, offset))
-
-        filas = cursor.fetchall()
-        if not filas:
-            return jsonify({"msg": "No tienes publicaciones"}), 404
-
-        resultados = [{
-            "id": p[0],
-            "urlContenido": p[1],
-            "id_etiqueta": p[2],
-            "nombre_etiqueta": p[3],
-            "id_categoria": p[4],
-            "id_subcategoria": p[5],
-            "liked": bool(p[6]),
-            "saved": bool(p[7]),
-            "id_usuario": p[8]
-        } for p in filas]
-
-        return jsonify(resultados), 200
+        """.format(condicion=condicion), (user_id, user_id, user_id, *params_cursor, PER_PAGE + 1, offset))
+
+        filas, next_cursor = split_page(cursor.fetchall())
+
+        return page_response(PUBLICACION.rows(filas), next_cursor, cursor_mode, "No tienes publicaciones")
 
     except Exception as e:
         return jsonify({"msg": f"Error al obtener tus publicaciones: {str(e)}"}), 500
@@ -227,6 +285,8 @@ def obtener_mis_publicaciones():
 @publicacion_bp.route('/publicaciones/<int:id>/guardar', methods=['POST'])
 @jwt_required
 def guardar_publicacion(id):
+    if request.user['rol'] == 'admin':
+        return jsonify({"msg": "No autorizado"}), 403
     user_id = request.user['id']
     conn = get_connection()
     cursor = conn.cursor()
@@ -256,6 +316,8 @@ def guardar_publicacion(id):
 @publicacion_bp.route('/publicaciones/<int:id>/like', methods=['POST'])
 @jwt_required
 def like_publicacion(id):
+    if request.user['rol'] == 'admin':
+        return jsonify({"msg": "No autorizado"}), 403
     user_id = request.user['id']
     conn = get_connection()
     cursor = conn.cursor()
@@ -265,15 +327,28 @@ def like_publicacion(id):
             VALUES (%s, %s)
         """, (user_id, id))
         conn.commit()
+        # El contador de la publicación se actualiza en lote, ver utils/like_counter.py
+        get_like_counter().record(id, 1)
+        get_trending().record(id, LIKE_WEIGHT)
         return jsonify({"msg": "Has dado like"}), 201
 
     except IntegrityError as e:
         if e.args[0] == 1062:
+            cursor.execute("""
+                SELECT UNIX_TIMESTAMP(fecha) FROM Usuario_Da_Like
+                WHERE id_usuario = %s AND id_publicacion = %s
+            """, (user_id, id))
+            like = cursor.fetchone()
             cursor.execute("""
                 DELETE FROM Usuario_Da_Like
                 WHERE id_usuario = %s AND id_publicacion = %s
             """, (user_id, id))
             conn.commit()
+            if cursor.rowcount:
+                get_like_counter().record(id, -1)
+                # Se retira lo que sumó el like: alternar no infla la tendencia
+                if like:
+                    get_trending().record(id, -LIKE_WEIGHT, at=float(like[0]))
             return jsonify({"msg": "Has quitado el like"}), 200
         return jsonify({"msg": f"Error al procesar like: {str(e)}"}), 500
 
@@ -284,11 +359,14 @@ def like_publicacion(id):
 # 7) Publicaciones guardadas (con liked y saved siempre True)
 @publicacion_bp.route('/publicaciones/guardadas', methods=['GET'])
 @jwt_required
+@read_only
 def obtener_publicaciones_guardadas():
     user_id = request.user['id']
-    page = request.args.get('page', 0, type=int)
-    per_page = 20
-    offset = page * per_page
+    try:
+        keyset, offset, cursor_mode = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    condicion, params_cursor = keyset_condition(keyset)
 
     conn = get_connection()
     cursor = conn.cursor()
@@ -297,13 +375,15 @@ def obtener_publicaciones_guardadas():
             SELECT 
                 p.id,
                 p.urlContenido,
+                COALESCE(p.urlMiniatura, p.urlContenido) AS urlMiniatura,
                 p.id_etiqueta,
                 e.nombre           AS nombre_etiqueta,
                 e.id_categoria,
                 e.id_subcategoria,
                 (udl.id_usuario IS NOT NULL) AS liked,
                 1 AS saved,
-                p.id_usuario
+                p.id_usuario,
+                p.fecha_publicacion
             FROM Usuario_Guarda_Publicacion ugp
             JOIN Publicacion p 
               ON ugp.id_publicacion = p.id
@@ -313,27 +393,14 @@ def obtener_publicaciones_guardadas():
               ON udl.id_usuario = %s
              AND udl.id_publicacion = p.id
             WHERE ugp.id_usuario = %s
-            ORDER BY p.fecha_publicacion DESC
+              AND {condicion}
+            ORDER BY p.fecha_publicacion DESC, p.id DESC
             LIMIT %s OFFSET %s
-        """, (user_id, user_id, per_page, offset))
-
-        filas = cursor.fetchall()
-        if not filas:
-            return jsonify({"msg": "No tienes publicaciones guardadas"}), 404
-
-        resultados = [{
-            "id": p[0],
-            "urlContenido": p[1],
-            "id_etiqueta": p[2],
-            "nombre_etiqueta": p[3],
-            "id_categoria": p[4],
-            "id_subcategoria": p[5],
-            "liked": bool(p[6]),
-            "saved": True,
-            "id_usuario": p[8]
-        } for p in filas]
-
-        return jsonify(resultados), 200
+        """.format(condicion=condicion), (user_id, user_id, *params_cursor, PER_PAGE + 1, offset))
+
+        filas, next_cursor = split_page(cursor.fetchall())
+
+        return page_response(PUBLICACION.rows(filas), next_cursor, cursor_mode, "No tienes publicaciones guardadas")
 
     except Exception as e:
         return jsonify({"msg": f"Error al obtener guardadas: {str(e)}"}), 500
@@ -342,74 +409,94 @@ def obtener_publicaciones_guardadas():
         conn.close()
 
 # 8) Devolver publicaciones con filtro búsqueda
+# El texto se busca en el índice FULLTEXT de Publicacion_Busqueda (descripción,
+# etiqueta, categoría, subcategoría y autor) ordenado por relevancia. Un email
+# completo se resuelve aparte por igualdad exacta contra Cuenta.
 @publicacion_bp.route('/publicaciones/buscar', methods=['GET'])
 @jwt_required
+@read_only
 def buscar_publicaciones():
     user_id = request.user['id']
     query = request.args.get('q', '', type=str).strip()
-    page = request.args.get('page', 0, type=int)
-    per_page = 20
-    offset = page * per_page
+    try:
+        keyset, offset, cursor_mode = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
 
     if not query:
         return jsonify({"msg": "Debes proporcionar un término de búsqueda"}), 400
 
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        like_query = f"%{query}%"
-        cursor.execute("""
+    if is_email(query):
+        condicion, params_cursor = keyset_condition(keyset)
+        sql = """
             SELECT 
                 p.id,
                 p.urlContenido,
+                COALESCE(p.urlMiniatura, p.urlContenido) AS urlMiniatura,
                 p.id_etiqueta,
                 e.nombre AS nombre_etiqueta,
                 e.id_categoria,
                 e.id_subcategoria,
                 (udl.id_usuario IS NOT NULL) AS liked,
                 (ugp.id_usuario IS NOT NULL) AS saved,
-                p.id_usuario
-            FROM Publicacion p
+                p.id_usuario,
+                p.fecha_publicacion
+            FROM Cuenta cu
+            JOIN Publicacion p ON p.id_usuario = cu.id
+            LEFT JOIN Etiqueta e ON p.id_etiqueta = e.id
+            LEFT JOIN Usuario_Da_Like udl ON udl.id_usuario = %s AND udl.id_publicacion = p.id
+            LEFT JOIN Usuario_Guarda_Publicacion ugp ON ugp.id_usuario = %s AND ugp.id_publicacion = p.id
+            WHERE cu.email = %s
+              AND {condicion}
+            ORDER BY p.fecha_publicacion DESC, p.id DESC
+            LIMIT %s OFFSET %s
+        """
+        params = (user_id, user_id, query, *params_cursor, PER_PAGE + 1, offset)
+    else:
+        texto = boolean_query(query)
+        if not texto:
+            return jsonify({"msg": "Debes proporcionar un término de búsqueda"}), 400
+        condicion, params_cursor = keyset_condition(keyset, sort_col="b.score")
+        sql = """
+            SELECT 
+                p.id,
+                p.urlContenido,
+                COALESCE(p.urlMiniatura, p.urlContenido) AS urlMiniatura,
+                p.id_etiqueta,
+                e.nombre AS nombre_etiqueta,
+                e.id_categoria,
+                e.id_subcategoria,
+                (udl.id_usuario IS NOT NULL) AS liked,
+                (ugp.id_usuario IS NOT NULL) AS saved,
+                p.id_usuario,
+                b.score
+            FROM (
+                -- Relevancia entera (millonésimas): el cursor la devuelve exacta
+                -- y la igualdad del keyset no depende de redondeos de coma flotante
+                SELECT id_publicacion,
+                       CAST(ROUND(MATCH(documento) AGAINST (%s IN BOOLEAN MODE) * 1000000) AS SIGNED) AS score
+                FROM Publicacion_Busqueda
+                WHERE MATCH(documento) AGAINST (%s IN BOOLEAN MODE)
+            ) b
+            JOIN Publicacion p ON p.id = b.id_publicacion
             LEFT JOIN Etiqueta e ON p.id_etiqueta = e.id
-            LEFT JOIN Categoria c ON e.id_categoria = c.id
-            LEFT JOIN Subcategoria s ON e.id_categoria = s.id_categoria AND e.id_subcategoria = s.id_subcategoria
-            LEFT JOIN Usuario u ON p.id_usuario = u.id
-            LEFT JOIN Cuenta cu ON u.id = cu.id
             LEFT JOIN Usuario_Da_Like udl ON udl.id_usuario = %s AND udl.id_publicacion = p.id
             LEFT JOIN Usuario_Guarda_Publicacion ugp ON ugp.id_usuario = %s AND ugp.id_publicacion = p.id
-            WHERE c.nombre LIKE %s
-               OR s.nombre LIKE %s
-               OR p.descripcion LIKE %s
-               OR u.username LIKE %s
-               OR cu.email LIKE %s
-            ORDER BY p.fecha_publicacion DESC
+            WHERE {condicion}
+            ORDER BY b.score DESC, p.id DESC
             LIMIT %s OFFSET %s
-        """, (
-            user_id, user_id,
-            like_query, like_query, like_query,
-            like_query, like_query,
-            per_page, offset
-        ))
-
-        publicaciones = cursor.fetchall()
-        if not publicaciones:
-            return jsonify({"msg": "No se encontraron publicaciones que coincidan con la búsqueda"}), 404
-
-        resultados = []
-        for p in publicaciones:
-            resultados.append({
-                "id": p[0],
-                "urlContenido": p[1],
-                "id_etiqueta": p[2],
-                "nombre_etiqueta": p[3],
-                "id_categoria": p[4],
-                "id_subcategoria": p[5],
-                "liked": bool(p[6]),
-                "saved": bool(p[7]),
-                "id_usuario": p[8]
-            })
-
-        return jsonify(resultados), 200
+        """
+        params = (texto, texto, user_id, user_id, *params_cursor, PER_PAGE + 1, offset)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql.format(condicion=condicion), params)
+
+        publicaciones, next_cursor = split_page(cursor.fetchall())
+
+        return page_response(PUBLICACION.rows(publicaciones), next_cursor, cursor_mode,
+                             "No se encontraron publicaciones que coincidan con la búsqueda")
 
     except Exception as e:
         return jsonify({"msg": f"Error al realizar la búsqueda: {str(e)}"}), 500
@@ -448,3 +535,222 @@ def eliminar_publicacion(id):
     finally:
         cursor.close()
         conn.close()
+
+# 10) Estado (liked, saved, likes y nº de comentarios) de varias publicaciones a la vez
+@publicacion_bp.route('/publicaciones/estado', methods=['POST'])
+@jwt_required
+@read_only
+def obtener_estado_publicaciones():
+    user_id = request.user['id']
+    data = request.get_json(silent=True) or {}
+    ids = data.get("ids")
+
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        return jsonify({"msg": "Debes proporcionar una lista 'ids' de enteros"}), 400
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_IDS_ESTADO:
+        return jsonify({"msg": f"Como máximo {MAX_IDS_ESTADO} publicaciones por petición"}), 400
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        marcadores = ", ".join(["%s"] * len(ids))
+        cursor.execute(f"""
+            SELECT 
+                p.id,
+                (udl.id_usuario IS NOT NULL) AS liked,
+                (ugp.id_usuario IS NOT NULL) AS saved,
+                p.likes,
+                (SELECT COUNT(*) FROM Comentario c WHERE c.id_publicacion = p.id) AS comentarios
+            FROM Publicacion p
+            LEFT JOIN Usuario_Da_Like udl
+              ON udl.id_usuario = %s
+             AND udl.id_publicacion = p.id
+            LEFT JOIN Usuario_Guarda_Publicacion ugp
+              ON ugp.id_usuario = %s
+             AND ugp.id_publicacion = p.id
+            WHERE p.id IN ({marcadores})
+        """, (user_id, user_id, *ids))
+
+        like_counter = get_like_counter()
+        estados = {}
+        for estado in ESTADO_PUBLICACION.rows(cursor.fetchall()):
+            estado["likes"] += like_counter.pending(estado["id"])
+            estados[estado["id"]] = estado
+
+        return jsonify({
+            "estados": [estados[i] for i in ids if i in estados],
+            "no_encontradas": [i for i in ids if i not in estados]
+        }), 200
+
+    except Exception as e:
+        return jsonify({"msg": f"Error al obtener el estado de las publicaciones: {str(e)}"}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+# 11) Feed personalizado: publicaciones de las categorías y subcategorías que sigue el usuario
+# Sale del timeline precalculado (fan-out al publicar) unido, solo para lo que
+# sigue y es popular, con una lectura directa de Publicacion. Misma paginación
+# que el feed general.
+@publicacion_bp.route('/publicaciones/feed', methods=['GET'])
+@jwt_required
+@read_only
+def obtener_feed():
+    user_id = request.user['id']
+    try:
+        keyset, offset, cursor_mode = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    limite = offset + PER_PAGE + 1
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT id_categoria, NULL FROM Usuario_Guarda_Categoria WHERE id_usuario = %s
+            UNION ALL
+            SELECT id_categoria, id_subcategoria FROM Usuario_Guarda_Subcategoria WHERE id_usuario = %s
+        """, (user_id, user_id))
+        seguidos = cursor.fetchall()
+        if not seguidos:
+            return page_response([], None, cursor_mode, "No sigues ninguna categoría ni subcategoría")
+
+        condicion, params_cursor = keyset_condition(keyset, "t.fecha_publicacion", "t.id_publicacion")
+        fuentes = ["""
+            (SELECT t.id_publicacion, t.fecha_publicacion
+             FROM Timeline t
+             WHERE t.id_usuario = %s AND {condicion}
+             ORDER BY t.fecha_publicacion DESC, t.id_publicacion DESC
+             LIMIT %s)
+        """.format(condicion=condicion)]
+        params = [user_id, *params_cursor, limite]
+
+        # Lo popular no está en el timeline: se lee de Publicacion
+        categorias_pop, subcategorias_pop = popular_follows.get()
+        categorias = [c for c, s in seguidos if s is None and c in categorias_pop]
+        subcategorias = [(c, s) for c, s in seguidos
+                         if s is not None and (c, s) in subcategorias_pop and c not in categorias]
+        if categorias or subcategorias:
+            filtros = []
+            if categorias:
+                filtros.append("e.id_categoria IN ({})".format(", ".join(["%s"] * len(categorias))))
+                params.extend(categorias)
+            if subcategorias:
+                filtros.append("(e.id_categoria, e.id_subcategoria) IN ({})".format(
+                    ", ".join(["(%s, %s)"] * len(subcategorias))))
+                params.extend(v for par in subcategorias for v in par)
+            condicion, params_cursor = keyset_condition(keyset)
+            fuentes.append("""
+                (SELECT p.id, p.fecha_publicacion
+                 FROM Publicacion p
+                 JOIN Etiqueta e ON e.id = p.id_etiqueta
+                 WHERE ({filtros}) AND {condicion}
+                 ORDER BY p.fecha_publicacion DESC, p.id DESC
+                 LIMIT %s)
+            """.format(filtros=" OR ".join(filtros), condicion=condicion))
+            params.extend([*params_cursor, limite])
+
+        cursor.execute("""
+            SELECT 
+                p.id,
+                p.urlContenido,
+                COALESCE(p.urlMiniatura, p.urlContenido) AS urlMiniatura,
+                p.id_etiqueta,
+                e.nombre           AS nombre_etiqueta,
+                e.id_categoria,
+                e.id_subcategoria,
+                (udl.id_usuario IS NOT NULL) AS liked,
+                (ugp.id_usuario IS NOT NULL) AS saved,
+                p.id_usuario,
+                p.fecha_publicacion
+            FROM ({fuentes}) f
+            JOIN Publicacion p 
+              ON p.id = f.id_publicacion
+            LEFT JOIN Etiqueta e 
+              ON p.id_etiqueta = e.id
+            LEFT JOIN Usuario_Da_Like udl 
+              ON udl.id_usuario = %s 
+             AND udl.id_publicacion = p.id
+            LEFT JOIN Usuario_Guarda_Publicacion ugp 
+              ON ugp.id_usuario = %s 
+             AND ugp.id_publicacion = p.id
+            ORDER BY p.fecha_publicacion DESC, p.id DESC
+            LIMIT %s OFFSET %s
+        """.format(fuentes=" UNION ".join(fuentes)), (*params, user_id, user_id, PER_PAGE + 1, offset))
+
+        filas, next_cursor = split_page(cursor.fetchall())
+
+        return page_response(PUBLICACION.rows(filas), next_cursor, cursor_mode,
+                             "No hay publicaciones de lo que sigues")
+
+    except Exception as e:
+        return jsonify({"msg": f"Error al obtener el feed: {str(e)}"}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# 12) Publicaciones en tendencia, globales o de una categoría/subcategoría
+# El ranking sale del top que utils/trending.py mantiene en memoria; aquí solo
+# se leen por clave primaria las publicaciones de la página, así que el coste
+# no depende del tamaño de las tablas.
+@publicacion_bp.route('/publicaciones/trending', methods=['GET'])
+@jwt_required
+@read_only
+def obtener_trending():
+    user_id = request.user['id']
+    id_categoria = request.args.get('id_categoria', type=int)
+    id_subcategoria = request.args.get('id_subcategoria', type=int)
+    if id_subcategoria is not None and id_categoria is None:
+        return jsonify({"msg": "id_subcategoria requiere id_categoria"}), 400
+    trending = get_trending()
+    limite = min(max(request.args.get('limit', 20, type=int), 1), trending.top_k)
+
+    clave = id_categoria if id_subcategoria is None else (id_categoria, id_subcategoria)
+    top = trending.top(clave, limite)
+    if not top:
+        return jsonify({"publicaciones": []}), 200
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT 
+                p.id,
+                p.urlContenido,
+                COALESCE(p.urlMiniatura, p.urlContenido) AS urlMiniatura,
+                p.id_etiqueta,
+                e.nombre           AS nombre_etiqueta,
+                e.id_categoria,
+                e.id_subcategoria,
+                (udl.id_usuario IS NOT NULL) AS liked,
+                (ugp.id_usuario IS NOT NULL) AS saved,
+                p.id_usuario
+            FROM Publicacion p
+            LEFT JOIN Etiqueta e 
+              ON p.id_etiqueta = e.id
+            LEFT JOIN Usuario_Da_Like udl 
+              ON udl.id_usuario = %s 
+             AND udl.id_publicacion = p.id
+            LEFT JOIN Usuario_Guarda_Publicacion ugp 
+              ON ugp.id_usuario = %s 
+             AND ugp.id_publicacion = p.id
+            WHERE p.id IN ({})
+        """.format(", ".join(["%s"] * len(top))), (user_id, user_id, *(id for id, _ in top)))
+        filas = {f[0]: f for f in cursor.fetchall()}
+
+        # Se respeta el orden del ranking; las borradas desde la última recarga se saltan
+        publicaciones = []
+        for id, puntuacion in top:
+            if id in filas:
+                publicacion = PUBLICACION.row(filas[id])
+                publicacion["puntuacion"] = round(puntuacion, 3)
+                publicaciones.append(publicacion)
+        return jsonify({"publicaciones": publicaciones}), 200
+
+    except Exception as e:
+        return jsonify({"msg": f"Error al obtener las tendencias: {str(e)}"}), 500
+    finally:
+        cursor.close()
+        conn.close()
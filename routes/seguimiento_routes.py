@@ -0,0 +1,119 @@
+from flask import Blueprint, request, jsonify
+from pymysql.err import IntegrityError
+from models import get_connection, read_only
+from utils.auth_decorator import jwt_required
+from utils.timeline import backfill, unfollow_cleanup
+
+seguimiento_bp = Blueprint("seguimiento", __name__)
+
+
+# 1) Seguir / dejar de seguir una categoría (mismo interruptor que los likes)
+@seguimiento_bp.route('/categorias/<int:id_categoria>/seguir', methods=['POST'])
+@jwt_required
+def seguir_categoria(id_categoria):
+    if request.user['rol'] == 'admin':
+        return jsonify({"msg": "No autorizado"}), 403
+
+    user_id = request.user['id']
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        # El seguimiento y su timeline van juntos: sin backfill no queda el seguimiento
+        conn.begin()
+        cursor.execute("""
+            INSERT INTO Usuario_Guarda_Categoria (id_usuario, id_categoria)
+            VALUES (%s, %s)
+        """, (user_id, id_categoria))
+        backfill(cursor, user_id, id_categoria)
+        conn.commit()
+        return jsonify({"msg": "Ahora sigues esta categoría"}), 201
+
+    except IntegrityError as e:
+        if e.args[0] == 1062:
+            cursor.execute("""
+                DELETE FROM Usuario_Guarda_Categoria
+                WHERE id_usuario = %s AND id_categoria = %s
+            """, (user_id, id_categoria))
+            unfollow_cleanup(cursor, user_id, id_categoria)
+            conn.commit()
+            return jsonify({"msg": "Has dejado de seguir esta categoría"}), 200
+        conn.rollback()
+        if e.args[0] == 1452:
+            return jsonify({"msg": "Categoría no encontrada"}), 404
+        return jsonify({"msg": f"Error al seguir la categoría: {str(e)}"}), 500
+
+    except Exception as e:
+        conn.rollback()
+        return jsonify({"msg": f"Error al seguir la categoría: {str(e)}"}), 500
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# 2) Seguir / dejar de seguir una subcategoría
+@seguimiento_bp.route('/subcategorias/<int:id_categoria>/<int:id_subcategoria>/seguir', methods=['POST'])
+@jwt_required
+def seguir_subcategoria(id_categoria, id_subcategoria):
+    if request.user['rol'] == 'admin':
+        return jsonify({"msg": "No autorizado"}), 403
+
+    user_id = request.user['id']
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        # El seguimiento y su timeline van juntos: sin backfill no queda el seguimiento
+        conn.begin()
+        cursor.execute("""
+            INSERT INTO Usuario_Guarda_Subcategoria (id_usuario, id_categoria, id_subcategoria)
+            VALUES (%s, %s, %s)
+        """, (user_id, id_categoria, id_subcategoria))
+        backfill(cursor, user_id, id_categoria, id_subcategoria)
+        conn.commit()
+        return jsonify({"msg": "Ahora sigues esta subcategoría"}), 201
+
+    except IntegrityError as e:
+        if e.args[0] == 1062:
+            cursor.execute("""
+                DELETE FROM Usuario_Guarda_Subcategoria
+                WHERE id_usuario = %s AND id_categoria = %s AND id_subcategoria = %s
+            """, (user_id, id_categoria, id_subcategoria))
+            unfollow_cleanup(cursor, user_id, id_categoria, id_subcategoria)
+            conn.commit()
+            return jsonify({"msg": "Has dejado de seguir esta subcategoría"}), 200
+        conn.rollback()
+        if e.args[0] == 1452:
+            return jsonify({"msg": "Subcategoría no encontrada"}), 404
+        return jsonify({"msg": f"Error al seguir la subcategoría: {str(e)}"}), 500
+
+    except Exception as e:
+        conn.rollback()
+        return jsonify({"msg": f"Error al seguir la subcategoría: {str(e)}"}), 500
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# 3) Lo que sigue el usuario
+@seguimiento_bp.route('/seguimientos', methods=['GET'])
+@jwt_required
+@read_only
+def obtener_seguimientos():
+    user_id = request.user['id']
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT id_categoria FROM Usuario_Guarda_Categoria WHERE id_usuario = %s", (user_id,))
+        categorias = [r[0] for r in cursor.fetchall()]
+        cursor.execute("""
+            SELECT id_categoria, id_subcategoria FROM Usuario_Guarda_Subcategoria WHERE id_usuario = %s
+        """, (user_id,))
+        subcategorias = [{"id_categoria": r[0], "id_subcategoria": r[1]} for r in cursor.fetchall()]
+        return jsonify({"categorias": categorias, "subcategorias": subcategorias}), 200
+
+    except Exception as e:
+        return jsonify({"msg": f"Error al obtener los seguimientos: {str(e)}"}), 500
+    finally:
+        cursor.close()
+        conn.close()
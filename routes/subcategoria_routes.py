@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
-from models import get_connection
+from models import get_connection, read_only
 from utils.auth_decorator import jwt_required
+from utils.taxonomy_cache import taxonomy_cache, cached_response, list_response
+from utils.bulk import BulkError, read_rows, validate, repeated, existing, conflicts, insert_many
 
 subcategoria_bp = Blueprint("subcategoria", __name__)
 
@@ -44,6 +46,7 @@ def crear_subcategoria():
             "VALUES (%s, NULL, %s, %s, %s, %s, %s)",
             (id_categoria, nombre, historia, caracteristicas, requerimientos, tutoriales)
         )
+        taxonomy_cache.invalidate(cursor)
         conn.commit()
         return jsonify({"msg": "Subcategoría creada correctamente"}), 201
     except Exception as e:
@@ -54,72 +57,113 @@ def crear_subcategoria():
         conn.close()
 
 
-# Obtener todas las subcategorías (solo id y nombre)
-@subcategoria_bp.route('/subcategorias', methods=['GET'])
+# Alta masiva de subcategorías (JSON o CSV), en una transacción. Cada fila
+# necesita una categoría existente; los nombres repetidos dentro de la misma
+# categoría son un 409, o se saltan con ?duplicados=omitir. Un nombre que ya
+# tiene otra etiqueta (de cualquier categoría) es siempre un 409
+@subcategoria_bp.route('/subcategorias/bulk', methods=['POST'])
 @jwt_required
-def obtener_subcategorias():
+def crear_subcategorias_bulk():
+    if request.user['rol'] != 'admin':
+        return jsonify({"msg": "No autorizado"}), 403
+    omitir = request.args.get('duplicados') == 'omitir'
+
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT id_categoria, id_subcategoria, nombre FROM Subcategoria")
-    subcategorias = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    try:
+        filas = validate(read_rows("subcategorias"), ("id_categoria", "nombre"),
+                         ("historia", "caracteristicas", "requerimientos", "tutoriales"), enteros=("id_categoria",))
+        # Cada subcategoría crea una etiqueta con su nombre y Etiqueta.nombre es
+        # único: el nombre no puede repetirse ni siquiera en otra categoría
+        errores = repeated((f["nombre"],) for f in filas)
+        if errores:
+            raise BulkError(errores)
+
+        con_categoria = existing(cursor, "JOIN Categoria c ON c.id = t.id_categoria", ("id_categoria",),
+                                 ((f["id_categoria"],) for f in filas))
+        sin_categoria = [i for i in range(1, len(filas) + 1) if i not in con_categoria]
+        if sin_categoria:
+            return jsonify({"msg": "Categoría no encontrada",
+                            "errores": [{"fila": i, "msg": "Categoría no encontrada"} for i in sin_categoria]}), 404
+
+        duplicadas = existing(
+            cursor, "JOIN Subcategoria s ON s.id_categoria = t.id_categoria AND s.nombre = t.nombre",
+            ("id_categoria", "nombre"), ((f["id_categoria"], f["nombre"]) for f in filas)
+        )
+        ocupadas = existing(cursor, "JOIN Etiqueta e ON e.nombre = t.nombre", ("nombre",),
+                            ((f["nombre"],) for f in filas)) - duplicadas
+        if ocupadas or (duplicadas and not omitir):
+            return jsonify({"msg": "Ya existen subcategorías o etiquetas con esos nombres",
+                            "errores": conflicts(set() if omitir else duplicadas, ocupadas)}), 409
+
+        nuevas = [(f["id_categoria"], f["nombre"], f["historia"], f["caracteristicas"], f["requerimientos"],
+                   f["tutoriales"]) for i, f in enumerate(filas, 1) if i not in duplicadas]
+        # El pool trabaja en autocommit: sin begin() cada lote se confirmaría por separado
+        conn.begin()
+        insert_many(
+            cursor,
+            "INSERT INTO Subcategoria (id_categoria, nombre, historia, caracteristicas, requerimientos, tutoriales) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            nuevas
+        )
+        if nuevas:
+            taxonomy_cache.invalidate(cursor)
+        conn.commit()
+        return jsonify({"msg": "Subcategorías creadas correctamente", "creadas": len(nuevas),
+                        "omitidas": len(duplicadas)}), 201
+    except BulkError as e:
+        return jsonify({"msg": "Carga no válida", "errores": e.errores}), 400
+    except Exception as e:
+        conn.rollback()
+        return jsonify({"msg": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
 
-    return jsonify([{
-        "id_categoria": sc[0],
-        "id_subcategoria": sc[1],
-        "nombre": sc[2]
-    } for sc in subcategorias])
+
+# Obtener todas las subcategorías (solo id y nombre)
+@subcategoria_bp.route('/subcategorias', methods=['GET'])
+@jwt_required
+@read_only
+def obtener_subcategorias():
+    taxonomia = taxonomy_cache.get()
+    return list_response(taxonomia, "lista_subcategorias", "subcategorias")
 
 
 # Obtener todas las subcategorías de una categoría en particular
 @subcategoria_bp.route('/subcategorias/categoria/<int:id_categoria>', methods=['GET'])
 @jwt_required
+@read_only
 def obtener_subcategorias_por_categoria(id_categoria):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id_categoria, id_subcategoria, nombre FROM Subcategoria WHERE id_categoria = %s", (id_categoria,))
-    subcategorias = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    taxonomia = taxonomy_cache.get()
+    subcategorias = taxonomia.por_categoria.get(id_categoria)
 
     if not subcategorias:
         return jsonify({"msg": "No se encontraron subcategorías para esta categoría"}), 404
 
-    return jsonify([{
-        "id_categoria": sc[0],
-        "id_subcategoria": sc[1],
-        "nombre": sc[2]
-    } for sc in subcategorias])
+    return cached_response(taxonomia, subcategorias)
 
 
 # Obtener los detalles de una subcategoría en particular
 @subcategoria_bp.route('/subcategorias/<int:id_categoria>/<int:id_subcategoria>', methods=['GET'])
 @jwt_required
+@read_only
 def obtener_subcategoria_por_id(id_categoria, id_subcategoria):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id_categoria, id_subcategoria, nombre, historia, caracteristicas, requerimientos, tutoriales 
-        FROM Subcategoria 
-        WHERE id_categoria = %s AND id_subcategoria = %s
-    """, (id_categoria, id_subcategoria))
-    subcategoria = cursor.fetchone()
-    cursor.close()
-    conn.close()
+    taxonomia = taxonomy_cache.get()
+    subcategoria = taxonomia.subcategorias.get((id_categoria, id_subcategoria))
 
     if not subcategoria:
         return jsonify({"msg": "Subcategoría no encontrada"}), 404
 
-    return jsonify({
-        "id_categoria": subcategoria[0],
-        "id_subcategoria": subcategoria[1],
-        "nombre": subcategoria[2],
-        "historia": subcategoria[3],
-        "caracteristicas": subcategoria[4],
-        "requerimientos": subcategoria[5],
-        "tutoriales": subcategoria[6]
-    })
+    return cached_response(taxonomia, {
+        "id_categoria": subcategoria["id_categoria"],
+        "id_subcategoria": subcategoria["id_subcategoria"],
+        "nombre": subcategoria["nombre"],
+        "historia": subcategoria["historia"],
+        "caracteristicas": subcategoria["caracteristicas"],
+        "requerimientos": subcategoria["requerimientos"],
+        "tutoriales": subcategoria["tutoriales"]
+    }, key=(id_categoria, id_subcategoria))
 # Eliminar una subcategoría por id_categoria e id_subcategoria (solo admin)
 @subcategoria_bp.route('/subcategorias/<int:id_categoria>/<int:id_subcategoria>', methods=['DELETE'])
 @jwt_required
@@ -145,6 +189,7 @@ def eliminar_subcategoria(id_categoria, id_subcategoria):
             "DELETE FROM Subcategoria WHERE id_categoria = %s AND id_subcategoria = %s",
             (id_categoria, id_subcategoria)
         )
+        taxonomy_cache.invalidate(cursor)
         conn.commit()
         return jsonify({"msg": "Subcategoría eliminada correctamente"}), 200
     except Exception as e:
@@ -194,6 +239,7 @@ def editar_subcategoria(id_categoria, id_subcategoria):
             """,
             (nombre, historia, caracteristicas, requerimientos, tutoriales, id_categoria, id_subcategoria)
         )
+        taxonomy_cache.invalidate(cursor)
         conn.commit()
         return jsonify({"msg": "Subcategoría actualizada correctamente"}), 200
     except Exception as e:
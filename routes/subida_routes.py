@@ -0,0 +1,37 @@
+from flask import Blueprint, request, jsonify
+from models import get_connection
+from utils.auth_decorator import jwt_required
+
+subida_bp = Blueprint("subida", __name__)
+
+# Estado de una subida en segundo plano (solo su autor o un administrador)
+@subida_bp.route('/subidas/<id_subida>', methods=['GET'])
+@jwt_required
+def obtener_subida(id_subida):
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT id, id_usuario, tipo, estado, progreso, urlContenido, id_publicacion, error
+            FROM Subida
+            WHERE id = %s
+        """, (id_subida,))
+        subida = cursor.fetchone()
+        if not subida or (subida[1] != request.user['id'] and request.user['rol'] != 'admin'):
+            return jsonify({"msg": "Subida no encontrada"}), 404
+
+        return jsonify({
+            "id": subida[0],
+            "tipo": subida[2],
+            "estado": subida[3],
+            "progreso": subida[4],
+            "urlContenido": subida[5],
+            "id_publicacion": subida[6],
+            "error": subida[7]
+        }), 200
+
+    except Exception as e:
+        return jsonify({"msg": f"Error al obtener la subida: {str(e)}"}), 500
+    finally:
+        cursor.close()
+        conn.close()
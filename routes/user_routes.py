@@ -1,12 +1,13 @@
-from flask import Blueprint, request, jsonify
-import cloudinary.uploader
+from flask import Blueprint, request, jsonify, url_for
 from utils.auth_decorator import jwt_required
-from models import get_connection
+from utils.uploads import enqueue_upload, UploadQueueFull
+from models import get_connection, read_only
 
 user_bp = Blueprint("user", __name__)  # Cambié auth_bp por user_bp
 
 @user_bp.route('/user', methods=['GET'])
 @jwt_required  # Asegura que el token esté presente y válido
+@read_only
 def get_user_info():
     user_data = request.user  # Los datos del usuario ya están disponibles en request.user
     user_id = user_data.get("id")
@@ -46,7 +47,8 @@ def update_username():
     return jsonify({"msg": "Nombre de usuario actualizado correctamente"}), 200
 
 
-# Ruta para subir la foto de perfil a Cloudinary y actualizar la URL en la base de datos
+# Ruta para subir la foto de perfil: la subida se encola y se responde 202;
+# la URL se guarda en la base de datos cuando termina
 @user_bp.route('/user/profile-picture', methods=['PUT'])
 @jwt_required  # Asegura que el token JWT esté presente y válido
 def update_profile_picture():
@@ -59,17 +61,16 @@ def update_profile_picture():
     if not file:
         return jsonify({"msg": "No se ha proporcionado una imagen"}), 400
 
-    try:
-        # Subir la imagen a Cloudinary
-        upload_result = cloudinary.uploader.upload(file)
-        image_url = upload_result.get('secure_url')  # Obtenemos la URL segura de la imagen
-
-        # Actualizar la URL de la foto en la base de datos
-        conn = get_connection()
-        cursor = conn.cursor()
+    def actualizar_foto(cursor, image_url, derivadas):
         cursor.execute("UPDATE Usuario SET urlFotoPerfil = %s WHERE id = %s", (image_url, user_id))
-        conn.commit()
 
-        return jsonify({"msg": "Foto de perfil actualizada correctamente", "urlFotoPerfil": image_url}), 200
+    try:
+        id_subida = enqueue_upload(file, user_id, "perfil", actualizar_foto)
+    except UploadQueueFull:
+        return jsonify({"msg": "Demasiadas subidas en curso, inténtalo más tarde"}), 503, {"Retry-After": "5"}
     except Exception as e:
         return jsonify({"msg": f"Error al subir la imagen: {str(e)}"}), 500
+
+    return jsonify({"msg": "Foto de perfil en proceso", "id_subida": id_subida}), 202, {
+        "Location": url_for("subida.obtener_subida", id_subida=id_subida)
+    }
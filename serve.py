@@ -0,0 +1,78 @@
+# Servidor de producción/benchmark de la API.
+#
+#   python serve.py --mode gevent --connections 2000     # asíncrono (greenlets)
+#   python serve.py --mode threads --threads 32          # hilos, como gunicorn gthread
+#
+# En modo gevent cada conexión es una greenlet: PyMySQL (Python puro) y la
+# subida a Cloudinary (urllib3) ceden el control mientras esperan la red, así
+# que miles de peticiones en vuelo no necesitan miles de hilos. Los blueprints
+# y las respuestas son exactamente los mismos que con app.run(). Con Gunicorn
+# el equivalente es `gunicorn -k gevent --worker-connections 2000 app:app`.
+import argparse
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--mode", choices=("gevent", "threads"), default="gevent")
+parser.add_argument("--host", default="0.0.0.0")
+parser.add_argument("--port", type=int, default=5000)
+parser.add_argument("--connections", type=int, default=2000, help="conexiones simultáneas en modo gevent")
+parser.add_argument("--threads", type=int, default=32, help="hilos de trabajo en modo threads")
+parser.add_argument("--backlog", type=int, default=1024)
+args = parser.parse_args()
+
+if args.mode == "gevent":
+    # Tiene que ir antes de importar la app: sockets, hilos y locks pasan a ser cooperativos
+    try:
+        from gevent import monkey
+    except ImportError:
+        raise SystemExit("El modo gevent necesita el paquete gevent: pip install gevent")
+    monkey.patch_all()
+
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer
+
+from app import app
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Servidor WSGI con un número fijo de hilos de trabajo.
+
+    Las conexiones que llegan con todos los hilos ocupados esperan en cola,
+    igual que en un worker ``gthread`` de Gunicorn.
+    """
+
+    multithread = True
+
+    def __init__(self, host, port, app, threads, backlog):
+        self.request_queue_size = backlog
+        super().__init__(host, port, app)
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix="wsgi")
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def main():
+    if args.mode == "gevent":
+        from gevent.pool import Pool
+        from gevent.pywsgi import WSGIServer
+
+        server = WSGIServer((args.host, args.port), app, spawn=Pool(args.connections),
+                            backlog=args.backlog, log=None)
+    else:
+        server = PooledWSGIServer(args.host, args.port, app, args.threads, args.backlog)
+
+    print(f"ArtCenter API en http://{args.host}:{args.port} (modo {args.mode})", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,22 @@ from functools import wraps
 from flask import request, jsonify
 from utils.jwt_utils import verify_token
 
+
+def bearer_token():
+    auth = request.headers.get("Authorization")
+    if not auth or not auth.startswith("Bearer "):
+        return None
+    return auth[7:]
+
+
 def jwt_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        auth = request.headers.get("Authorization")
+        token = bearer_token()
 
-        if not auth or not auth.startswith("Bearer "):
+        if not token:
             return jsonify({"msg": "Token requerido"}), 401
 
-        token = auth.split(" ")[1]
         data = verify_token(token)
 
         if not data:
@@ -0,0 +1,123 @@
+import csv
+import io
+import unicodedata
+from flask import request
+
+# Filas como máximo por importación: todo va en una transacción
+MAX_FILAS = 5000
+LOTE = 500
+
+
+class BulkError(Exception):
+    """La carga no es válida; ``errores`` lleva un mensaje por fila."""
+
+    def __init__(self, errores):
+        super().__init__("Carga no válida")
+        self.errores = errores
+
+
+def read_rows(campo):
+    """Filas de la petición como lista de dicts.
+
+    Acepta ``text/csv`` con cabecera, o JSON: una lista de objetos o un objeto
+    con la lista en ``campo`` (``{"categorias": [...]}``).
+    """
+    if request.mimetype == "text/csv":
+        texto = request.get_data(as_text=True)
+        # Las celdas vacías del CSV son campos sin valor
+        filas = [{k: (v if v != "" else None) for k, v in fila.items() if k}
+                 for fila in csv.DictReader(io.StringIO(texto))]
+    else:
+        data = request.get_json(silent=True)
+        filas = data.get(campo) if isinstance(data, dict) else data
+        if not isinstance(filas, list) or not all(isinstance(f, dict) for f in filas):
+            raise BulkError([{"fila": None, "msg": f"Se esperaba una lista de objetos o {{\"{campo}\": [...]}}"}])
+    if not filas:
+        raise BulkError([{"fila": None, "msg": "No hay filas"}])
+    if len(filas) > MAX_FILAS:
+        raise BulkError([{"fila": None, "msg": f"Como máximo {MAX_FILAS} filas por carga"}])
+    return filas
+
+
+def validate(filas, obligatorios, opcionales=(), enteros=()):
+    """Comprueba todas las filas antes de tocar la base de datos.
+
+    Devuelve las filas normalizadas (solo columnas conocidas, texto recortado y
+    enteros convertidos) o lanza ``BulkError`` con todos los errores a la vez.
+    """
+    errores, limpias = [], []
+    for i, fila in enumerate(filas, 1):
+        limpia = {}
+        for campo in (*obligatorios, *opcionales):
+            valor = fila.get(campo)
+            if isinstance(valor, str):
+                valor = valor.strip() or None
+            if valor is not None and campo in enteros:
+                try:
+                    valor = int(valor)
+                except (TypeError, ValueError):
+                    errores.append({"fila": i, "msg": f"'{campo}' debe ser un entero"})
+                    continue
+            elif valor is not None and not isinstance(valor, str):
+                errores.append({"fila": i, "msg": f"'{campo}' debe ser texto"})
+                continue
+            if valor is None and campo in obligatorios:
+                errores.append({"fila": i, "msg": f"'{campo}' es obligatorio"})
+            limpia[campo] = valor
+        if "nombre" in limpia and limpia["nombre"] and len(limpia["nombre"]) > 255:
+            errores.append({"fila": i, "msg": "'nombre' admite como máximo 255 caracteres"})
+        limpias.append(limpia)
+    if errores:
+        raise BulkError(errores)
+    return limpias
+
+
+def _comparable(valor):
+    # Como la collation de las columnas (utf8mb4_0900_ai_ci): sin acentos ni mayúsculas
+    if not isinstance(valor, str):
+        return valor
+    sin_acentos = "".join(c for c in unicodedata.normalize("NFKD", valor) if not unicodedata.combining(c))
+    return sin_acentos.casefold()
+
+
+def repeated(claves):
+    # Errores por las filas que repiten una clave ya vista en la misma carga
+    vistas, errores = {}, []
+    for i, clave in enumerate(claves, 1):
+        k = tuple(_comparable(v) for v in clave)
+        if k in vistas:
+            errores.append({"fila": i, "msg": f"Repite la fila {vistas[k]}"})
+        else:
+            vistas[k] = i
+    return errores
+
+
+def existing(cursor, join, columnas, claves):
+    """Posiciones (desde 1) de las ``claves`` que casan con ``join``.
+
+    Las claves viajan como tabla derivada ``t`` con ``columnas``, así la
+    comparación usa la collation de la columna (mayúsculas y acentos) igual
+    que el alta de una en una, y se resuelve por lotes en vez de fila a fila.
+    """
+    encontradas = set()
+    claves = list(enumerate(claves, 1))
+    select = "SELECT %s AS i, " + ", ".join(f"%s AS {c}" for c in columnas)
+    for n in range(0, len(claves), LOTE):
+        lote = claves[n:n + LOTE]
+        cursor.execute(f"SELECT DISTINCT t.i FROM ({' UNION ALL '.join([select] * len(lote))}) t {join}",
+                       [v for i, clave in lote for v in (i, *clave)])
+        encontradas.update(f[0] for f in cursor.fetchall())
+    return encontradas
+
+
+def conflicts(duplicadas, ocupadas):
+    # Errores por fila de las claves ya existentes y de los nombres de etiqueta ocupados
+    errores = [{"fila": i, "msg": "Ya existe"} for i in duplicadas]
+    errores += [{"fila": i, "msg": "Ya existe una etiqueta con ese nombre"} for i in ocupadas]
+    return sorted(errores, key=lambda e: e["fila"])
+
+
+def insert_many(cursor, sql, params):
+    # PyMySQL agrupa el executemany de un INSERT ... VALUES en sentencias multi-fila
+    for i in range(0, len(params), LOTE):
+        cursor.executemany(sql, params[i:i + LOTE])
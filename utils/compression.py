@@ -0,0 +1,75 @@
+import gzip
+import zlib
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se ofrece gzip
+    brotli = None
+
+COMPRESSIBLE = ("application/json", "application/x-ndjson", "text/plain", "text/csv")
+
+
+def negotiate():
+    # Codificación preferida que acepta el cliente: br si está disponible, si no gzip
+    aceptadas = request.accept_encodings
+    if brotli is not None and aceptadas["br"]:
+        return "br"
+    if aceptadas["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def _compress_stream(chunks, encoding):
+    # Cada trozo se comprime y se vacía enseguida: el streaming sigue siendo streaming
+    if encoding == "br":
+        compresor = brotli.Compressor(quality=5)
+        for chunk in chunks:
+            yield compresor.process(chunk) + compresor.flush()
+        yield compresor.finish()
+    else:
+        compresor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            yield compresor.compress(chunk) + compresor.flush(zlib.Z_SYNC_FLUSH)
+        yield compresor.flush()
+
+
+def set_encoding(response, encoding):
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    # El cuerpo comprimido es equivalente pero no idéntico: el ETag pasa a débil
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def _after_request(response):
+    response.vary.add("Accept-Encoding")
+    if (response.status_code < 200 or response.status_code in (204, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE):
+        return response
+    encoding = negotiate()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < current_app.config["COMPRESS_MIN_SIZE"]:
+            return response
+        response.set_data(compress(data, encoding))
+    set_encoding(response, encoding)
+    return response
+
+
+def init_app(app):
+    app.after_request(_after_request)
@@ -0,0 +1,19 @@
+from flask import current_app, request
+from werkzeug.http import is_resource_modified
+
+
+def not_modified(etag, last_modified=None):
+    """Respuesta 304 si el cliente ya tiene esta versión (If-None-Match o
+    If-Modified-Since); ``None`` si hay que generar el cuerpo."""
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return with_validators(current_app.response_class(status=304), etag, last_modified)
+
+
+def with_validators(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # El cuerpo depende del usuario: nada de cachés compartidas y revalidar siempre
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
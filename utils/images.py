@@ -0,0 +1,52 @@
+import logging
+import os
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow es opcional: sin él las derivadas apuntan al original
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Derivadas de cada imagen publicada: (ancho, alto, recorte)
+# "fill" recorta al centro hasta llenar el tamaño (casillas del grid) y "fit"
+# reduce sin recortar, conservando la proporción
+DERIVADAS = {
+    "miniatura": (320, 320, "fill"),
+    "mediana": (1080, 1080, "fit"),
+}
+CALIDAD = 80
+
+
+def cloudinary_url(url, ancho, alto, recorte):
+    # Cloudinary genera la derivada al vuelo a partir de la transformación en la URL
+    transformacion = "c_fill,g_auto" if recorte == "fill" else "c_limit"
+    transformacion += f",w_{ancho},h_{alto},f_auto,q_auto"
+    return url.replace("/upload/", f"/upload/{transformacion}/", 1)
+
+
+def generate(path):
+    """Genera con Pillow las derivadas de ``path`` junto al original.
+
+    Devuelve ``{nombre: ruta}``; vacío si Pillow no está instalado o el fichero
+    no es una imagen que sepa leer.
+    """
+    if Image is None:
+        return {}
+    base = os.path.splitext(path)[0]
+    try:
+        with Image.open(path) as original:
+            original = ImageOps.exif_transpose(original).convert("RGB")
+            rutas = {}
+            for nombre, (ancho, alto, recorte) in DERIVADAS.items():
+                if recorte == "fill":
+                    imagen = ImageOps.fit(original, (ancho, alto), Image.LANCZOS)
+                else:
+                    imagen = original.copy()
+                    imagen.thumbnail((ancho, alto), Image.LANCZOS)
+                rutas[nombre] = f"{base}_{nombre}.jpg"
+                imagen.save(rutas[nombre], "JPEG", quality=CALIDAD, optimize=True, progressive=True)
+            return rutas
+    except OSError:
+        logger.warning("No se pudieron generar derivadas de %s", path, exc_info=True)
+        return {}
@@ -0,0 +1,47 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Proveedor JSON de Flask sobre orjson.
+
+    Produce lo mismo que el proveedor por defecto (claves ordenadas, fechas
+    en formato HTTP vía ``default``) salvo que no escapa los caracteres no
+    ASCII. Si se piden argumentos propios de ``json.dumps`` (``indent``...)
+    se delega en la implementación estándar.
+    """
+
+    OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+               if orjson else 0)
+
+    def dumps_bytes(self, obj):
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+
+def init_app(app):
+    # JSON_BACKEND: "auto" usa orjson si está instalado, "json" fuerza la librería estándar
+    backend = app.config["JSON_BACKEND"]
+    if backend == "orjson" and orjson is None:
+        raise RuntimeError("JSON_BACKEND=orjson pero orjson no está instalado")
+    if backend in ("auto", "orjson") and orjson is not None:
+        app.json = OrjsonProvider(app)
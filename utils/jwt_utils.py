@@ -1,25 +1,145 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
+import hashlib
+import json
+import logging
+import threading
+import time
 import jwt
 from config import Config
-import json
+from models import get_connection
+
+logger = logging.getLogger(__name__)
+
 
 def generate_token(data, expires_in=128):
     payload = {
         "exp": datetime.utcnow() + timedelta(hours=expires_in),
         "iat": datetime.utcnow(),
-        "sub": json.dumps(data)
+        "sub": str(data["id"]),
+        "rol": data["rol"]
     }
     return jwt.encode(payload, Config.JWT_SECRET_KEY, algorithm="HS256")
 
 
-def verify_token(token):
+def token_digest(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# Resultado de TokenCache.get cuando el token no está en caché
+MISS = object()
+
+
+class TokenCache:
+    """LRU acotado del resultado de verificar cada token, indexado por su hash.
+
+    Cada entrada guarda los claims (``None`` si el token está revocado), su
+    ``exp`` y hasta cuándo vale la consulta a Token_Revocado: pasados
+    ``recheck`` segundos se vuelve a mirar la tabla, así las revocaciones hechas
+    en otro worker se notan aquí. Una entrada caducada nunca se sirve.
+    """
+
+    def __init__(self, max_size=10000, recheck=30):
+        self.max_size = max_size
+        self.recheck = recheck
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # digest -> (claims, exp, válida hasta)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest, now):
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return MISS
+            claims, exp, until = entry
+            if exp <= now or until <= now:
+                del self._entries[digest]
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return claims
+
+    def put(self, digest, claims, exp, now):
+        # Un token revocado lo sigue estando hasta que caduca
+        until = now + self.recheck if claims is not None else exp
+        with self._lock:
+            self._entries[digest] = (claims, exp, until)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(Config.JWT_CACHE_SIZE, Config.JWT_REVOCATION_CHECK)
+
+
+def _claims_from_payload(payload):
+    # Tokens antiguos: "sub" llevaba un JSON con id y rol
+    if "rol" not in payload:
+        return json.loads(payload["sub"])
+    return {"id": int(payload["sub"]), "rol": payload["rol"]}
+
+
+def decode_token(token):
     try:
         payload = jwt.decode(token, Config.JWT_SECRET_KEY, algorithms=["HS256"])
-        return json.loads(payload["sub"])
+        return _claims_from_payload(payload), payload["exp"]
     except jwt.ExpiredSignatureError:
-        print("❌ Token expirado")
+        logger.info("Token expirado")
+        return None, None
+    except (jwt.InvalidTokenError, ValueError, KeyError) as e:
+        logger.warning("Token inválido: %s", e)
+        return None, None
+
+
+def is_revoked(digest):
+    # En el primario: una revocación recién hecha aún puede no estar en las réplicas
+    cursor = get_connection(primary=True).cursor()
+    try:
+        cursor.execute("SELECT 1 FROM Token_Revocado WHERE digest = %s", (digest,))
+        return cursor.fetchone() is not None
+    finally:
+        cursor.close()
+
+
+def verify_token(token):
+    digest = token_digest(token)
+    now = time.time()
+    claims = token_cache.get(digest, now)
+    if claims is not MISS:
+        return dict(claims) if claims is not None else None
+
+    claims, exp = decode_token(token)
+    if claims is None:
         return None
-    except jwt.InvalidTokenError as e:
-        print("❌ Token inválido:", e)
+    try:
+        revocado = is_revoked(digest)
+    except Exception:
+        # Sin poder comprobarlo no se acepta, pero tampoco se guarda en caché
+        logger.warning("No se pudo comprobar si el token está revocado", exc_info=True)
         return None
+    token_cache.put(digest, None if revocado else claims, exp, now)
+    return None if revocado else dict(claims)
 
+
+def revoke_token(token):
+    claims, exp = decode_token(token)
+    if claims is None:
+        return False
+    digest = token_digest(token)
+    cursor = get_connection(primary=True).cursor()
+    try:
+        cursor.execute("INSERT IGNORE INTO Token_Revocado (digest, exp) VALUES (%s, FROM_UNIXTIME(%s))",
+                       (digest, exp))
+        # De paso se olvidan los revocados que ya caducaron
+        cursor.execute("DELETE FROM Token_Revocado WHERE exp < NOW() LIMIT 1000")
+    finally:
+        cursor.close()
+    token_cache.put(digest, None, exp, time.time())
+    return True
@@ -0,0 +1,97 @@
+import atexit
+import logging
+import threading
+from flask import current_app
+from models import get_connection
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH = 500
+
+
+class LikeCounter:
+    """Acumula en memoria los cambios del contador ``Publicacion.likes``.
+
+    Cada like/unlike suma o resta en un diccionario y un hilo vuelca los
+    deltas cada ``flush_interval`` segundos con un único UPDATE por lote, en
+    orden de id. Así una publicación viral no serializa todos los likes sobre
+    el bloqueo de su fila; a cambio, ``likes`` puede ir hasta un intervalo por
+    detrás de ``Usuario_Da_Like``.
+    """
+
+    def __init__(self, flush_interval=2.0):
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._deltas = {}
+        self._app = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def record(self, id_publicacion, delta):
+        with self._lock:
+            self._deltas[id_publicacion] = self._deltas.get(id_publicacion, 0) + delta
+        if self._thread is None:
+            self.start(current_app._get_current_object())
+
+    def pending(self, id_publicacion):
+        # Delta aún sin volcar en este proceso, para que el autor vea su propio like
+        with self._lock:
+            return self._deltas.get(id_publicacion, 0)
+
+    def start(self, app):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._app = app
+            self._thread = threading.Thread(target=self._run, name="like-counter", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+        deltas = {id: d for id, d in deltas.items() if d}
+        if not deltas or self._app is None:
+            return
+
+        ids = sorted(deltas)
+        try:
+            with self._app.app_context():
+                cursor = get_connection().cursor()
+                try:
+                    for i in range(0, len(ids), FLUSH_BATCH):
+                        lote = ids[i:i + FLUSH_BATCH]
+                        casos = " ".join(["WHEN %s THEN %s"] * len(lote))
+                        marcadores = ", ".join(["%s"] * len(lote))
+                        params = [v for id in lote for v in (id, deltas[id])]
+                        cursor.execute(f"""
+                            UPDATE Publicacion
+                            SET likes = likes + CASE id {casos} ELSE 0 END
+                            WHERE id IN ({marcadores})
+                        """, (*params, *lote))
+                        for id in lote:
+                            del deltas[id]
+                finally:
+                    cursor.close()
+        except Exception:
+            # Lo que no se pudo volcar vuelve a la cola para el siguiente intento
+            logger.exception("Error al volcar contadores de likes")
+            with self._lock:
+                for id, d in deltas.items():
+                    self._deltas[id] = self._deltas.get(id, 0) + d
+
+
+def get_like_counter(app=None):
+    app = app or current_app
+    counter = app.extensions.get("like_counter")
+    if counter is None:
+        counter = app.extensions["like_counter"] = LikeCounter(app.config["LIKES_FLUSH_INTERVAL"])
+    return counter
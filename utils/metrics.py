@@ -0,0 +1,192 @@
+import threading
+import time
+from flask import current_app, g, request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+
+class Histogram:
+    """Histograma acumulado con etiquetas, en el formato de Prometheus."""
+
+    def __init__(self, name, help, buckets, labels):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._series = {}   # valores de etiquetas -> [cuentas por bucket..., suma, total]
+
+    def observe(self, label_values, value):
+        with self._lock:
+            serie = self._series.get(label_values)
+            if serie is None:
+                serie = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            for i, limite in enumerate(self.buckets):
+                if value <= limite:
+                    serie[i] += 1
+            serie[-2] += value
+            serie[-1] += 1
+
+    def render(self):
+        lineas = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for label_values, serie in sorted(series.items()):
+            etiquetas = ",".join(f'{k}="{v}"' for k, v in zip(self.labels, label_values))
+            sep = "," if etiquetas else ""
+            for limite, cuenta in zip(self.buckets, serie):
+                lineas.append(f'{self.name}_bucket{{{etiquetas}{sep}le="{limite}"}} {cuenta}')
+            lineas.append(f'{self.name}_bucket{{{etiquetas}{sep}le="+Inf"}} {serie[-1]}')
+            lineas.append(f"{self.name}_sum{{{etiquetas}}} {serie[-2]}")
+            lineas.append(f"{self.name}_count{{{etiquetas}}} {serie[-1]}")
+        return lineas
+
+
+class Counter:
+    def __init__(self, name, help, labels):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, label_values, value=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + value
+
+    def render(self):
+        lineas = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            valores = dict(self._values)
+        for label_values, valor in sorted(valores.items()):
+            etiquetas = ",".join(f'{k}="{v}"' for k, v in zip(self.labels, label_values))
+            lineas.append(f"{self.name}{{{etiquetas}}} {valor}")
+        return lineas
+
+
+ETIQUETAS = ("blueprint", "endpoint")
+
+request_duration = Histogram("artcenter_http_request_duration_seconds",
+                             "Duración de cada petición por endpoint", LATENCY_BUCKETS, ETIQUETAS)
+sql_duration = Histogram("artcenter_sql_duration_seconds",
+                         "Tiempo total de SQL por petición", LATENCY_BUCKETS, ETIQUETAS)
+sql_queries = Histogram("artcenter_sql_queries_per_request",
+                        "Consultas SQL ejecutadas por petición", QUERY_BUCKETS, ETIQUETAS)
+requests_total = Counter("artcenter_http_requests_total",
+                         "Peticiones atendidas por endpoint y código de estado", ETIQUETAS + ("status",))
+sql_rows_total = Counter("artcenter_sql_rows_fetched_total",
+                         "Filas leídas de MySQL por endpoint", ETIQUETAS)
+
+
+class RequestStats:
+    __slots__ = ("queries", "sql_time", "rows")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.rows = 0
+
+
+class InstrumentedCursor:
+    """Cursor que cuenta consultas, tiempo de SQL y filas leídas de la petición."""
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _timed(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self._stats.sql_time += time.perf_counter() - start
+
+    def execute(self, query, args=None):
+        self._stats.queries += 1
+        return self._timed(self._cursor.execute, query, args)
+
+    def executemany(self, query, args):
+        self._stats.queries += 1
+        return self._timed(self._cursor.executemany, query, args)
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(self._cursor.fetchmany, size)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        self._stats.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def request_stats():
+    stats = g.get("sql_stats")
+    if stats is None:
+        stats = g.sql_stats = RequestStats()
+    return stats
+
+
+def _labels():
+    endpoint = request.endpoint or "none"
+    return (request.blueprint or "app", endpoint.rsplit(".", 1)[-1])
+
+
+def _before_request():
+    # Se consulta en cada petición para poder apagarlo en caliente (benchmarks)
+    if not current_app.config["METRICS_ENABLED"]:
+        return
+    g.request_start = time.perf_counter()
+
+
+def _after_request(response):
+    start = g.get("request_start")
+    if start is None:
+        return response
+    duracion = time.perf_counter() - start
+    stats = request_stats()
+    labels = _labels()
+
+    request_duration.observe(labels, duracion)
+    sql_duration.observe(labels, stats.sql_time)
+    sql_queries.observe(labels, stats.queries)
+    sql_rows_total.inc(labels, stats.rows)
+    requests_total.inc(labels + (str(response.status_code),))
+
+    response.headers["Server-Timing"] = (
+        f'db;dur={stats.sql_time * 1000:.2f};desc="{stats.queries} queries, {stats.rows} rows", '
+        f"total;dur={duracion * 1000:.2f}"
+    )
+    return response
+
+
+def render_metrics(extra=()):
+    lineas = []
+    for metrica in (request_duration, sql_duration, sql_queries, requests_total, sql_rows_total):
+        lineas.extend(metrica.render())
+    lineas.extend(extra)
+    return "\n".join(lineas) + "\n"
+
+
+def init_app(app):
+    app.before_request(_before_request)
+    app.after_request(_after_request)
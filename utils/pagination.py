@@ -0,0 +1,69 @@
+import base64
+import json
+from datetime import datetime
+from flask import jsonify
+
+PER_PAGE = 20
+COMENTARIOS_POR_PAGINA = 50
+MAX_COMENTARIOS_POR_PAGINA = 200
+
+
+def encode_cursor(valor, id):
+    # Cursor opaco con el último (valor de orden, id) devuelto: una fecha o una puntuación
+    if isinstance(valor, datetime):
+        valor = valor.isoformat()
+    raw = json.dumps([valor, id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        valor, id = json.loads(base64.urlsafe_b64decode(padded))
+        if isinstance(valor, str):
+            valor = datetime.fromisoformat(valor)
+        elif not isinstance(valor, (int, float)):
+            raise TypeError(valor)
+        return valor, int(id)
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido")
+
+
+def parse_page_args(args):
+    """Lee ``cursor`` o ``page`` de la query string.
+
+    Devuelve ``(keyset, offset, cursor_mode)``. Con ``cursor`` (vacío para la
+    primera página) se pagina por keyset; si no, se mantiene el ``page``
+    clásico con OFFSET. Lanza ``ValueError`` si el cursor no es válido.
+    """
+    if "cursor" in args:
+        cursor = args.get("cursor", "")
+        return (decode_cursor(cursor) if cursor else None), 0, True
+    return None, args.get("page", 0, type=int) * PER_PAGE, False
+
+
+def keyset_condition(keyset, sort_col="p.fecha_publicacion", id_col="p.id", descending=True):
+    # Condición para seguir justo después del cursor en ORDER BY sort_col, id (DESC o ASC)
+    if keyset is None:
+        return "TRUE", ()
+    valor, id = keyset
+    op = "<" if descending else ">"
+    return f"({sort_col} {op} %s OR ({sort_col} = %s AND {id_col} {op} %s))", (valor, valor, id)
+
+
+def split_page(filas, per_page=PER_PAGE):
+    # Las consultas piden per_page + 1 filas y la última columna es el valor de orden
+    if len(filas) <= per_page:
+        return filas, None
+    filas = filas[:per_page]
+    last = filas[-1]
+    return filas, encode_cursor(last[-1], last[0])
+
+
+def page_response(resultados, next_cursor, cursor_mode, empty_msg):
+    # Con cursor siempre 200 y objeto; con page se mantiene la lista y el 404
+    if cursor_mode:
+        return jsonify({"publicaciones": resultados, "next_cursor": next_cursor}), 200
+    if not resultados:
+        return jsonify({"msg": empty_msg}), 404
+    return jsonify(resultados), 200
@@ -0,0 +1,102 @@
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HasherBusy(Exception):
+    """Hay demasiadas operaciones de contraseña en cola."""
+
+
+@functools.lru_cache(maxsize=None)
+def _prefijo(method):
+    # Cabecera ("scrypt:32768:8:1", "pbkdf2:sha256:1000000"...) de los hashes nuevos
+    return generate_password_hash("", method).split("$", 1)[0]
+
+
+def _hash(password, method):
+    return generate_password_hash(password, method)
+
+
+def _verify(stored_hash, password, method):
+    # Devuelve (correcta, hash nuevo si el guardado usa parámetros antiguos)
+    if not check_password_hash(stored_hash, password):
+        return False, None
+    if stored_hash.split("$", 1)[0] != _prefijo(method):
+        return True, generate_password_hash(password, method)
+    return True, None
+
+
+class PasswordHasher:
+    """Calcula y comprueba hashes de contraseña en un pool de procesos.
+
+    scrypt/pbkdf2 son caros a propósito y retienen el GIL: en el hilo de la
+    petición un pico de logins paraliza el resto del worker. Aquí se envían a
+    ``workers`` procesos; si ya hay ``max_pending`` operaciones en vuelo se
+    lanza ``HasherBusy`` (503) en vez de acumular esperas. Con ``workers=0``
+    se calcula en el propio hilo, como antes.
+    """
+
+    def __init__(self, workers=2, max_pending=32, timeout=10.0, method="scrypt"):
+        self.workers = workers
+        self.timeout = timeout
+        self.method = method
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # forkserver: no se hace fork de un proceso con hilos y conexiones abiertas
+                if "forkserver" in multiprocessing.get_all_start_methods():
+                    contexto = multiprocessing.get_context("forkserver")
+                    contexto.set_forkserver_preload(["werkzeug.security"])
+                else:
+                    contexto = multiprocessing.get_context("spawn")
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=contexto)
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy("Cola de contraseñas llena")
+        try:
+            future = self._pool().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # El hueco se libera cuando el proceso acaba la operación, no cuando la
+        # petición deja de esperarla: tras un timeout el trabajo sigue en cola
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            raise HasherBusy("Las contraseñas tardan demasiado")
+
+    def hash(self, password):
+        return self._run(_hash, password, self.method)
+
+    def verify(self, stored_hash, password):
+        """``(correcta, hash_nuevo)``; ``hash_nuevo`` solo si hay que rehacer el guardado."""
+        return self._run(_verify, stored_hash, password, self.method)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def get_password_hasher(app=None):
+    app = app or current_app
+    hasher = app.extensions.get("password_hasher")
+    if hasher is None:
+        hasher = app.extensions["password_hasher"] = PasswordHasher(
+            app.config["PASSWORD_WORKERS"], app.config["PASSWORD_QUEUE_SIZE"],
+            app.config["PASSWORD_TIMEOUT"], app.config["PASSWORD_HASH_METHOD"]
+        )
+    return hasher
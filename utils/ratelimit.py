@@ -0,0 +1,273 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, g, jsonify, request
+from utils.auth_decorator import bearer_token
+from utils.jwt_utils import verify_token
+from utils.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# Límites por cliente (usuario del token o, sin token, IP) como "tasa/ráfaga":
+# peticiones por segundo y cuántas seguidas se toleran. Se busca el endpoint
+# ("blueprint.funcion"), luego el blueprint y si no el límite por defecto.
+# Cada clave es un cubo aparte: todo lo que cae en el defecto comparte uno.
+# RATE_LIMITS los sobrescribe o añade ("publicacion.buscar_publicaciones=1/5,auth=0.5/5").
+LIMITES = {
+    "auth": "1/10",
+    "publicacion.buscar_publicaciones": "2/10",
+    "publicacion.like_publicacion": "5/20",
+    "publicacion.guardar_publicacion": "5/20",
+    "publicacion.crear_publicacion": "0.2/5",
+    "comentario.crear_comentario": "1/5",
+    "batch": "0.5/10",
+    "export": "0.1/2",
+}
+
+# Clase de admisión por endpoint o blueprint; el resto va a "lectura" (GET) o "escritura"
+CLASES = {
+    "publicacion.buscar_publicaciones": "busqueda",
+    "export": "exportacion",
+}
+
+# Sin límites ni control de admisión: monitorización, documentación y estáticos
+EXENTOS = {"monitor", "swagger_ui", "static"}
+
+rejected_total = Counter("artcenter_http_rejected_total",
+                         "Peticiones rechazadas por límite de tasa o control de admisión", ("reason", "class"))
+
+
+def parse_limit(valor):
+    # "tasa/ráfaga" -> (tasa, ráfaga); "0" o vacío desactiva el límite
+    if not valor or valor.strip() == "0":
+        return None
+    tasa, _, rafaga = valor.partition("/")
+    tasa = float(tasa)
+    if tasa <= 0:
+        return None
+    return tasa, float(rafaga) if rafaga else max(1.0, tasa)
+
+
+def parse_rules(texto):
+    # "clave=valor,clave=valor" -> {clave: valor}
+    reglas = {}
+    for parte in texto.split(","):
+        if parte.strip():
+            clave, _, valor = parte.partition("=")
+            reglas[clave.strip()] = valor.strip()
+    return reglas
+
+
+class MemoryStore:
+    """Cubos de tokens en memoria del proceso, con un LRU acotado de claves.
+
+    Con varios procesos cada uno lleva su propia cuenta: el límite efectivo se
+    multiplica por el número de workers. Para compartirlo, ``RedisStore``.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._cubos = OrderedDict()   # clave -> [tokens, instante]
+
+    def take(self, clave, tasa, rafaga):
+        # Segundos hasta que haya un token; 0 si se concede (y se consume)
+        ahora = time.monotonic()
+        with self._lock:
+            cubo = self._cubos.get(clave)
+            if cubo is None:
+                cubo = self._cubos[clave] = [rafaga, ahora]
+                while len(self._cubos) > self.max_keys:
+                    self._cubos.popitem(last=False)
+            else:
+                self._cubos.move_to_end(clave)
+                cubo[0] = min(rafaga, cubo[0] + (ahora - cubo[1]) * tasa)
+                cubo[1] = ahora
+            if cubo[0] >= 1:
+                cubo[0] -= 1
+                return 0.0
+            return (1 - cubo[0]) / tasa
+
+
+# El cubo entero se actualiza en Redis en un solo paso, con el reloj del servidor
+_SCRIPT_REDIS = """
+local t = redis.call('TIME')
+local ahora = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tasa = tonumber(ARGV[1])
+local rafaga = tonumber(ARGV[2])
+local cubo = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(cubo[1]) or rafaga
+local ts = tonumber(cubo[2]) or ahora
+tokens = math.min(rafaga, tokens + math.max(0, ahora - ts) * tasa)
+local espera = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    espera = (1 - tokens) / tasa
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', ahora)
+redis.call('PEXPIRE', KEYS[1], math.ceil(rafaga / tasa * 1000) + 1000)
+return tostring(espera)
+"""
+
+
+class RedisStore:
+    """Cubos de tokens compartidos entre procesos y máquinas en Redis.
+
+    Necesita el paquete ``redis`` (opcional). Si Redis no responde la petición
+    se deja pasar: el límite es una protección, no debe tumbar la API.
+    """
+
+    def __init__(self, url, prefijo="artcenter:rl:"):
+        import redis
+        self._cliente = redis.Redis.from_url(url, socket_timeout=0.05)
+        self._script = self._cliente.register_script(_SCRIPT_REDIS)
+        self._prefijo = prefijo
+
+    def take(self, clave, tasa, rafaga):
+        try:
+            return float(self._script(keys=[self._prefijo + clave], args=[tasa, rafaga]))
+        except Exception:
+            logger.warning("Límite de tasa sin Redis, se deja pasar la petición", exc_info=True)
+            return 0.0
+
+
+class Admission:
+    """Límite de peticiones simultáneas de una clase de endpoints.
+
+    Sin hueco libre la petición espera como mucho ``objetivo`` segundos. Si
+    alguna agota esa espera, durante el siguiente ``objetivo`` las que no
+    encuentren hueco se rechazan al momento en vez de hacer cola: con MySQL
+    lento la cola deja de crecer y los huecos quedan para las que ya entraron.
+    """
+
+    def __init__(self, limite, objetivo):
+        self.limite = limite
+        self.objetivo = objetivo
+        self._huecos = threading.BoundedSemaphore(limite)
+        self._lock = threading.Lock()
+        self._saturada_hasta = 0.0
+        self.esperando = 0
+        self.rechazadas = 0
+
+    def acquire(self):
+        if self._huecos.acquire(blocking=False):
+            return True
+        with self._lock:
+            if time.monotonic() < self._saturada_hasta:
+                self.rechazadas += 1
+                return False
+            self.esperando += 1
+        try:
+            concedido = self._huecos.acquire(timeout=self.objetivo)
+        finally:
+            with self._lock:
+                self.esperando -= 1
+        if not concedido:
+            with self._lock:
+                self._saturada_hasta = time.monotonic() + self.objetivo
+                self.rechazadas += 1
+        return concedido
+
+    def release(self):
+        self._huecos.release()
+
+    def stats(self):
+        with self._lock:
+            return {"limite": self.limite, "esperando": self.esperando, "rechazadas": self.rechazadas}
+
+
+class RateLimiter:
+    def __init__(self, store, limites, por_ip, clases, objetivo):
+        self.store = store
+        self.limites = {clave: parse_limit(valor) for clave, valor in limites.items()}
+        self.por_ip = parse_limit(por_ip)
+        self.admision = {clase: Admission(limite, objetivo) for clase, limite in clases.items()}
+
+    def rule(self, endpoint, blueprint):
+        # (clave del cubo, (tasa, ráfaga)) que aplica al endpoint
+        for clave in (endpoint, blueprint, "default"):
+            if clave in self.limites:
+                return clave, self.limites[clave]
+        return "default", None
+
+    def admission_class(self, endpoint, blueprint, method):
+        clase = CLASES.get(endpoint) or CLASES.get(blueprint)
+        if clase is None:
+            clase = "lectura" if method in ("GET", "HEAD") else "escritura"
+        return clase, self.admision.get(clase)
+
+
+def _cliente():
+    # Usuario del token si es válido (la verificación queda en caché para
+    # jwt_required); si no, la IP
+    token = bearer_token()
+    datos = verify_token(token) if token else None
+    if datos:
+        return f"u{datos['id']}"
+    return f"ip{request.remote_addr}"
+
+
+def _demasiadas(espera, motivo, clase):
+    rejected_total.inc((motivo, clase))
+    respuesta = jsonify({"msg": "Demasiadas peticiones, inténtalo más tarde"})
+    return respuesta, 429, {"Retry-After": str(max(1, math.ceil(espera)))}
+
+
+def _before_request():
+    if not current_app.config["RATE_LIMIT_ENABLED"]:
+        return None
+    blueprint = request.blueprint
+    endpoint = request.endpoint
+    if endpoint is None or endpoint in EXENTOS or blueprint in EXENTOS:
+        return None
+    limiter = get_rate_limiter()
+    clase, admision = limiter.admission_class(endpoint, blueprint, request.method)
+
+    if limiter.por_ip:
+        espera = limiter.store.take(f"ip:{request.remote_addr}", *limiter.por_ip)
+        if espera:
+            return _demasiadas(espera, "ip", clase)
+    clave, limite = limiter.rule(endpoint, blueprint)
+    if limite:
+        espera = limiter.store.take(f"{clave}:{_cliente()}", *limite)
+        if espera:
+            return _demasiadas(espera, "cliente", clase)
+
+    if admision is not None:
+        if not admision.acquire():
+            rejected_total.inc(("admision", clase))
+            return jsonify({"msg": "Servicio saturado, inténtalo de nuevo"}), 503, {"Retry-After": "1"}
+        g.admision = admision
+    return None
+
+
+def _teardown_request(exc):
+    admision = g.pop("admision", None)
+    if admision is not None:
+        admision.release()
+
+
+def get_rate_limiter(app=None):
+    app = app or current_app
+    limiter = app.extensions.get("rate_limiter")
+    if limiter is None:
+        config = app.config
+        url = config["RATE_LIMIT_STORE"]
+        if url.startswith(("redis://", "rediss://", "unix://")):
+            store = RedisStore(url)
+        else:
+            store = MemoryStore(config["RATE_LIMIT_MAX_KEYS"])
+        limites = {"default": config["RATE_LIMIT_DEFAULT"], **LIMITES, **parse_rules(config["RATE_LIMITS"])}
+        clases = {clase: int(limite) for clase, limite in parse_rules(config["ADMISSION_LIMITS"]).items()}
+        limiter = app.extensions["rate_limiter"] = RateLimiter(
+            store, limites, config["RATE_LIMIT_PER_IP"], clases, config["ADMISSION_QUEUE_TARGET"]
+        )
+    return limiter
+
+
+def init_app(app):
+    app.before_request(_before_request)
+    app.teardown_request(_teardown_request)
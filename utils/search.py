@@ -0,0 +1,28 @@
+import re
+import unicodedata
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def fold(text):
+    # Minúsculas y sin tildes, igual que la colación utf8mb4_0900_ai_ci del índice
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def is_email(query):
+    return bool(_EMAIL.match(query))
+
+
+def boolean_query(query):
+    """Convierte el texto del usuario en una consulta FULLTEXT en modo booleano.
+
+    Cada palabra es obligatoria y se busca por prefijo (``+acuarel*``), así la
+    búsqueda funciona mientras se escribe. Los operadores que escriba el
+    usuario se descartan. Devuelve ``None`` si no queda ninguna palabra.
+    """
+    tokens = _TOKEN.findall(fold(query))
+    if not tokens:
+        return None
+    return " ".join(f"+{t}*" for t in tokens)
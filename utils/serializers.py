@@ -0,0 +1,59 @@
+from flask import current_app
+from utils.json_provider import OrjsonProvider
+
+
+class Schema:
+    """Columnas de un recurso, en el mismo orden que el SELECT que lo lee.
+
+    Cada campo es un nombre o un par ``(nombre, conversor)``. Las filas del
+    cursor se convierten en dicts con ``zip`` sobre los nombres, que se
+    calculan una vez, y solo se recorren después los campos con conversor.
+    Las columnas de más al final de la fila (p. ej. el valor de orden del
+    cursor) se ignoran.
+    """
+
+    def __init__(self, *fields):
+        self.names = tuple(f if isinstance(f, str) else f[0] for f in fields)
+        self.converters = tuple(f for f in fields if not isinstance(f, str))
+
+    def row(self, f):
+        fila = dict(zip(self.names, f))
+        for nombre, conversor in self.converters:
+            fila[nombre] = conversor(fila[nombre])
+        return fila
+
+    def rows(self, filas):
+        nombres = self.names
+        resultado = [dict(zip(nombres, f)) for f in filas]
+        for nombre, conversor in self.converters:
+            for fila in resultado:
+                fila[nombre] = conversor(fila[nombre])
+        return resultado
+
+
+PUBLICACION = Schema(
+    "id", "urlContenido", "urlMiniatura", "id_etiqueta", "nombre_etiqueta", "id_categoria", "id_subcategoria",
+    ("liked", bool), ("saved", bool), "id_usuario",
+)
+PUBLICACION_DETALLE = Schema(
+    "id", "urlContenido", "urlMiniatura", "urlMediana", "descripcion", "fecha_publicacion", "likes",
+    "nombre_etiqueta", "id_etiqueta", "id_categoria", "id_subcategoria", ("liked", bool), ("saved", bool),
+    "id_usuario",
+)
+ESTADO_PUBLICACION = Schema("id", ("liked", bool), ("saved", bool), "likes", "comentarios")
+COMENTARIO = Schema("id", "id_usuario", "username", "contenido", "fecha_publicacion")
+COMENTARIO_AUTOR = Schema("id", "id_usuario", "username", "contenido", "urlFotoPerfil", "fecha_publicacion")
+AUTOR = Schema("id", "username", "urlFotoPerfil")
+CATEGORIA = Schema("id", "nombre", "descripcion")
+SUBCATEGORIA = Schema(
+    "id_categoria", "id_subcategoria", "nombre", "historia", "caracteristicas", "requerimientos", "tutoriales",
+)
+ETIQUETA = Schema("id", "nombre")
+
+
+def encode(obj):
+    # JSON compacto en bytes con el proveedor de la app (orjson si está activo)
+    provider = current_app.json
+    if isinstance(provider, OrjsonProvider):
+        return provider.dumps_bytes(obj)
+    return provider.dumps(obj, separators=(",", ":")).encode()
@@ -0,0 +1,49 @@
+import csv
+import io
+from flask import Response, stream_with_context
+from utils.serializers import encode
+
+
+def ndjson_response(rows, to_dict, status=200):
+    """Respuesta NDJSON que serializa cada fila según se lee del cursor.
+
+    ``rows`` suele ser un cursor sin buffer (``SSCursor``): la memoria no crece
+    con el número de filas. El contexto de la petición se mantiene vivo hasta
+    terminar, así la conexión no vuelve al pool a mitad del envío.
+    """
+    def generar():
+        for row in rows:
+            yield encode(to_dict(row)) + b"\n"
+
+    return Response(stream_with_context(generar()), status=status, mimetype="application/x-ndjson")
+
+
+def json_array_response(rows, to_dict, status=200):
+    # Igual que ndjson_response pero como un array JSON normal, para clientes antiguos
+    def generar():
+        separador = b"["
+        for row in rows:
+            yield separador + encode(to_dict(row))
+            separador = b","
+        yield b"[]\n" if separador == b"[" else b"]\n"
+
+    return Response(stream_with_context(generar()), status=status, mimetype="application/json")
+
+
+def csv_response(rows, columnas, filename=None, status=200):
+    # CSV con cabecera, escrito fila a fila como ndjson_response
+    def generar():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columnas)
+        for row in rows:
+            writer.writerow(row)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        # Cabecera sola si no hubo filas
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else None
+    return Response(stream_with_context(generar()), status=status, mimetype="text/csv", headers=headers)
@@ -0,0 +1,200 @@
+import threading
+import time
+import zlib
+from bisect import bisect_right
+from flask import current_app, request, jsonify
+from models import get_connection
+from utils.compression import compress, negotiate, set_encoding
+from utils.pagination import encode_cursor, decode_cursor
+from utils.serializers import CATEGORIA, SUBCATEGORIA, ETIQUETA, encode
+
+TAXONOMIA_POR_PAGINA = 100
+MAX_TAXONOMIA_POR_PAGINA = 500
+
+# Clave de orden de cada lista paginable (las listas ya vienen ordenadas por ella)
+LIST_KEYS = {
+    "lista_categorias": lambda c: (c["id"], c["id"]),
+    "lista_subcategorias": lambda s: (s["id_categoria"], s["id_subcategoria"]),
+    "etiquetas": lambda e: (e["id"], e["id"]),
+}
+
+
+class TaxonomySnapshot:
+    """Árbol categoría → subcategoría → etiqueta ya listo para serializar."""
+
+    def __init__(self, version, categorias, subcategorias, etiquetas):
+        self.version = version
+        self.categorias = {}          # id -> {"id", "nombre", "descripcion"}
+        self.subcategorias = {}       # (id_categoria, id_subcategoria) -> detalle
+        self.por_categoria = {}       # id_categoria -> [resumen de subcategoría]
+        self.etiquetas = ETIQUETA.rows(etiquetas)
+        self._encoded = {}            # nombre de la lista -> JSON ya serializado
+        self.updated_at = {}          # id o (id_categoria, id_subcategoria) -> updated_at
+
+        for c in categorias:
+            self.categorias[c[0]] = {**CATEGORIA.row(c), "etiquetas": []}
+            self.updated_at[c[0]] = c[-1]
+        for sc in subcategorias:
+            self.subcategorias[(sc[0], sc[1])] = {**SUBCATEGORIA.row(sc), "etiquetas": []}
+            self.updated_at[(sc[0], sc[1])] = sc[-1]
+            self.por_categoria.setdefault(sc[0], []).append(
+                {"id_categoria": sc[0], "id_subcategoria": sc[1], "nombre": sc[2]}
+            )
+        for e in etiquetas:
+            if e[3] is not None and (e[2], e[3]) in self.subcategorias:
+                self.subcategorias[(e[2], e[3])]["etiquetas"].append(e[0])
+            elif e[2] in self.categorias:
+                self.categorias[e[2]]["etiquetas"].append(e[0])
+
+        self.lista_categorias = [{"id": c["id"], "nombre": c["nombre"]} for c in self.categorias.values()]
+        self.lista_subcategorias = [s for subs in self.por_categoria.values() for s in subs]
+
+    def tree(self):
+        return [{
+            **categoria,
+            "subcategorias": [self.subcategorias[(s["id_categoria"], s["id_subcategoria"])]
+                              for s in self.por_categoria.get(id, [])]
+        } for id, categoria in self.categorias.items()]
+
+    def encoded(self, name, encoding=None):
+        # Las listas completas se serializan (y comprimen) una vez por versión,
+        # no en cada petición
+        body = self._encoded.get((name, encoding))
+        if body is None:
+            if encoding is None:
+                lista = self.tree() if name == "tree" else getattr(self, name)
+                body = encode(lista) + b"\n"
+            else:
+                body = compress(self.encoded(name), encoding)
+            self._encoded[(name, encoding)] = body
+        return body
+
+    def keys(self, name):
+        claves = self._encoded.get((name, "keys"))
+        if claves is None:
+            claves = self._encoded[(name, "keys")] = [LIST_KEYS[name](x) for x in getattr(self, name)]
+        return claves
+
+    @property
+    def etag(self):
+        return f"tax-{self.version}"
+
+    def row_validators(self, key):
+        # ETag y Last-Modified de una sola categoría o subcategoría: no cambian
+        # cuando se edita otra fila de la taxonomía
+        updated_at = self.updated_at[key]
+        nombre = "cat-{}".format(key) if isinstance(key, int) else "sub-{}-{}".format(*key)
+        return f"{nombre}-{int(updated_at.timestamp() * 1000)}", updated_at
+
+
+class TaxonomyCache:
+    """Caché en memoria de la taxonomía, compartida por los hilos del proceso.
+
+    La tabla ``Taxonomia_Version`` guarda un contador que los handlers de
+    escritura incrementan; cada proceso lo consulta como mucho una vez cada
+    ``check_interval`` segundos y recarga el árbol si ha cambiado.
+    """
+
+    def __init__(self, check_interval=1.0):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = 0.0
+
+    def _load(self, cursor, version):
+        cursor.execute("SELECT id, nombre, descripcion, updated_at FROM Categoria ORDER BY id")
+        categorias = cursor.fetchall()
+        cursor.execute("""
+            SELECT id_categoria, id_subcategoria, nombre, historia, caracteristicas, requerimientos, tutoriales,
+                   updated_at
+            FROM Subcategoria
+            ORDER BY id_categoria, id_subcategoria
+        """)
+        subcategorias = cursor.fetchall()
+        cursor.execute("SELECT id, nombre, id_categoria, id_subcategoria FROM Etiqueta ORDER BY id")
+        etiquetas = cursor.fetchall()
+        return TaxonomySnapshot(version, categorias, subcategorias, etiquetas)
+
+    def get(self):
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return snapshot
+
+            cursor = get_connection().cursor()
+            try:
+                cursor.execute("SELECT version FROM Taxonomia_Version WHERE id = 1")
+                version = cursor.fetchone()[0]
+                if snapshot is None or snapshot.version != version:
+                    snapshot = self._snapshot = self._load(cursor, version)
+                self._checked_at = time.monotonic()
+            finally:
+                cursor.close()
+            return snapshot
+
+    def invalidate(self, cursor):
+        # Write-through: sube la versión en la BD y olvida la copia local
+        cursor.execute("UPDATE Taxonomia_Version SET version = version + 1 WHERE id = 1")
+        with self._lock:
+            self._snapshot = None
+
+
+taxonomy_cache = TaxonomyCache()
+
+
+def cached_response(snapshot, body, status=200, key=None, variant=None):
+    # Respuesta con ETag de la versión de la taxonomía (304 si el cliente ya la tiene).
+    # ``body`` puede ser el nombre de una lista del snapshot para usar su JSON ya hecho,
+    # comprimido de antemano si el cliente lo acepta.
+    # Con ``key`` los validadores (ETag y Last-Modified) son los de esa fila; ``variant``
+    # distingue respuestas de la misma versión (p. ej. cada página).
+    encoding = None
+    if isinstance(body, str):
+        data = snapshot.encoded(body)
+        encoding = negotiate() if len(data) >= current_app.config["COMPRESS_MIN_SIZE"] else None
+        if encoding:
+            data = snapshot.encoded(body, encoding)
+        response = current_app.response_class(data, mimetype="application/json")
+    else:
+        response = jsonify(body)
+    response.status_code = status
+    if key is not None:
+        etag, updated_at = snapshot.row_validators(key)
+        response.set_etag(etag)
+        response.last_modified = updated_at
+    elif variant is not None:
+        response.set_etag(f"{snapshot.etag}-{variant}")
+    else:
+        response.set_etag(snapshot.etag)
+    if encoding:
+        set_encoding(response, encoding)
+    return response.make_conditional(request)
+
+
+def list_response(snapshot, name, field):
+    """Lista completa de la taxonomía, o paginada si llegan ``cursor`` o ``limit``.
+
+    Paginada devuelve ``{field: [...], "next_cursor": ...}`` con el mismo
+    esquema de cursor opaco que el resto de la API.
+    """
+    args = request.args
+    if "cursor" not in args and "limit" not in args:
+        return cached_response(snapshot, name)
+
+    limit = min(max(args.get("limit", TAXONOMIA_POR_PAGINA, type=int), 1), MAX_TAXONOMIA_POR_PAGINA)
+    cursor = args.get("cursor", "")
+    try:
+        despues = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    lista, claves = getattr(snapshot, name), snapshot.keys(name)
+    inicio = bisect_right(claves, despues) if despues else 0
+    pagina = lista[inicio:inicio + limit]
+    next_cursor = encode_cursor(*claves[inicio + limit - 1]) if inicio + limit < len(lista) else None
+    variant = format(zlib.crc32(f"{cursor}|{limit}".encode()), "x")
+    return cached_response(snapshot, {field: pagina, "next_cursor": next_cursor}, variant=variant)
@@ -0,0 +1,283 @@
+import atexit
+import logging
+import threading
+from flask import current_app
+from models import get_connection
+
+logger = logging.getLogger(__name__)
+
+LOTE = 500
+
+
+class PopularFollows:
+    """Categorías y subcategorías con más de ``TIMELINE_FANOUT_LIMIT`` seguidores.
+
+    Sus publicaciones no se copian en el timeline de cada seguidor (serían
+    miles de filas por publicación): el feed las lee directamente de
+    Publicacion. Un hilo recalcula el conjunto cada ``refresh`` segundos; solo
+    la primera carga de cada proceso se hace en el hilo que lo pide, porque
+    sin ella todo se repartiría como si nada fuera popular.
+    """
+
+    def __init__(self, refresh=60.0):
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._categorias = frozenset()
+        self._subcategorias = frozenset()
+        self._app = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def get(self):
+        if self._thread is None:
+            self.start(current_app._get_current_object())
+        return self._categorias, self._subcategorias
+
+    def start(self, app):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._app = app
+            self.reload()
+            self._thread = threading.Thread(target=self._run, name="popular-follows", daemon=True)
+            self._thread.start()
+        atexit.register(self._stop.set)
+
+    def _run(self):
+        while not self._stop.wait(self.refresh):
+            self.reload()
+
+    def reload(self):
+        try:
+            with self._app.app_context():
+                limite = current_app.config["TIMELINE_FANOUT_LIMIT"]
+                cursor = get_connection().cursor()
+                try:
+                    cursor.execute("""
+                        SELECT id_categoria FROM Usuario_Guarda_Categoria
+                        GROUP BY id_categoria HAVING COUNT(*) > %s
+                    """, (limite,))
+                    categorias = frozenset(r[0] for r in cursor.fetchall())
+                    cursor.execute("""
+                        SELECT id_categoria, id_subcategoria FROM Usuario_Guarda_Subcategoria
+                        GROUP BY id_categoria, id_subcategoria HAVING COUNT(*) > %s
+                    """, (limite,))
+                    subcategorias = frozenset(tuple(r) for r in cursor.fetchall())
+                finally:
+                    cursor.close()
+            self._categorias, self._subcategorias = categorias, subcategorias
+        except Exception:
+            # Se sigue con el conjunto anterior hasta el próximo intento
+            logger.exception("Error al recalcular las categorías populares")
+
+
+popular_follows = PopularFollows()
+
+
+class TimelineTrimmer:
+    """Recorta en segundo plano los timelines que crecieron con el reparto.
+
+    ``fan_out`` apunta de qué categoría o subcategoría repartió y cada
+    ``interval`` segundos se recortan los timelines de sus seguidores. Una
+    publicación añade como mucho una entrada a cada uno, así que no hace falta
+    ordenar el timeline entero: basta con la entrada TIMELINE_MAX_POSTS + 1 de
+    cada usuario (un recorrido de su clave primaria) y borrar de ahí hacia
+    atrás. Varias publicaciones de la misma categoría en un intervalo cuestan
+    un solo recorte; entretanto un timeline puede pasarse del máximo.
+    """
+
+    def __init__(self, interval=30.0):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._app = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def record(self, id_categoria, id_subcategoria=None):
+        with self._lock:
+            self._pending.add((id_categoria, id_subcategoria))
+        if self._thread is None:
+            self.start(current_app._get_current_object())
+
+    def start(self, app):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._app = app
+            self._thread = threading.Thread(target=self._run, name="timeline-trim", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            fuentes, self._pending = self._pending, set()
+        if not fuentes or self._app is None:
+            return
+
+        try:
+            with self._app.app_context():
+                cursor = get_connection().cursor()
+                try:
+                    for fuente in list(fuentes):
+                        _trim_followers(cursor, *fuente)
+                        fuentes.discard(fuente)
+                finally:
+                    cursor.close()
+        except Exception:
+            # Lo que no se pudo recortar vuelve a la cola para el siguiente intento
+            logger.exception("Error al recortar timelines")
+            with self._lock:
+                self._pending |= fuentes
+
+
+def get_timeline_trimmer(app=None):
+    app = app or current_app
+    trimmer = app.extensions.get("timeline_trimmer")
+    if trimmer is None:
+        trimmer = app.extensions["timeline_trimmer"] = TimelineTrimmer(app.config["TIMELINE_TRIM_INTERVAL"])
+    return trimmer
+
+
+def fan_out(cursor, id_publicacion):
+    """Copia una publicación nueva en el timeline de quienes siguen su
+    categoría o subcategoría (salvo las populares, que se leen al vuelo)."""
+    try:
+        cursor.execute("""
+            SELECT e.id_categoria, e.id_subcategoria
+            FROM Publicacion p
+            JOIN Etiqueta e ON e.id = p.id_etiqueta
+            WHERE p.id = %s
+        """, (id_publicacion,))
+        etiqueta = cursor.fetchone()
+        if not etiqueta or etiqueta[0] is None:
+            return
+        id_categoria, id_subcategoria = etiqueta
+        categorias, subcategorias = popular_follows.get()
+        trimmer = get_timeline_trimmer()
+
+        if id_categoria not in categorias:
+            cursor.execute("""
+                INSERT IGNORE INTO Timeline (id_usuario, fecha_publicacion, id_publicacion)
+                SELECT ugc.id_usuario, p.fecha_publicacion, p.id
+                FROM Publicacion p
+                JOIN Usuario_Guarda_Categoria ugc ON ugc.id_categoria = %s
+                WHERE p.id = %s
+            """, (id_categoria, id_publicacion))
+            trimmer.record(id_categoria)
+        if id_subcategoria is not None and (id_categoria, id_subcategoria) not in subcategorias:
+            cursor.execute("""
+                INSERT IGNORE INTO Timeline (id_usuario, fecha_publicacion, id_publicacion)
+                SELECT ugs.id_usuario, p.fecha_publicacion, p.id
+                FROM Publicacion p
+                JOIN Usuario_Guarda_Subcategoria ugs
+                  ON ugs.id_categoria = %s AND ugs.id_subcategoria = %s
+                WHERE p.id = %s
+            """, (id_categoria, id_subcategoria, id_publicacion))
+            trimmer.record(id_categoria, id_subcategoria)
+    except Exception:
+        # La publicación ya está guardada; sin fan-out solo falta en los timelines
+        logger.exception("Error al repartir la publicación %s en los timelines", id_publicacion)
+
+
+def backfill(cursor, user_id, id_categoria, id_subcategoria=None):
+    # Al empezar a seguir algo se copian sus publicaciones más recientes
+    filtro = "e.id_categoria = %s" if id_subcategoria is None else "e.id_categoria = %s AND e.id_subcategoria = %s"
+    params = (id_categoria,) if id_subcategoria is None else (id_categoria, id_subcategoria)
+    cursor.execute(f"""
+        INSERT IGNORE INTO Timeline (id_usuario, fecha_publicacion, id_publicacion)
+        SELECT %s, p.fecha_publicacion, p.id
+        FROM Publicacion p
+        JOIN Etiqueta e ON e.id = p.id_etiqueta
+        WHERE {filtro}
+        ORDER BY p.fecha_publicacion DESC, p.id DESC
+        LIMIT %s
+    """, (user_id, *params, current_app.config["TIMELINE_MAX_POSTS"]))
+    trim(cursor, user_id)
+
+
+def unfollow_cleanup(cursor, user_id, id_categoria, id_subcategoria=None):
+    # Quita del timeline lo que ya no cubre ningún otro seguimiento
+    if id_subcategoria is None:
+        cursor.execute("""
+            DELETE t FROM Timeline t
+            JOIN Publicacion p ON p.id = t.id_publicacion
+            JOIN Etiqueta e ON e.id = p.id_etiqueta
+            LEFT JOIN Usuario_Guarda_Subcategoria ugs
+              ON ugs.id_usuario = t.id_usuario
+             AND ugs.id_categoria = e.id_categoria
+             AND ugs.id_subcategoria = e.id_subcategoria
+            WHERE t.id_usuario = %s
+              AND e.id_categoria = %s
+              AND ugs.id_usuario IS NULL
+        """, (user_id, id_categoria))
+    else:
+        cursor.execute("""
+            DELETE t FROM Timeline t
+            JOIN Publicacion p ON p.id = t.id_publicacion
+            JOIN Etiqueta e ON e.id = p.id_etiqueta
+            LEFT JOIN Usuario_Guarda_Categoria ugc
+              ON ugc.id_usuario = t.id_usuario
+             AND ugc.id_categoria = e.id_categoria
+            WHERE t.id_usuario = %s
+              AND e.id_categoria = %s
+              AND e.id_subcategoria = %s
+              AND ugc.id_usuario IS NULL
+        """, (user_id, id_categoria, id_subcategoria))
+
+
+def _trim_followers(cursor, id_categoria, id_subcategoria=None):
+    # Límite de cada seguidor con el timeline lleno (LATERAL, MySQL 8.0.14+) y
+    # un DELETE por lotes de lo que queda por debajo
+    if id_subcategoria is None:
+        seguidores = "SELECT id_usuario FROM Usuario_Guarda_Categoria WHERE id_categoria = %s"
+        params = (id_categoria,)
+    else:
+        seguidores = ("SELECT id_usuario FROM Usuario_Guarda_Subcategoria "
+                      "WHERE id_categoria = %s AND id_subcategoria = %s")
+        params = (id_categoria, id_subcategoria)
+    cursor.execute(f"""
+        SELECT s.id_usuario, limite.fecha_publicacion, limite.id_publicacion
+        FROM ({seguidores}) s,
+        LATERAL (
+            SELECT tl.fecha_publicacion, tl.id_publicacion
+            FROM Timeline tl
+            WHERE tl.id_usuario = s.id_usuario
+            ORDER BY tl.fecha_publicacion DESC, tl.id_publicacion DESC
+            LIMIT 1 OFFSET %s
+        ) limite
+    """, (*params, current_app.config["TIMELINE_MAX_POSTS"]))
+    limites = cursor.fetchall()
+    for n in range(0, len(limites), LOTE):
+        lote = limites[n:n + LOTE]
+        filas = " UNION ALL ".join(["SELECT %s AS id_usuario, %s AS fecha, %s AS id"] * len(lote))
+        cursor.execute(f"""
+            DELETE t FROM Timeline t
+            JOIN ({filas}) l ON l.id_usuario = t.id_usuario
+            WHERE (t.fecha_publicacion, t.id_publicacion) <= (l.fecha, l.id)
+        """, [v for fila in lote for v in fila])
+
+
+def trim(cursor, user_id):
+    # Deja solo las TIMELINE_MAX_POSTS entradas más recientes del usuario
+    cursor.execute("""
+        DELETE FROM Timeline
+        WHERE id_usuario = %s
+          AND (fecha_publicacion, id_publicacion) <= (
+              SELECT fecha, id FROM (
+                  SELECT fecha_publicacion AS fecha, id_publicacion AS id
+                  FROM Timeline
+                  WHERE id_usuario = %s
+                  ORDER BY fecha_publicacion DESC, id_publicacion DESC
+                  LIMIT 1 OFFSET %s
+              ) limite
+          )
+    """, (user_id, user_id, current_app.config["TIMELINE_MAX_POSTS"]))
@@ -0,0 +1,195 @@
+import atexit
+import logging
+import math
+import threading
+import time
+from flask import current_app
+from models import get_connection
+
+logger = logging.getLogger(__name__)
+
+# Origen fijo de la escala de tiempo de las puntuaciones (2024-01-01 UTC)
+EPOCH = 1704067200
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+# Por debajo de esta puntuación actual una publicación ya no es tendencia
+MIN_SCORE = 0.01
+FLUSH_BATCH = 500
+
+
+def _logaddexp(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b) + math.log1p(math.exp(-abs(a - b)))
+
+
+def _net(sumado, restado):
+    # (signo, log|sumado - restado|) de dos sumas en escala logarítmica; None si se anulan
+    if restado is None:
+        return 1, sumado
+    if sumado is None:
+        return -1, restado
+    if sumado == restado:
+        return None
+    signo = 1 if sumado > restado else -1
+    alto, bajo = max(sumado, restado), min(sumado, restado)
+    return signo, alto + math.log1p(-math.exp(bajo - alto))
+
+
+class TrendingScores:
+    """Puntuación de tendencia con decaimiento exponencial, mantenida por eventos.
+
+    Se usa decaimiento "hacia delante": cada like o comentario suma
+    ``peso * e^((t - EPOCH) / tau)``, así que el orden entre publicaciones no
+    cambia con el paso del tiempo y nunca hay que recalcular nada. La suma se
+    guarda en escala logarítmica en ``Publicacion.trending_score`` para no
+    desbordar. Un like retirado resta exactamente lo que sumó (con el instante
+    del like) y la puntuación nunca baja de cero. Los eventos se acumulan en
+    memoria y se vuelcan por lotes, como los likes; el mismo hilo recarga cada ``interval`` segundos el top de
+    publicaciones (global, por categoría y por subcategoría) que sirve el
+    endpoint sin tocar la base de datos.
+    """
+
+    def __init__(self, half_life_hours=24.0, interval=30.0, top_k=100, candidates=5000):
+        self.tau = half_life_hours * 3600 / math.log(2)
+        self.interval = interval
+        self.top_k = top_k
+        self.candidates = candidates
+        self._lock = threading.Lock()
+        self._pending = {}   # id -> [suma, resta], ambas en escala logarítmica
+        # {None | id_categoria | (id_categoria, id_subcategoria): [(id, log_score), ...]}
+        self._top = None
+        self._app = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def now(self):
+        # Exponente del instante actual en la escala de las puntuaciones
+        return (time.time() - EPOCH) / self.tau
+
+    def record(self, id_publicacion, weight, at=None):
+        # Un peso negativo retira un evento anterior; ``at`` es su instante (epoch)
+        x = math.log(abs(weight)) + (self.now() if at is None else (at - EPOCH) / self.tau)
+        lado = 0 if weight > 0 else 1
+        with self._lock:
+            pendiente = self._pending.setdefault(id_publicacion, [None, None])
+            pendiente[lado] = _logaddexp(pendiente[lado], x)
+        if self._thread is None:
+            self.start(current_app._get_current_object())
+
+    def top(self, key=None, limit=20):
+        """Las ``limit`` publicaciones con más puntuación ahora mismo, como (id, puntuación)."""
+        if self._thread is None:
+            self.start(current_app._get_current_object())
+        if self._top is None:
+            self.refresh()
+        ahora = self.now()
+        return [(id, math.exp(s - ahora)) for id, s in (self._top or {}).get(key, [])[:limit]]
+
+    def start(self, app):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._app = app
+            self._thread = threading.Thread(target=self._run, name="trending", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+            self.refresh()
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending or self._app is None:
+            return
+
+        netos = {id: _net(*pending[id]) for id in pending}
+        ids = sorted(id for id, neto in netos.items() if neto is not None)
+        try:
+            with self._app.app_context():
+                cursor = get_connection(primary=True).cursor()
+                try:
+                    for i in range(0, len(ids), FLUSH_BATCH):
+                        lote = ids[i:i + FLUSH_BATCH]
+                        filas = " UNION ALL ".join(["SELECT %s AS id, %s AS s, %s AS x"] * len(lote))
+                        # Restar lo que no hay deja la puntuación a NULL (cero).
+                        # updated_at se fija a sí mismo: la puntuación no cambia el detalle
+                        cursor.execute(f"""
+                            UPDATE Publicacion p
+                            JOIN ({filas}) d ON d.id = p.id
+                            SET p.trending_score = CASE
+                                    WHEN d.s > 0 THEN IF(p.trending_score IS NULL, d.x,
+                                        GREATEST(p.trending_score, d.x) + LN(1 + EXP(-ABS(p.trending_score - d.x))))
+                                    WHEN p.trending_score > d.x
+                                        THEN p.trending_score + LN(1 - EXP(d.x - p.trending_score))
+                                    ELSE NULL
+                                END,
+                                p.updated_at = p.updated_at
+                        """, [v for id in lote for v in (id, *netos[id])])
+                        for id in lote:
+                            del pending[id]
+                finally:
+                    cursor.close()
+        except Exception:
+            # Lo que no se pudo volcar vuelve a la cola para el siguiente intento
+            logger.exception("Error al volcar puntuaciones de tendencia")
+            with self._lock:
+                for id, (sumado, restado) in pending.items():
+                    pendiente = self._pending.setdefault(id, [None, None])
+                    pendiente[0] = _logaddexp(pendiente[0], sumado)
+                    pendiente[1] = _logaddexp(pendiente[1], restado)
+
+    def refresh(self):
+        # Solo las publicaciones con actividad reciente: rango sobre el índice de trending_score
+        minimo = self.now() + math.log(MIN_SCORE)
+        try:
+            with self._app.app_context():
+                cursor = get_connection(primary=True).cursor()
+                try:
+                    cursor.execute("""
+                        SELECT p.id, p.trending_score, e.id_categoria, e.id_subcategoria
+                        FROM Publicacion p
+                        LEFT JOIN Etiqueta e ON e.id = p.id_etiqueta
+                        WHERE p.trending_score > %s
+                        ORDER BY p.trending_score DESC
+                        LIMIT %s
+                    """, (minimo, self.candidates))
+                    filas = cursor.fetchall()
+                finally:
+                    cursor.close()
+        except Exception:
+            logger.exception("Error al recargar las publicaciones en tendencia")
+            return
+
+        top = {None: []}
+        for id, score, id_categoria, id_subcategoria in filas:
+            claves = [None]
+            if id_categoria is not None:
+                claves.append(id_categoria)
+                if id_subcategoria is not None:
+                    claves.append((id_categoria, id_subcategoria))
+            for clave in claves:
+                lista = top.setdefault(clave, [])
+                if len(lista) < self.top_k:
+                    lista.append((id, score))
+        self._top = top
+
+
+def get_trending(app=None):
+    app = app or current_app
+    trending = app.extensions.get("trending")
+    if trending is None:
+        trending = app.extensions["trending"] = TrendingScores(
+            app.config["TRENDING_HALF_LIFE_HOURS"], app.config["TRENDING_REFRESH_INTERVAL"],
+            app.config["TRENDING_TOP_K"]
+        )
+    return trending
@@ -0,0 +1,209 @@
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import uuid
+import cloudinary.uploader
+from flask import current_app
+from models import get_connection, pin_to_primary
+from utils import images
+
+logger = logging.getLogger(__name__)
+
+
+class CloudinaryUploader:
+    def upload(self, path):
+        return cloudinary.uploader.upload(path).get('secure_url')
+
+    def derivatives(self, path, url):
+        # No se sube nada más: las derivadas son transformaciones de la URL
+        return {nombre: images.cloudinary_url(url, *spec) for nombre, spec in images.DERIVADAS.items()}
+
+
+class LocalUploader:
+    """Sustituto de Cloudinary que copia los ficheros a un directorio local.
+
+    Sirve para desarrollo, tests y benchmarks sin salir a la red.
+    """
+
+    def __init__(self, directory, base_url):
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(directory, exist_ok=True)
+
+    def upload(self, path):
+        nombre = uuid.uuid4().hex + os.path.splitext(path)[1]
+        shutil.copyfile(path, os.path.join(self.directory, nombre))
+        return f"{self.base_url}/{nombre}"
+
+    def derivatives(self, path, url):
+        # Se generan aquí con Pillow; sin él, todas apuntan al original
+        rutas = images.generate(path)
+        urls = {}
+        for nombre in images.DERIVADAS:
+            if nombre in rutas:
+                urls[nombre] = self.upload(rutas[nombre])
+                os.remove(rutas[nombre])
+            else:
+                urls[nombre] = url
+        return urls
+
+
+def get_uploader(app=None):
+    app = app or current_app
+    uploader = app.extensions.get("uploader")
+    if uploader is None:
+        if app.config["UPLOAD_BACKEND"] == "local":
+            uploader = LocalUploader(app.config["UPLOAD_LOCAL_DIR"], app.config["UPLOAD_LOCAL_URL"])
+        else:
+            uploader = CloudinaryUploader()
+        app.extensions["uploader"] = uploader
+    return uploader
+
+
+class UploadQueueFull(Exception):
+    """La cola de subidas está llena."""
+
+
+class UploadQueue:
+    """Pool acotado de hilos que sube los ficheros en segundo plano.
+
+    Cada trabajo tiene su fila en ``Subida``; el hilo la va actualizando y, al
+    terminar la subida, ejecuta ``on_done(cursor, url, derivadas)`` para
+    escribir el resultado (la publicación, la foto de perfil...) en la misma
+    transacción que marca el trabajo como completado. ``derivadas``
+    son las URLs de la miniatura y la versión mediana si el trabajo las pidió.
+    """
+
+    def __init__(self, workers=4, max_queue=100):
+        self.workers = workers
+        self._queue = queue.Queue(max_queue)
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _start(self):
+        # Arranca los hilos la primera vez y sustituye los que hayan muerto
+        with self._lock:
+            if len(self._threads) == self.workers and all(t.is_alive() for t in self._threads):
+                return
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for i in range(self.workers - len(self._threads)):
+                t = threading.Thread(target=self._run, name=f"upload-worker-{len(self._threads)}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, app, job_id, user_id, path, on_done, derivatives=False):
+        self._start()
+        try:
+            self._queue.put_nowait((app, job_id, user_id, path, on_done, derivatives))
+        except queue.Full:
+            raise UploadQueueFull("Cola de subidas llena")
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            app, job_id, user_id, path, on_done, derivatives = self._queue.get()
+            try:
+                self._process(app, job_id, user_id, path, on_done, derivatives)
+            except Exception:
+                # Ni siquiera se pudo marcar el error (BD caída, pool agotado...):
+                # el hilo sigue atendiendo la cola
+                logger.exception("Error al registrar el fallo de la subida %s", job_id)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, app, job_id, user_id, path, on_done, derivatives):
+        try:
+            with app.app_context():
+                _actualizar(job_id, estado="subiendo", progreso=10)
+            # La subida va sin conexión a la BD: solo se pide una al terminar
+            uploader = get_uploader(app)
+            url = uploader.upload(path)
+            derivadas = uploader.derivatives(path, url) if derivatives else {}
+            with app.app_context():
+                # El resultado (la publicación...) y el estado "completado" se
+                # confirman juntos: si algo falla no queda ninguno y el trabajo
+                # pasa a error; una vez confirmados, ya nada lo marca como error
+                conn = get_connection()
+                cursor = conn.cursor()
+                try:
+                    conn.begin()
+                    extra = on_done(cursor, url, derivadas) or {}
+                    _actualizar(job_id, estado="completado", progreso=100, urlContenido=url, **extra)
+                    # Antes de confirmar: al ver "completado", el cliente leerá del primario
+                    try:
+                        pin_to_primary(user_id, app)
+                    except Exception:
+                        logger.warning("No se pudo fijar al usuario %s al primario", user_id, exc_info=True)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logger.exception("Error en la subida %s", job_id)
+            with app.app_context():
+                _actualizar(job_id, estado="error", error=str(e)[:255])
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _actualizar(job_id, **campos):
+    columnas = ", ".join(f"{c} = %s" for c in campos)
+    cursor = get_connection().cursor()
+    try:
+        cursor.execute(f"UPDATE Subida SET {columnas} WHERE id = %s", (*campos.values(), job_id))
+    finally:
+        cursor.close()
+
+
+def get_upload_queue(app=None):
+    app = app or current_app
+    upload_queue = app.extensions.get("upload_queue")
+    if upload_queue is None:
+        upload_queue = app.extensions["upload_queue"] = UploadQueue(
+            app.config["UPLOAD_WORKERS"], app.config["UPLOAD_QUEUE_SIZE"]
+        )
+    return upload_queue
+
+
+def enqueue_upload(file, user_id, tipo, on_done, derivatives=False):
+    """Guarda el fichero en disco, crea la fila en ``Subida`` y encola el trabajo.
+
+    Con ``derivatives`` se generan también la miniatura y la versión mediana.
+    Devuelve el id del trabajo. Lanza ``UploadQueueFull`` si no cabe.
+    """
+    app = current_app._get_current_object()
+    spool_dir = app.config["UPLOAD_SPOOL_DIR"] or os.path.join(tempfile.gettempdir(), "artcenter_uploads")
+    os.makedirs(spool_dir, exist_ok=True)
+
+    job_id = uuid.uuid4().hex
+    extension = os.path.splitext(file.filename or "")[1][:10]
+    path = os.path.join(spool_dir, job_id + extension)
+    file.save(path)
+
+    cursor = get_connection().cursor()
+    try:
+        cursor.execute(
+            "INSERT INTO Subida (id, id_usuario, tipo) VALUES (%s, %s, %s)",
+            (job_id, user_id, tipo)
+        )
+        try:
+            get_upload_queue(app).submit(app, job_id, user_id, path, on_done, derivatives)
+        except UploadQueueFull:
+            cursor.execute("DELETE FROM Subida WHERE id = %s", (job_id,))
+            raise
+    except Exception:
+        os.remove(path)
+        raise
+    finally:
+        cursor.close()
+    return job_id